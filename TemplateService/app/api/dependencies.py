@@ -7,9 +7,13 @@ from app.infrastructure.repositories import TemplateBlockRepository
 from app.infrastructure.storage_service import MinIOStorageService
 from app.infrastructure.pptx_parser import PPTXParser
 from app.infrastructure.preview_generator import PreviewGenerator
+from app.infrastructure.media_optimizer import MediaOptimizer
+from app.infrastructure.category_cache import category_cache
 from app.application.use_cases import (
     GetTemplatesUseCase,
     GetTemplateByIdUseCase,
+    GetCategoriesUseCase,
+    SearchTemplatesUseCase,
     UploadTemplateBlockUseCase
 )
 
@@ -35,6 +39,20 @@ def get_get_template_by_id_use_case(
     return GetTemplateByIdUseCase(block_repo)
 
 
+def get_get_categories_use_case(
+    block_repo: TemplateBlockRepository = Depends(get_template_block_repository)
+) -> GetCategoriesUseCase:
+    """Dependency для use case получения категорий"""
+    return GetCategoriesUseCase(block_repo, category_cache)
+
+
+def get_search_templates_use_case(
+    block_repo: TemplateBlockRepository = Depends(get_template_block_repository)
+) -> SearchTemplatesUseCase:
+    """Dependency для use case поиска блоков"""
+    return SearchTemplatesUseCase(block_repo)
+
+
 # Service dependencies
 def get_storage_service() -> MinIOStorageService:
     """Dependency для MinIO storage service"""
@@ -58,16 +76,27 @@ def get_preview_generator() -> PreviewGenerator:
     return PreviewGenerator()
 
 
+def get_media_optimizer() -> MediaOptimizer:
+    """Dependency для оптимизатора изображений"""
+    settings = get_settings()
+    return MediaOptimizer(
+        target_dpi=settings.MEDIA_TARGET_DPI,
+        jpeg_quality=settings.MEDIA_JPEG_QUALITY
+    )
+
+
 def get_upload_template_block_use_case(
     block_repo: TemplateBlockRepository = Depends(get_template_block_repository),
     storage_service: MinIOStorageService = Depends(get_storage_service),
     pptx_parser: PPTXParser = Depends(get_pptx_parser),
-    preview_generator: PreviewGenerator = Depends(get_preview_generator)
+    preview_generator: PreviewGenerator = Depends(get_preview_generator),
+    media_optimizer: MediaOptimizer = Depends(get_media_optimizer)
 ) -> UploadTemplateBlockUseCase:
     """Dependency для use case загрузки блока"""
     return UploadTemplateBlockUseCase(
         block_repo,
         storage_service,
         pptx_parser,
-        preview_generator
+        preview_generator,
+        media_optimizer
     )
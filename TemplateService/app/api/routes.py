@@ -7,17 +7,23 @@ import io
 from app.application.use_cases import (
     GetTemplatesUseCase,
     GetTemplateByIdUseCase,
+    GetCategoriesUseCase,
+    SearchTemplatesUseCase,
     UploadTemplateBlockUseCase
 )
 from app.application.dtos import (
     TemplateBlockListItemDto,
     TemplateBlockDto,
+    TemplateSearchResultDto,
+    CategoryDto,
     ErrorResponseDto
 )
 from app.application.errors import GetTemplateError
 from app.api.dependencies import (
     get_get_templates_use_case,
     get_get_template_by_id_use_case,
+    get_get_categories_use_case,
+    get_search_templates_use_case,
     get_upload_template_block_use_case,
     get_storage_service
 )
@@ -58,6 +64,70 @@ async def get_templates(
         )
 
 
+@public_router.get(
+    "/categories",
+    response_model=List[CategoryDto],
+    summary="Получить категории блоков",
+    description="Возвращает категории блоков с количеством блоков в каждой"
+)
+async def get_categories(
+    use_case: GetCategoriesUseCase = Depends(get_get_categories_use_case)
+):
+    """
+    Получить список категорий с количеством блоков
+    
+    Блоки без категории возвращаются последним элементом с category=null.
+    Результат кешируется и сбрасывается при изменении блоков.
+    """
+    try:
+        return await use_case.execute()
+    except GetTemplateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": e.message, "code": e.code, "details": e.details}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": str(e), "code": "internal_error"}
+        )
+
+
+@public_router.get(
+    "/search",
+    response_model=TemplateSearchResultDto,
+    summary="Поиск блоков",
+    description="Полнотекстовый и нечеткий поиск по названию, описанию, коду и ключам полей блоков"
+)
+async def search_templates(
+    q: str = Query(..., min_length=1, description="Поисковый запрос"),
+    limit: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    offset: int = Query(0, ge=0, description="Смещение от начала результатов"),
+    use_case: SearchTemplatesUseCase = Depends(get_search_templates_use_case)
+):
+    """
+    Найти блоки по каталогу
+    
+    - **q**: Поисковый запрос (слова на русском ищутся с учетом морфологии,
+      подстроки и опечатки - по триграммам)
+    - **limit**, **offset**: Пагинация
+    
+    Возвращает страницу блоков по убыванию релевантности и общее число найденных
+    """
+    try:
+        return await use_case.execute(q, limit=limit, offset=offset)
+    except GetTemplateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": e.message, "code": e.code, "details": e.details}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": str(e), "code": "internal_error"}
+        )
+
+
 @public_router.get(
     "/{id}",
     response_model=TemplateBlockDto,
@@ -98,6 +168,7 @@ async def get_template_by_id(
 )
 async def download_template_block(
     id: UUID,
+    original: bool = Query(False, description="Скачать исходный файл (до оптимизации изображений)"),
     use_case: GetTemplateByIdUseCase = Depends(get_get_template_by_id_use_case),
     storage: MinIOStorageService = Depends(get_storage_service)
 ):
@@ -120,6 +191,8 @@ async def download_template_block(
         # pptxFileUrl format: http://minio:9000/bucket_name/object_name
         # We need just the object_name part
         object_name = template.pptxFileUrl
+        if original and template.originalPptxFileUrl:
+            object_name = template.originalPptxFileUrl
         
         import logging
         logger = logging.getLogger(__name__)
@@ -140,7 +213,7 @@ async def download_template_block(
                 object_name = "/".join(parts[4:])
                 logger.info(f"Extracted object_name: {object_name}")
             else:
-                raise ValueError(f"Invalid URL format: {template.pptxFileUrl}")
+                raise ValueError(f"Invalid URL format: {object_name}")
         
         # Download file from MinIO
         logger.info(f"Downloading from MinIO: {object_name}")
@@ -189,6 +262,9 @@ async def upload_template_block(
     name: str = Form(..., description="Название блока"),
     description: Optional[str] = Form(None, description="Описание блока"),
     category: Optional[str] = Form(None, description="Категория блока"),
+    optimize_media: Optional[bool] = Form(
+        None, description="Оптимизировать изображения (по умолчанию - по настройке сервиса)"
+    ),
     use_case: UploadTemplateBlockUseCase = Depends(get_upload_template_block_use_case)
 ):
     """
@@ -199,8 +275,10 @@ async def upload_template_block(
     - **name**: Человекочитаемое название блока
     - **description**: Описание назначения блока (опционально)
     - **category**: Категория блока (опционально)
+    - **optimize_media**: Уменьшить изображения до отображаемого размера (опционально)
     
     Возвращает созданный блок с автоматически извлеченными полями
+    и отчетом оптимизации изображений
     """
     try:
         # Проверяем формат файла
@@ -221,7 +299,8 @@ async def upload_template_block(
             description=description,
             category=category,
             file_data=file_stream,
-            filename=file.filename
+            filename=file.filename,
+            optimize_media=optimize_media
         )
         
         return result
@@ -27,6 +27,33 @@ class TemplateBlockListItemDto(BaseModel):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+class TemplateBlockSearchItemDto(BaseModel):
+    """Найденный блок - возвращается в GET /api/Templates/search"""
+    id: UUID
+    code: str
+    name: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    previewUrl: Optional[str] = Field(None, description="URL превью блока")
+    rank: float = Field(..., description="Релевантность (больше - лучше)")
+    
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class TemplateSearchResultDto(BaseModel):
+    """Страница результатов поиска"""
+    items: List[TemplateBlockSearchItemDto] = Field(default_factory=list, description="Найденные блоки по убыванию релевантности")
+    total: int = Field(..., description="Общее число найденных блоков")
+    limit: int
+    offset: int
+
+
+class CategoryDto(BaseModel):
+    """Категория с количеством блоков - возвращается в GET /api/Templates/categories"""
+    category: Optional[str] = Field(None, description="Категория (null - блоки без категории)")
+    count: int = Field(..., description="Количество блоков в категории")
+
+
 class TemplateBlockDto(BaseModel):
     """Полный DTO для блока шаблона - возвращается в GET /api/Templates/{id}"""
     id: UUID
@@ -36,6 +63,11 @@ class TemplateBlockDto(BaseModel):
     category: Optional[str] = None
     pptxFileUrl: str = Field(..., description="URL PPTX файла блока")
     previewUrl: Optional[str] = Field(None, description="URL PNG превью блока")
+    originalPptxFileUrl: Optional[str] = Field(None, description="URL исходного PPTX файла (если изображения были оптимизированы)")
+    mediaOptimization: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Отчет оптимизации изображений: original_size, optimized_size, saved_bytes, images"
+    )
     fields: List[BlockFieldDto] = Field(default_factory=list, description="Список полей блока")
     created_at: datetime
     updated_at: datetime
@@ -1,5 +1,7 @@
 from typing import List, Optional, BinaryIO
 from uuid import UUID, uuid4
+from io import BytesIO
+import asyncio
 import logging
 from datetime import datetime
 
@@ -8,12 +10,18 @@ from app.domain.entities import TemplateBlock, BlockField
 from app.application.dtos import (
     TemplateBlockListItemDto,
     TemplateBlockDto,
-    BlockFieldDto
+    BlockFieldDto,
+    TemplateBlockSearchItemDto,
+    TemplateSearchResultDto,
+    CategoryDto
 )
 from app.application.errors import GetTemplateError
 from app.infrastructure.storage_service import MinIOStorageService
 from app.infrastructure.pptx_parser import PPTXParser
 from app.infrastructure.preview_generator import PreviewGenerator
+from app.infrastructure.media_optimizer import MediaOptimizer
+from app.infrastructure.category_cache import CategoryCache
+from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +63,82 @@ class GetTemplatesUseCase:
             raise GetTemplateError.database_error(str(e))
 
 
+class GetCategoriesUseCase:
+    """Use case для получения категорий с количеством блоков"""
+    
+    def __init__(self, block_repository: ITemplateBlockRepository, cache: CategoryCache):
+        self.block_repository = block_repository
+        self.cache = cache
+    
+    async def execute(self) -> List[CategoryDto]:
+        """
+        Получить категории блоков с количеством блоков в каждой
+        
+        Returns:
+            Список категорий (блоки без категории - category=None, в конце)
+        """
+        try:
+            categories = self.cache.get()
+            if categories is None:
+                generation = self.cache.generation
+                categories = await self.block_repository.get_category_counts()
+                self.cache.set(categories, generation)
+                logger.info(f"Loaded {len(categories)} categories from database")
+            
+            return [CategoryDto(category=category, count=count) for category, count in categories]
+            
+        except Exception as e:
+            logger.error(f"Error getting categories: {str(e)}")
+            raise GetTemplateError.database_error(str(e))
+
+
+class SearchTemplatesUseCase:
+    """Use case для поиска блоков по каталогу"""
+    
+    def __init__(self, block_repository: ITemplateBlockRepository):
+        self.block_repository = block_repository
+    
+    async def execute(self, query: str, limit: int = 20, offset: int = 0) -> TemplateSearchResultDto:
+        """
+        Найти блоки по названию, описанию, коду и ключам полей
+        
+        Args:
+            query: Поисковый запрос
+            limit: Размер страницы
+            offset: Смещение от начала результатов
+        
+        Returns:
+            Страница найденных блоков по убыванию релевантности
+        """
+        query = query.strip()
+        if not query:
+            raise GetTemplateError.validation_error("Пустой поисковый запрос")
+        
+        try:
+            logger.info(f"Searching template blocks: '{query}' (limit={limit}, offset={offset})")
+            found, total = await self.block_repository.search(query, limit, offset)
+            
+            items = [
+                TemplateBlockSearchItemDto(
+                    id=block.id,
+                    code=block.code,
+                    name=block.name,
+                    description=block.description,
+                    category=block.category,
+                    previewUrl=block.preview_png_url,
+                    rank=rank
+                )
+                for block, rank in found
+            ]
+            
+            logger.info(f"Found {total} template blocks for '{query}'")
+            return TemplateSearchResultDto(items=items, total=total, limit=limit, offset=offset)
+            
+        except Exception as e:
+            logger.error(f"Error searching templates: {str(e)}")
+            raise GetTemplateError.database_error(str(e))
+
+
 class GetTemplateByIdUseCase:
     """Use case для получения блока по ID"""
     
@@ -99,6 +183,8 @@ class GetTemplateByIdUseCase:
                 category=block.category,
                 pptxFileUrl=block.pptx_file_url,
                 previewUrl=block.preview_png_url,
+                originalPptxFileUrl=block.original_pptx_file_url,
+                mediaOptimization=block.media_optimization,
                 fields=fields,
                 created_at=block.created_at,
                 updated_at=block.updated_at
@@ -122,12 +208,14 @@ class UploadTemplateBlockUseCase:
         block_repository: ITemplateBlockRepository,
         storage_service: MinIOStorageService,
         pptx_parser: PPTXParser,
-        preview_generator: PreviewGenerator
+        preview_generator: PreviewGenerator,
+        media_optimizer: MediaOptimizer
     ):
         self.block_repository = block_repository
         self.storage_service = storage_service
         self.pptx_parser = pptx_parser
         self.preview_generator = preview_generator
+        self.media_optimizer = media_optimizer
     
     async def execute(
         self, 
@@ -136,7 +224,8 @@ class UploadTemplateBlockUseCase:
         description: Optional[str],
         category: Optional[str],
         file_data: BinaryIO,
-        filename: str
+        filename: str,
+        optimize_media: Optional[bool] = None
     ) -> TemplateBlockDto:
         """
         Загрузить новый блок из PPTX файла
@@ -148,6 +237,7 @@ class UploadTemplateBlockUseCase:
             category: Категория блока
             file_data: Данные PPTX файла
             filename: Имя файла
+            optimize_media: Оптимизировать изображения (None - по настройке MEDIA_OPTIMIZATION_ENABLED)
         
         Returns:
             Созданный блок
@@ -164,24 +254,34 @@ class UploadTemplateBlockUseCase:
             # Генерируем ID для блока
             block_id = uuid4()
             
+            file_data.seek(0)
+            file_bytes = file_data.read()
+            
+            # Оптимизируем изображения; оригинал сохраняется рядом с блоком
+            if optimize_media is None:
+                optimize_media = settings.MEDIA_OPTIMIZATION_ENABLED
+            media_report = None
+            original_pptx_url = None
+            if optimize_media:
+                media_report, file_bytes, original_pptx_url = await self._optimize_media(
+                    block_id, file_bytes, filename
+                )
+            
             # Загружаем PPTX файл в MinIO
             pptx_object_name = f"templates/{block_id}/{filename}"
             pptx_url = await self.storage_service.upload_file(
-                file_data,
+                BytesIO(file_bytes),
                 pptx_object_name,
                 "application/vnd.openxmlformats-officedocument.presentationml.presentation"
             )
             logger.info(f"PPTX file uploaded: {pptx_url}")
             
             # Парсим PPTX для извлечения полей
-            file_data.seek(0)  # Возвращаемся в начало файла
-            file_bytes = file_data.read()
             parsed_data = self.pptx_parser.parse_presentation(file_bytes)
             logger.info(f"Parsed {len(parsed_data)} blocks from PPTX")
             
             # Генерируем превью
-            file_data.seek(0)
-            preview_data = await self.preview_generator.generate_preview(file_data)
+            preview_data = await self.preview_generator.generate_preview(BytesIO(file_bytes))
             preview_object_name = f"templates/{block_id}/preview.png"
             preview_url = await self.storage_service.upload_file(
                 preview_data,
@@ -199,6 +299,8 @@ class UploadTemplateBlockUseCase:
                 category=category,
                 pptx_file_url=pptx_url,
                 preview_png_url=preview_url,
+                original_pptx_file_url=original_pptx_url,
+                media_optimization=media_report,
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
@@ -307,6 +409,8 @@ class UploadTemplateBlockUseCase:
                 category=created_block.category,
                 pptxFileUrl=created_block.pptx_file_url,
                 previewUrl=created_block.preview_png_url,
+                originalPptxFileUrl=created_block.original_pptx_file_url,
+                mediaOptimization=created_block.media_optimization,
                 fields=fields_dto,
                 created_at=created_block.created_at,
                 updated_at=created_block.updated_at
@@ -319,3 +423,33 @@ class UploadTemplateBlockUseCase:
         except Exception as e:
             logger.error(f"Error uploading template block: {str(e)}")
             raise GetTemplateError.database_error(str(e))
+    
+    async def _optimize_media(self, block_id: UUID, file_bytes: bytes, filename: str):
+        """
+        Оптимизирует изображения PPTX файла
+        
+        Ошибка оптимизации не прерывает загрузку: блок сохраняется как есть.
+        
+        Returns:
+            (отчет оптимизации или None, данные PPTX для блока,
+             URL сохраненного оригинала или None, если файл не изменился)
+        """
+        try:
+            optimized_bytes, report = await asyncio.to_thread(self.media_optimizer.optimize, file_bytes)
+        except Exception as e:
+            logger.warning(f"Media optimization failed, uploading block as is: {str(e)}")
+            return None, file_bytes, None
+        
+        if report["saved_bytes"] <= 0:
+            return report, file_bytes, None
+        
+        original_url = await self.storage_service.upload_file(
+            BytesIO(file_bytes),
+            f"templates/{block_id}/original/{filename}",
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+        )
+        logger.info(
+            f"Media optimized: {report['original_size']} -> {report['optimized_size']} bytes, "
+            f"original kept at {original_url}"
+        )
+        return report, optimized_bytes, original_url
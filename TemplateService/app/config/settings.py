@@ -19,6 +19,16 @@ class Settings(BaseSettings):
     JWT_ISSUER: str
     JWT_AUDIENCE: str
     
+    # Оптимизация изображений при загрузке блока (оригинал сохраняется рядом)
+    MEDIA_OPTIMIZATION_ENABLED: bool = True
+    # Пикселей на дюйм отображаемого размера картинки
+    MEDIA_TARGET_DPI: int = 150
+    MEDIA_JPEG_QUALITY: int = 85
+    
+    # Время жизни кеша категорий в памяти (секунды); в своем процессе кеш
+    # сбрасывается сразу при изменении блоков
+    CATEGORIES_CACHE_TTL: int = 60
+    
     # Service
     SERVICE_NAME: str = "template-service"
     SERVICE_HOST: str = "template-service"
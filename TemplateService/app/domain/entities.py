@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, Integer, Text
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, Integer, Text, Computed
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -30,6 +30,24 @@ class TemplateBlock(Base):
     # URL PNG превью блока в MinIO
     preview_png_url = Column(Text, nullable=True)
     
+    # URL исходного PPTX файла, если изображения в pptx_file_url были оптимизированы
+    original_pptx_file_url = Column(Text, nullable=True)
+    
+    # Отчет оптимизации изображений (размеры до/после, измененные изображения)
+    media_optimization = Column(JSONB, nullable=True)
+    
+    # Полнотекстовый индекс: название и описание (русская морфология), код без стемминга.
+    # GIN индекс по нему и триграммные индексы создаются миграцией 004
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(code, '')), 'A') || "
+            "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    )
+    
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
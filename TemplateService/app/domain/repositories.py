@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from app.domain.entities import TemplateBlock, BlockField
 
@@ -27,6 +27,16 @@ class ITemplateBlockRepository(ABC):
         """Получить все блоки (с фильтрацией по категории)"""
         pass
     
+    @abstractmethod
+    async def get_category_counts(self) -> List[Tuple[Optional[str], int]]:
+        """Получить категории с количеством блоков в каждой"""
+        pass
+    
+    @abstractmethod
+    async def search(self, query: str, limit: int, offset: int) -> Tuple[List[Tuple[TemplateBlock, float]], int]:
+        """Найти блоки по тексту; возвращает страницу (блок, релевантность) и общее число найденных"""
+        pass
+    
     @abstractmethod
     async def update(self, block: TemplateBlock) -> TemplateBlock:
         """Обновить блок"""
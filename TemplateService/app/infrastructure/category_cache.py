@@ -0,0 +1,59 @@
+from typing import List, Optional, Tuple
+import threading
+import time
+import logging
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryCache:
+    """
+    Кеш списка категорий с количеством блоков в памяти процесса
+    
+    Сбрасывается репозиторием при любом изменении блоков. TTL ограничивает
+    устаревание, когда блоки меняет другой процесс (несколько воркеров).
+    """
+    
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value: Optional[List[Tuple[Optional[str], int]]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+    
+    @property
+    def generation(self) -> int:
+        """Номер сброса; запоминается перед запросом к БД и передается в set()"""
+        return self._generation
+    
+    def get(self) -> Optional[List[Tuple[Optional[str], int]]]:
+        """Возвращает закешированные категории или None"""
+        with self._lock:
+            if self._value is None or time.monotonic() >= self._expires_at:
+                return None
+            return self._value
+    
+    def set(self, value: List[Tuple[Optional[str], int]], generation: int):
+        """
+        Сохраняет категории
+        
+        Результат запроса, начатого до сброса, не сохраняется: он мог
+        не увидеть изменение, из-за которого кеш был сброшен.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl_seconds
+    
+    def invalidate(self):
+        """Сбрасывает кеш"""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+        logger.debug("Category cache invalidated")
+
+
+category_cache = CategoryCache(settings.CATEGORIES_CACHE_TTL)
@@ -0,0 +1,271 @@
+from pptx import Presentation
+from pptx.opc.packuri import PackURI
+from pptx.oxml.ns import qn
+from pptx.parts.image import ImagePart
+from pptx.shapes.group import GroupShape
+from pptx.shapes.picture import Picture
+from PIL import Image
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class MediaOptimizer:
+    """Оптимизация изображений в PPTX блоках перед сохранением"""
+
+    EMU_PER_INCH = 914400
+
+    # Форматы, которые можно перекодировать без потерь смысла (GIF может быть анимирован, SVG/EMF векторные)
+    RASTER_FORMATS = {"PNG", "JPEG", "BMP", "TIFF"}
+
+    # Уменьшаем, только если изображение больше нужного хотя бы на 10%
+    DOWNSCALE_THRESHOLD = 0.9
+
+    # PNG без прозрачности переводится в JPEG, если JPEG меньше хотя бы в столько раз
+    JPEG_PREFERENCE_RATIO = 0.5
+
+    def __init__(self, target_dpi: int = 150, jpeg_quality: int = 85):
+        """
+        Args:
+            target_dpi: Плотность пикселей на дюйм отображаемого размера
+            jpeg_quality: Качество JPEG при перекодировании
+        """
+        self.target_dpi = target_dpi
+        self.jpeg_quality = jpeg_quality
+
+    def optimize(self, pptx_data: bytes) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Уменьшает изображения блока до отображаемого размера и перекодирует их
+
+        Размер изображения считается по самому крупному его использованию на
+        слайдах, макетах и мастерах (с учетом обрезки и масштаба групп),
+        умноженному на target_dpi, и перекодируется (см. _encode).
+        Изображение, которое используется где-то кроме картинок (например,
+        заливкой фона), не уменьшается: его отображаемый размер неизвестен.
+        Новое изображение сохраняется, только если оно меньше исходного.
+
+        Args:
+            pptx_data: Бинарные данные PPTX файла
+
+        Returns:
+            (данные PPTX - исходные, если ничего не изменилось;
+             отчет: original_size, optimized_size, saved_bytes, images)
+        """
+        prs = Presentation(BytesIO(pptx_data))
+        package = prs.part.package
+
+        usages: Dict[ImagePart, List[Tuple[int, int]]] = {}
+        picture_refs: Set[Tuple[str, str]] = set()
+        for container in [*prs.slide_masters, *prs.slide_layouts, *prs.slides]:
+            self._collect_pictures(container.shapes, 1.0, 1.0, usages, picture_refs)
+
+        images = []
+        for part, sizes in usages.items():
+            if not self._only_used_by_pictures(package, part, picture_refs):
+                logger.info(f"Image {part.partname} is not only used by pictures, skipped")
+                continue
+            result = self._optimize_image(package, part, sizes)
+            if result:
+                images.append(result)
+
+        optimized_data = pptx_data
+        if images:
+            output = BytesIO()
+            prs.save(output)
+            optimized_data = output.getvalue()
+
+        report = {
+            "original_size": len(pptx_data),
+            "optimized_size": len(optimized_data),
+            "saved_bytes": len(pptx_data) - len(optimized_data),
+            "images": images
+        }
+        logger.info(
+            f"Media optimization: {len(images)} of {len(usages)} image(s) optimized, "
+            f"{len(pptx_data)} -> {len(optimized_data)} bytes"
+        )
+        return optimized_data, report
+
+    def _collect_pictures(
+        self,
+        shapes,
+        scale_x: float,
+        scale_y: float,
+        usages: Dict[ImagePart, List[Tuple[int, int]]],
+        picture_refs: Set[Tuple[str, str]]
+    ):
+        """Собирает нужные размеры изображений (в пикселях) по всем картинкам, включая вложенные в группы"""
+        for shape in shapes:
+            if isinstance(shape, GroupShape):
+                group_scale_x, group_scale_y = self._group_scale(shape)
+                self._collect_pictures(
+                    shape.shapes, scale_x * group_scale_x, scale_y * group_scale_y, usages, picture_refs
+                )
+                continue
+            if not isinstance(shape, Picture):
+                continue
+
+            rId = shape._element.blip_rId
+            if not rId:
+                continue  # связанное (внешнее) изображение
+            part = shape.part.related_part(rId)
+            picture_refs.add((str(shape.part.partname), rId))
+            if not isinstance(part, ImagePart) or shape.width is None or shape.height is None:
+                continue
+
+            # Видимая часть после обрезки растягивается на всю картинку
+            visible_x = max(1.0 - shape.crop_left - shape.crop_right, 0.01)
+            visible_y = max(1.0 - shape.crop_top - shape.crop_bottom, 0.01)
+            usages.setdefault(part, []).append((
+                math.ceil(shape.width * scale_x / self.EMU_PER_INCH * self.target_dpi / visible_x),
+                math.ceil(shape.height * scale_y / self.EMU_PER_INCH * self.target_dpi / visible_y)
+            ))
+
+    @staticmethod
+    def _group_scale(group: GroupShape) -> Tuple[float, float]:
+        """Масштаб дочерних фигур группы (размер группы / размер ее системы координат)"""
+        xfrm = group._element.grpSpPr.find(qn("a:xfrm"))
+        if xfrm is None:
+            return 1.0, 1.0
+        ext, ch_ext = xfrm.find(qn("a:ext")), xfrm.find(qn("a:chExt"))
+        if ext is None or ch_ext is None:
+            return 1.0, 1.0
+        scale_x = int(ext.get("cx")) / int(ch_ext.get("cx")) if int(ch_ext.get("cx")) else 1.0
+        scale_y = int(ext.get("cy")) / int(ch_ext.get("cy")) if int(ch_ext.get("cy")) else 1.0
+        return scale_x, scale_y
+
+    @staticmethod
+    def _only_used_by_pictures(package, image_part: ImagePart, picture_refs: Set[Tuple[str, str]]) -> bool:
+        """Проверяет, что все связи на изображение идут от учтенных картинок"""
+        for part in package.iter_parts():
+            for rel in part.rels.values():
+                if rel.is_external or rel.target_part is not image_part:
+                    continue
+                if (str(part.partname), rel.rId) not in picture_refs:
+                    return False
+        return True
+
+    def _optimize_image(
+        self,
+        package,
+        part: ImagePart,
+        sizes: List[Tuple[int, int]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Уменьшает и перекодирует одно изображение
+
+        Returns:
+            Запись отчета или None, если изображение оставлено как есть
+        """
+        original_blob = part.blob
+        try:
+            image = Image.open(BytesIO(original_blob))
+            image.load()
+        except Exception as e:
+            logger.warning(f"Cannot open image {part.partname}: {e}")
+            return None
+
+        original_format = image.format
+        if original_format not in self.RASTER_FORMATS:
+            return None
+        original_width, original_height = image.size
+
+        # Одинаковый масштаб по обеим осям, по самому крупному использованию
+        target_width = max(width for width, _ in sizes)
+        target_height = max(height for _, height in sizes)
+        scale = min(max(target_width / original_width, target_height / original_height), 1.0)
+
+        resized = scale < self.DOWNSCALE_THRESHOLD
+        if not resized and original_format == "JPEG":
+            return None  # повторное сжатие JPEG без уменьшения только теряет качество
+
+        image = self._normalize_mode(image)
+        if resized:
+            image = image.resize(
+                (max(1, round(original_width * scale)), max(1, round(original_height * scale))),
+                Image.LANCZOS
+            )
+
+        blob, ext, content_type = self._encode(image, original_format)
+        if len(blob) >= len(original_blob):
+            return None
+
+        original_partname = str(part.partname)
+        part._blob = blob
+        if ext != part.partname.ext:
+            self._rename_part(package, part, ext, content_type)
+
+        return {
+            "name": original_partname,
+            "optimized_name": str(part.partname),
+            "original": {"format": original_format, "width": original_width, "height": original_height, "size": len(original_blob)},
+            "optimized": {"format": ext.upper(), "width": image.width, "height": image.height, "size": len(blob)}
+        }
+
+    @staticmethod
+    def _normalize_mode(image: Image.Image) -> Image.Image:
+        """Приводит изображение к RGB/RGBA/L; непрозрачный альфа-канал отбрасывается"""
+        if image.mode == "P":
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        elif image.mode == "LA":
+            image = image.convert("RGBA")
+        elif image.mode not in ("RGB", "RGBA", "L", "CMYK"):
+            image = image.convert("RGB")
+        if image.mode == "RGBA" and image.getchannel("A").getextrema()[0] == 255:
+            image = image.convert("RGB")
+        return image
+
+    def _encode(self, image: Image.Image, original_format: str) -> Tuple[bytes, str, str]:
+        """
+        Кодирует изображение
+
+        JPEG остается JPEG. Остальное сохраняется в оптимизированный PNG
+        (с палитрой, если цветов не больше 256); непрозрачное изображение с
+        большим числом цветов сохраняется в JPEG, только если он хотя бы вдвое
+        меньше PNG - это фотографии и градиенты, а скриншоты с текстом
+        остаются PNG без артефактов сжатия.
+
+        Returns:
+            (данные, расширение, content type)
+        """
+        if original_format == "JPEG":
+            return self._encode_jpeg(image), "jpeg", "image/jpeg"
+
+        few_colors = image.mode != "CMYK" and image.getcolors(256) is not None
+        png_image = image
+        if few_colors and image.mode in ("RGB", "L"):
+            png_image = image.convert("P", palette=Image.ADAPTIVE, colors=256)
+        elif image.mode == "CMYK":
+            png_image = image.convert("RGB")
+        output = BytesIO()
+        png_image.save(output, format="PNG", optimize=True)
+        png_blob = output.getvalue()
+
+        if image.mode != "RGBA" and not few_colors:
+            jpeg_blob = self._encode_jpeg(image)
+            if len(jpeg_blob) < len(png_blob) * self.JPEG_PREFERENCE_RATIO:
+                return jpeg_blob, "jpeg", "image/jpeg"
+        return png_blob, "png", "image/png"
+
+    def _encode_jpeg(self, image: Image.Image) -> bytes:
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        return output.getvalue()
+
+    @staticmethod
+    def _rename_part(package, part: ImagePart, ext: str, content_type: str):
+        """Меняет расширение имени части изображения вслед за форматом"""
+        existing = {str(p.partname) for p in package.iter_parts()}
+        partname = PackURI(f"{part.partname[:-len(part.partname.ext)]}{ext}")
+        if str(partname) in existing:
+            partname = package.next_image_partname(ext)
+        part.partname = partname
+        part._content_type = content_type
+        # Относительные ссылки в .rels кэшируются при первом обращении - сбрасываем
+        for source in package.iter_parts():
+            for rel in source.rels.values():
+                if not rel.is_external and rel.target_part is part:
+                    rel.__dict__.pop("target_ref", None)
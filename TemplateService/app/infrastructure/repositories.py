@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy import and_, func, case, desc, select, union
 from app.domain.entities import TemplateBlock, BlockField
 from app.domain.repositories import ITemplateBlockRepository, IBlockFieldRepository
+from app.infrastructure.category_cache import category_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,7 @@ class TemplateBlockRepository(ITemplateBlockRepository):
         """Создает новый блок"""
         self.db.add(block)
         self.db.commit()
+        category_cache.invalidate()
         self.db.refresh(block)
         logger.info(f"Created template block: {block.id} (code: {block.code})")
         return block
@@ -47,9 +49,76 @@ class TemplateBlockRepository(ITemplateBlockRepository):
         
         return query.all()
     
+    async def get_category_counts(self) -> List[Tuple[Optional[str], int]]:
+        """Получает категории с количеством блоков (GROUP BY по индексу category)"""
+        rows = self.db.query(TemplateBlock.category, func.count(TemplateBlock.id))\
+            .group_by(TemplateBlock.category)\
+            .order_by(TemplateBlock.category.asc().nulls_last())\
+            .all()
+        return [(category, count) for category, count in rows]
+    
+    async def search(self, query: str, limit: int, offset: int) -> Tuple[List[Tuple[TemplateBlock, float]], int]:
+        """
+        Ищет блоки по названию, описанию, коду и ключам полей
+        
+        Кандидаты собираются объединением (UNION) отдельных выборок, каждая
+        из которых обслуживается своим индексом: полнотекстовым
+        (search_vector) и триграммными (ILIKE по подстроке в названии,
+        описании, коде и ключах полей, нечеткое совпадение слов в названии).
+        Одно условие OR с подзапросом по полям индексами не обслуживается и
+        превращается в полный проход по template_blocks. Релевантность
+        считается только для кандидатов и складывается из ранга
+        полнотекстового поиска, похожести на название/код и бонуса за
+        совпадение в ключах полей.
+        """
+        ts_query = func.websearch_to_tsquery('russian', query)
+        pattern = f"%{self._escape_like(query)}%"
+        
+        field_matches = select(BlockField.block_id).where(BlockField.field_key.ilike(pattern, escape='\\'))
+        candidates = union(
+            select(TemplateBlock.id).where(TemplateBlock.search_vector.op('@@')(ts_query)),
+            select(TemplateBlock.id).where(TemplateBlock.name.ilike(pattern, escape='\\')),
+            select(TemplateBlock.id).where(TemplateBlock.code.ilike(pattern, escape='\\')),
+            select(TemplateBlock.id).where(TemplateBlock.description.ilike(pattern, escape='\\')),
+            select(TemplateBlock.id).where(TemplateBlock.name.op('%>')(query)),
+            field_matches
+        )
+        matches = TemplateBlock.id.in_(candidates)
+        rank = (
+            func.ts_rank_cd(TemplateBlock.search_vector, ts_query)
+            + func.greatest(
+                func.word_similarity(query, TemplateBlock.name),
+                func.word_similarity(query, TemplateBlock.code)
+            )
+            + case((TemplateBlock.id.in_(field_matches), 0.1), else_=0.0)
+        ).label("rank")
+        
+        rows = self.db.query(TemplateBlock, rank, func.count().over().label("total"))\
+            .filter(matches)\
+            .order_by(desc("rank"), TemplateBlock.name, TemplateBlock.id)\
+            .limit(limit)\
+            .offset(offset)\
+            .all()
+        
+        if rows:
+            total = rows[0].total
+        elif offset > 0:
+            # Страница за пределами результатов - общее число считаем отдельно
+            total = self.db.query(func.count(TemplateBlock.id)).filter(matches).scalar()
+        else:
+            total = 0
+        
+        return [(row.TemplateBlock, float(row.rank)) for row in rows], total
+    
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Экранирует спецсимволы LIKE, чтобы '_' в ключах искался буквально"""
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    
     async def update(self, block: TemplateBlock) -> TemplateBlock:
         """Обновляет блок"""
         self.db.commit()
+        category_cache.invalidate()
         self.db.refresh(block)
         logger.info(f"Updated template block: {block.id}")
         return block
@@ -62,6 +131,7 @@ class TemplateBlockRepository(ITemplateBlockRepository):
         
         self.db.delete(block)
         self.db.commit()
+        category_cache.invalidate()
         logger.info(f"Deleted template block: {block_id}")
         return True
 
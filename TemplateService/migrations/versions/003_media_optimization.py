@@ -0,0 +1,26 @@
+"""Add original PPTX and media optimization report to template blocks
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('template_blocks', sa.Column('original_pptx_file_url', sa.Text(), nullable=True))
+    op.add_column('template_blocks', sa.Column('media_optimization', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('template_blocks', 'media_optimization')
+    op.drop_column('template_blocks', 'original_pptx_file_url')
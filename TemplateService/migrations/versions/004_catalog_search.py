@@ -0,0 +1,56 @@
+"""Add full-text and trigram search over the template catalog
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(code, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')"
+)
+
+TRIGRAM_INDEXES = [
+    ('ix_template_blocks_name_trgm', 'template_blocks', 'name'),
+    ('ix_template_blocks_description_trgm', 'template_blocks', 'description'),
+    ('ix_template_blocks_code_trgm', 'template_blocks', 'code'),
+    ('ix_block_fields_field_key_trgm', 'block_fields', 'field_key'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    op.add_column(
+        'template_blocks',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True))
+    )
+    op.create_index(
+        'ix_template_blocks_search_vector', 'template_blocks', ['search_vector'], postgresql_using='gin'
+    )
+    
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name, table_name, [column_name],
+            postgresql_using='gin',
+            postgresql_ops={column_name: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in TRIGRAM_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
+    
+    op.drop_index('ix_template_blocks_search_vector', table_name='template_blocks')
+    op.drop_column('template_blocks', 'search_vector')
@@ -6,8 +6,8 @@ Template Manager - Консольный скрипт для работы с ка
     python template_manager.py --help
     python template_manager.py list [--category <category>]
     python template_manager.py show <block-id>
-    python template_manager.py search <query>
-    python template_manager.py upload <file> --code <code> --name <name> [--description <desc>] [--category <cat>]
+    python template_manager.py search <query> [--limit <n>] [--offset <n>]
+    python template_manager.py upload <file> --code <code> --name <name> [--description <desc>] [--category <cat>] [--no-optimize-media]
     python template_manager.py categories
     python template_manager.py interactive
 """
@@ -72,13 +72,44 @@ class TemplateServiceClient:
         response.raise_for_status()
         return response.json()
     
+    def get_categories(self) -> List[Dict[str, Any]]:
+        """
+        Получить категории с количеством блоков
+        
+        Returns:
+            Список категорий в формате: [{category, count}]
+        """
+        response = self.session.get(f"{self.base_url}/api/Templates/categories")
+        response.raise_for_status()
+        return response.json()
+    
+    def search_blocks(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Найти блоки на сервере
+        
+        Args:
+            query: Поисковый запрос
+            limit: Размер страницы
+            offset: Смещение от начала результатов
+        
+        Returns:
+            Страница результатов: {items, total, limit, offset}
+        """
+        response = self.session.get(
+            f"{self.base_url}/api/Templates/search",
+            params={'q': query, 'limit': limit, 'offset': offset}
+        )
+        response.raise_for_status()
+        return response.json()
+    
     def upload_block(
         self, 
         file_path: str, 
         code: str, 
         name: str, 
         description: Optional[str] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        optimize_media: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Загрузить новый блок из PPTX файла
@@ -89,6 +120,7 @@ class TemplateServiceClient:
             name: Название блока
             description: Описание блока
             category: Категория блока
+            optimize_media: Оптимизировать изображения (None - по настройке сервиса)
         
         Returns:
             Информация о созданном блоке
@@ -103,6 +135,8 @@ class TemplateServiceClient:
                 data['description'] = description
             if category:
                 data['category'] = category
+            if optimize_media is not None:
+                data['optimize_media'] = str(optimize_media).lower()
             
             response = self.session.post(
                 f"{self.base_url}/api/Templates",
@@ -257,7 +291,7 @@ class TemplateManager:
         except Exception as e:
             print(f"❌ Ошибка: {e}")
     
-    def search_blocks(self, query: str):
+    def search_blocks(self, query: str, limit: int = 20, offset: int = 0):
         """Поиск блоков по запросу"""
         print("=" * 80)
         print(f"🔍 ПОИСК: '{query}'")
@@ -265,20 +299,18 @@ class TemplateManager:
         print()
         
         try:
-            all_blocks = self.client.get_blocks()
-            
-            # Простой поиск по коду и названию
-            query_lower = query.lower()
-            found_blocks = [
-                block for block in all_blocks
-                if query_lower in block['code'].lower() or query_lower in block['name'].lower()
-            ]
+            result = self.client.search_blocks(query, limit=limit, offset=offset)
+            found_blocks = result['items']
             
             if not found_blocks:
-                print(f"📭 Блоки не найдены по запросу '{query}'")
+                if result['total']:
+                    print(f"📭 На этой странице нет блоков (всего найдено: {result['total']})")
+                else:
+                    print(f"📭 Блоки не найдены по запросу '{query}'")
                 return
             
-            print(f"📊 Найдено блоков: {len(found_blocks)}")
+            print(f"📊 Найдено блоков: {result['total']} "
+                  f"(показаны {offset + 1}-{offset + len(found_blocks)})")
             print()
             
             table_data = []
@@ -287,19 +319,22 @@ class TemplateManager:
                     block['id'][:8] + '...',
                     block['code'][:30],
                     block['name'][:40],
-                    block.get('category', 'N/A')[:15]
+                    (block.get('category') or 'N/A')[:15],
+                    f"{block['rank']:.2f}"
                 ])
             
             print(tabulate(table_data,
-                          headers=['ID (short)', 'Code', 'Name', 'Category'],
+                          headers=['ID (short)', 'Code', 'Name', 'Category', 'Rank'],
                           tablefmt='grid'))
             print()
+            if offset + len(found_blocks) < result['total']:
+                print(f"💡 Следующая страница: python template_manager.py search \"{query}\" --offset {offset + limit}")
             print("💡 Для просмотра деталей: python template_manager.py show <block-id>")
             
         except Exception as e:
             print(f"❌ Ошибка поиска: {e}")
     
-    def upload_block(self, file_path: str, code: str, name: str, description: Optional[str] = None, category: Optional[str] = None):
+    def upload_block(self, file_path: str, code: str, name: str, description: Optional[str] = None, category: Optional[str] = None, optimize_media: Optional[bool] = None):
         """Загрузить новый блок из PPTX файла"""
         print("=" * 80)
         print("📤 ЗАГРУЗКА НОВОГО БЛОКА")
@@ -334,7 +369,8 @@ class TemplateManager:
                 code=code,
                 name=name,
                 description=description,
-                category=category
+                category=category,
+                optimize_media=optimize_media
             )
             
             print()
@@ -346,6 +382,13 @@ class TemplateManager:
             print(f"   📎 PPTX URL:     {result['pptxFileUrl']}")
             print(f"   🖼️  Preview URL:  {result.get('previewUrl', 'N/A')}")
             print(f"   🏷️  Fields:       {len(result.get('fields', []))} полей")
+            
+            media = result.get('mediaOptimization')
+            if media and media.get('saved_bytes', 0) > 0:
+                percent = media['saved_bytes'] * 100 / media['original_size']
+                print(f"   🗜️  Media:        {len(media['images'])} изображений оптимизировано, "
+                      f"{media['original_size'] / 1024:.0f} KB -> {media['optimized_size'] / 1024:.0f} KB (-{percent:.0f}%)")
+                print(f"   📦 Original URL: {result.get('originalPptxFileUrl')}")
             print()
             print(f"💡 Для просмотра деталей: python template_manager.py show {result['id']}")
             
@@ -459,21 +502,16 @@ class TemplateManager:
         print()
         
         try:
-            blocks = self.client.get_blocks()
-            
-            categories = {}
-            for block in blocks:
-                cat = block.get('category', 'uncategorized')
-                categories[cat] = categories.get(cat, 0) + 1
+            categories = self.client.get_categories()
             
             if not categories:
                 print("📭 Нет категорий")
                 return
             
             table_data = []
-            for cat, count in sorted(categories.items()):
-                cat_display = cat if cat else 'Без категории'
-                table_data.append([cat_display, count])
+            for item in categories:
+                cat_display = item['category'] if item['category'] else 'Без категории'
+                table_data.append([cat_display, item['count']])
             
             print(tabulate(table_data,
                           headers=['Category', 'Blocks'],
@@ -530,6 +568,8 @@ def main():
     # Search command
     search_parser = subparsers.add_parser('search', help='Поиск блоков')
     search_parser.add_argument('query', help='Поисковый запрос')
+    search_parser.add_argument('--limit', type=int, default=20, help='Размер страницы (по умолчанию 20)')
+    search_parser.add_argument('--offset', type=int, default=0, help='Смещение от начала результатов')
     
     # Upload command
     upload_parser = subparsers.add_parser('upload', help='Загрузить новый блок из PPTX файла')
@@ -538,6 +578,11 @@ def main():
     upload_parser.add_argument('--name', required=True, help='Название блока')
     upload_parser.add_argument('--description', help='Описание блока')
     upload_parser.add_argument('--category', help='Категория блока')
+    upload_parser.add_argument(
+        '--no-optimize-media',
+        action='store_true',
+        help='Не оптимизировать изображения (сохранить файл как есть)'
+    )
     
     # Categories command
     subparsers.add_parser('categories', help='Показать список категорий')
@@ -562,7 +607,7 @@ def main():
         manager.show_block(args.block_id)
     
     elif args.command == 'search':
-        manager.search_blocks(args.query)
+        manager.search_blocks(args.query, limit=args.limit, offset=args.offset)
     
     elif args.command == 'upload':
         manager.upload_block(
@@ -570,7 +615,8 @@ def main():
             code=args.code,
             name=args.name,
             description=getattr(args, 'description', None),
-            category=getattr(args, 'category', None)
+            category=getattr(args, 'category', None),
+            optimize_media=False if args.no_optimize_media else None
         )
     
     elif args.command == 'categories':
@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     mistral_api_key: str
     mistral_agent_id: str
     mistral_agent_tkp_id: str
+    mistral_server_url: Optional[str] = None  # Свой адрес API (прокси, локальный мок); по умолчанию — облако Mistral
     
     # Service
     service_name: str = "document-analysis-service"
@@ -2,6 +2,7 @@ import uuid
 import json
 import logging
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.models import AnalysisResult, BacklogItem, TKPItem
 from app.services.minio_service import MinIOService
@@ -14,13 +15,24 @@ logger = logging.getLogger(__name__)
 
 
 class AnalysisHandler:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        kafka_service: Optional[KafkaService] = None,
+        minio_service: Optional[MinIOService] = None
+    ):
+        """
+        Args:
+            db: Сессия БД
+            kafka_service: Сервис для публикации событий (по умолчанию создаётся свой)
+            minio_service: Хранилище файлов (по умолчанию создаётся свой клиент MinIO)
+        """
         self.db = db
-        self.minio_service = MinIOService()
+        self.minio_service = minio_service or MinIOService()
         self.mistral_service = MistralService()
         self.mistral_tkp_service = MistralTKPService()
         self.document_parser = DocumentParser()
-        self.kafka_service = KafkaService()
+        self.kafka_service = kafka_service or KafkaService()
     
     def process_file_uploaded(self, event: dict):
         """Обрабатывает событие FileUploaded"""
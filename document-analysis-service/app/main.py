@@ -1,8 +1,10 @@
 import logging
+from typing import Optional
 from app.config.settings import settings
 from app.config.database import SessionLocal
 from app.handlers.analysis_handler import AnalysisHandler
 from app.services.kafka_service import KafkaService
+from app.services.minio_service import MinIOService
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
@@ -11,15 +13,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def process_messages():
-    """Основной цикл обработки сообщений из Kafka"""
-    kafka_service = KafkaService()
+def process_messages(kafka_service: Optional[KafkaService] = None, minio_service: Optional[MinIOService] = None):
+    """
+    Основной цикл обработки сообщений из Kafka
+    
+    Args:
+        kafka_service: Источник событий и публикация результатов (по умолчанию — Kafka из настроек)
+        minio_service: Хранилище файлов (по умолчанию — MinIO из настроек)
+    """
+    kafka_service = kafka_service or KafkaService()
     db = SessionLocal()
     
     try:
         logger.info(f"Starting to consume messages from topic: {settings.kafka_topic_file_uploaded}")
         
-        handler = AnalysisHandler(db)
+        # Обработчик публикует через тот же KafkaService: второй consumer в той же группе
+        # забирал бы себе партиции, которые никто не читает
+        handler = AnalysisHandler(db, kafka_service, minio_service)
         
         for event in kafka_service.consume_file_uploaded():
             logger.info(f"Received FileUploaded event: {event}")
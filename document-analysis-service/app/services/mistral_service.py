@@ -32,7 +32,7 @@ class MistralService:
         """Получает backlog из Mistral AI, возвращает (backlog_dict, conversation_id)"""
         try:
             logger.info(f"Attempting to get backlog from Mistral AI (retry enabled)")
-            with Mistral(api_key=self.api_key) as mistral:
+            with Mistral(api_key=self.api_key, server_url=settings.mistral_server_url) as mistral:
                 messages = [
                     {
                         "content": f"[ТЕХНИЧЕСКОЕ ЗАДАНИЕ]\n{tz_text}\n\nВАЖНО: Для каждой работы (work_number) обязательно укажи критерии приёмки (acceptance_criteria). Критерии приёмки должны быть конкретными и измеримыми.",
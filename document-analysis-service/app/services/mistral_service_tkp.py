@@ -34,7 +34,7 @@ class MistralTKPService:
         """Получает ТКП из Mistral AI (продолжение разговора)"""
         try:
             logger.info(f"Attempting to get TKP from Mistral AI (retry enabled)")
-            with Mistral(api_key=self.api_key) as mistral:
+            with Mistral(api_key=self.api_key, server_url=settings.mistral_server_url) as mistral:
                 messages = [
                     {
                         "content": f"[ТЕХНИЧЕСКОЕ ЗАДАНИЕ]\n{tz_text}\n\nТеперь сформируй технико-коммерческое предложение (ТКП) на основе этого ТЗ.",
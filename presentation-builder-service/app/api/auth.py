@@ -1,8 +1,15 @@
 """Authentication utilities"""
-from typing import Optional
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import Header, HTTPException, status
 import jwt
-from jwt.exceptions import InvalidTokenError
+from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, InvalidTokenError
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
 import logging
 
 from app.config.settings import settings
@@ -10,6 +17,162 @@ from app.config.settings import settings
 logger = logging.getLogger(__name__)
 
 
+class TokenVerifier:
+    """
+    RS256 token verifier with parsed keys and a cache of verified tokens
+    
+    Public keys are decoded once; the current key is tried first, then any
+    previous keys still accepted during rotation. Successfully verified
+    tokens are kept in a bounded LRU keyed by the token digest until their
+    `exp`, so repeat callers skip the signature check entirely.
+    """
+    
+    def __init__(
+        self,
+        public_key: str,
+        previous_public_keys: Optional[List[str]] = None,
+        algorithm: str = "RS256",
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None,
+        cache_size: int = 10000,
+        max_cache_ttl: float = 300.0
+    ):
+        """
+        Initialize verifier
+        
+        Args:
+            public_key: Current base64-encoded DER public key
+            previous_public_keys: Base64-encoded DER keys still accepted during rotation
+            algorithm: JWT signing algorithm
+            audience: Expected audience
+            issuer: Expected issuer
+            cache_size: Maximum number of verified tokens to remember (0 disables the cache)
+            max_cache_ttl: Upper bound in seconds for caching a token (used when it has no exp)
+        """
+        self.algorithm = algorithm
+        self.audience = audience
+        self.issuer = issuer
+        self.cache_size = cache_size
+        self.max_cache_ttl = max_cache_ttl
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._keys: List[Any] = []
+        self.load_keys(public_key, previous_public_keys)
+    
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        """Create a verifier from application settings"""
+        return cls(
+            public_key=settings.JWT_PUBLIC_KEY,
+            previous_public_keys=settings.jwt_previous_public_keys,
+            algorithm=settings.JWT_ALGORITHM,
+            audience=settings.JWT_AUDIENCE,
+            issuer=settings.JWT_ISSUER,
+            cache_size=settings.JWT_CACHE_SIZE,
+            max_cache_ttl=settings.JWT_CACHE_MAX_TTL
+        )
+    
+    @staticmethod
+    def _parse_key(encoded_key: str):
+        return serialization.load_der_public_key(
+            base64.b64decode(encoded_key),
+            backend=default_backend()
+        )
+    
+    def load_keys(self, public_key: str, previous_public_keys: Optional[List[str]] = None):
+        """
+        Replace the accepted keys (key rotation)
+        
+        The verified-token cache is cleared so tokens signed with a dropped
+        key are re-checked.
+        
+        Args:
+            public_key: Current base64-encoded DER public key
+            previous_public_keys: Base64-encoded DER keys still accepted
+        """
+        keys = []
+        for encoded_key in [public_key, *(previous_public_keys or [])]:
+            if not encoded_key:
+                continue
+            try:
+                keys.append(self._parse_key(encoded_key))
+            except Exception as e:
+                logger.error(f"Failed to load JWT public key: {e}")
+        
+        if not keys:
+            logger.warning("No JWT public keys loaded, all tokens will be rejected")
+        
+        with self._lock:
+            self._keys = keys
+            self._cache.clear()
+        logger.info(f"Loaded {len(keys)} JWT public key(s)")
+    
+    def _decode(self, token: str) -> Dict[str, Any]:
+        if not self._keys:
+            raise InvalidTokenError("No public key configured")
+        
+        last_error: Optional[InvalidSignatureError] = None
+        for key in self._keys:
+            try:
+                return jwt.decode(
+                    token,
+                    key,
+                    algorithms=[self.algorithm],
+                    audience=self.audience,
+                    issuer=self.issuer
+                )
+            except InvalidSignatureError as e:
+                # Try the next key; any other error is independent of the key
+                last_error = e
+        raise last_error
+    
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its payload
+        
+        Args:
+            token: Encoded JWT
+            
+        Returns:
+            Token payload
+            
+        Raises:
+            InvalidTokenError: If the token is invalid or expired
+        """
+        now = time.time()
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        
+        if self.cache_size > 0:
+            with self._lock:
+                entry = self._cache.get(cache_key)
+                if entry is not None:
+                    expires_at, payload = entry
+                    if expires_at > now:
+                        self._cache.move_to_end(cache_key)
+                        return payload
+                    del self._cache[cache_key]
+                    if "exp" in payload and payload["exp"] <= now:
+                        raise ExpiredSignatureError("Signature has expired")
+        
+        payload = self._decode(token)
+        
+        if self.cache_size > 0:
+            expires_at = now + self.max_cache_ttl
+            if isinstance(payload.get("exp"), (int, float)):
+                expires_at = min(expires_at, float(payload["exp"]))
+            with self._lock:
+                self._cache[cache_key] = (expires_at, payload)
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return payload
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Get cache size statistics"""
+        return {"size": len(self._cache), "max_size": self.cache_size}
+
+
 async def verify_jwt_token_optional(authorization: Optional[str] = Header(None)) -> Optional[str]:
     """
     Verify JWT token from Authorization header (optional)
@@ -1,83 +1,122 @@
 """FastAPI dependencies"""
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-import jwt
+from fastapi import Depends, HTTPException, status, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from jwt.exceptions import InvalidTokenError
 import logging
 
 from app.config.database import get_db
-from app.config.settings import settings
+from app.api.auth import TokenVerifier
 
 logger = logging.getLogger(__name__)
 from app.infrastructure.repositories import (
     PresentationRepository,
     SlideRepository,
     BlockRepository,
-    BlockValueRepository
+    BlockValueRepository,
+    GenerationJobRepository,
+    PresentationVersionRepository
 )
-from app.infrastructure.storage import MinIOStorageService
+from app.infrastructure.storage import AsyncMinIOStorageService
 from app.infrastructure.template_client import TemplateServiceClient
 from app.infrastructure.project_client import ProjectServiceClient
+from app.infrastructure.master_template import MasterTemplateCache
+from app.infrastructure.block_cache import BlockCache
+from app.infrastructure.office_renderer import OfficeRenderer
+from app.infrastructure.single_flight import SingleFlight
 from app.application.use_cases import (
     PresentationUseCase,
     SlideUseCase,
     BlockUseCase,
-    GenerationUseCase
+    GenerationUseCase,
+    ThumbnailUseCase,
+    ExportUseCase,
+    VersionUseCase
 )
 
 
 # Repository dependencies
-def get_presentation_repository(db: Session = Depends(get_db)) -> PresentationRepository:
+def get_presentation_repository(db: AsyncSession = Depends(get_db)) -> PresentationRepository:
     """Get presentation repository"""
     return PresentationRepository(db)
 
 
-def get_slide_repository(db: Session = Depends(get_db)) -> SlideRepository:
+def get_slide_repository(db: AsyncSession = Depends(get_db)) -> SlideRepository:
     """Get slide repository"""
     return SlideRepository(db)
 
 
-def get_block_repository(db: Session = Depends(get_db)) -> BlockRepository:
+def get_block_repository(db: AsyncSession = Depends(get_db)) -> BlockRepository:
     """Get block repository"""
     return BlockRepository(db)
 
 
-def get_block_value_repository(db: Session = Depends(get_db)) -> BlockValueRepository:
+def get_block_value_repository(db: AsyncSession = Depends(get_db)) -> BlockValueRepository:
     """Get block value repository"""
     return BlockValueRepository(db)
 
 
+def get_generation_job_repository(db: AsyncSession = Depends(get_db)) -> GenerationJobRepository:
+    """Get generation job repository"""
+    return GenerationJobRepository(db)
+
+
+def get_version_repository(db: AsyncSession = Depends(get_db)) -> PresentationVersionRepository:
+    """Get presentation version repository"""
+    return PresentationVersionRepository(db)
+
+
 # Service dependencies
-def get_storage_service() -> MinIOStorageService:
-    """Get MinIO storage service"""
-    return MinIOStorageService()
+def get_storage_service(request: Request) -> AsyncMinIOStorageService:
+    """Get app-scoped MinIO storage service"""
+    return request.app.state.storage_service
+
+
+def get_template_client(request: Request) -> TemplateServiceClient:
+    """Get app-scoped template service client"""
+    return request.app.state.template_client
+
+
+def get_project_client(request: Request) -> ProjectServiceClient:
+    """Get app-scoped project service client"""
+    return request.app.state.project_client
 
 
-def get_template_client() -> TemplateServiceClient:
-    """Get template service client"""
-    return TemplateServiceClient()
+def get_master_template_cache(request: Request) -> MasterTemplateCache:
+    """Get app-scoped master template cache"""
+    return request.app.state.master_template_cache
 
 
-def get_project_client() -> ProjectServiceClient:
-    """Get project service client"""
-    return ProjectServiceClient()
+def get_block_cache(request: Request) -> BlockCache:
+    """Get app-scoped template block cache"""
+    return request.app.state.block_cache
+
+
+def get_office_renderer(request: Request) -> OfficeRenderer:
+    """Get app-scoped LibreOffice renderer pool"""
+    return request.app.state.office_renderer
+
+
+def get_render_flights(request: Request) -> SingleFlight:
+    """Get app-scoped in-flight renders (collapses identical concurrent conversions)"""
+    return request.app.state.render_flights
 
 
 # Use case dependencies
 def get_presentation_use_case(
     presentation_repo: PresentationRepository = Depends(get_presentation_repository),
-    storage_service: MinIOStorageService = Depends(get_storage_service),
-    project_client: ProjectServiceClient = Depends(get_project_client)
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service),
+    project_client: ProjectServiceClient = Depends(get_project_client),
+    master_template_cache: MasterTemplateCache = Depends(get_master_template_cache)
 ) -> PresentationUseCase:
     """Get presentation use case"""
-    return PresentationUseCase(presentation_repo, storage_service, project_client)
+    return PresentationUseCase(presentation_repo, storage_service, project_client, master_template_cache)
 
 
 def get_slide_use_case(
     presentation_repo: PresentationRepository = Depends(get_presentation_repository),
     slide_repo: SlideRepository = Depends(get_slide_repository),
-    storage_service: MinIOStorageService = Depends(get_storage_service)
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service)
 ) -> SlideUseCase:
     """Get slide use case"""
     return SlideUseCase(presentation_repo, slide_repo, storage_service)
@@ -88,8 +127,9 @@ def get_block_use_case(
     slide_repo: SlideRepository = Depends(get_slide_repository),
     block_repo: BlockRepository = Depends(get_block_repository),
     value_repo: BlockValueRepository = Depends(get_block_value_repository),
-    storage_service: MinIOStorageService = Depends(get_storage_service),
-    template_client: TemplateServiceClient = Depends(get_template_client)
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service),
+    template_client: TemplateServiceClient = Depends(get_template_client),
+    block_cache: BlockCache = Depends(get_block_cache)
 ) -> BlockUseCase:
     """Get block use case"""
     return BlockUseCase(
@@ -98,24 +138,65 @@ def get_block_use_case(
         block_repo,
         value_repo,
         storage_service,
-        template_client
+        template_client,
+        block_cache
     )
 
 
 def get_generation_use_case(
     presentation_repo: PresentationRepository = Depends(get_presentation_repository),
-    storage_service: MinIOStorageService = Depends(get_storage_service)
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service),
+    slide_repo: SlideRepository = Depends(get_slide_repository),
+    template_client: TemplateServiceClient = Depends(get_template_client),
+    block_cache: BlockCache = Depends(get_block_cache),
+    job_repo: GenerationJobRepository = Depends(get_generation_job_repository)
 ) -> GenerationUseCase:
     """Get generation use case"""
-    return GenerationUseCase(presentation_repo, storage_service)
+    return GenerationUseCase(presentation_repo, storage_service, slide_repo, template_client, block_cache, job_repo)
+
+
+def get_thumbnail_use_case(
+    presentation_repo: PresentationRepository = Depends(get_presentation_repository),
+    slide_repo: SlideRepository = Depends(get_slide_repository),
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service),
+    template_client: TemplateServiceClient = Depends(get_template_client),
+    renderer: OfficeRenderer = Depends(get_office_renderer),
+    block_cache: BlockCache = Depends(get_block_cache),
+    flights: SingleFlight = Depends(get_render_flights)
+) -> ThumbnailUseCase:
+    """Get thumbnail use case"""
+    return ThumbnailUseCase(
+        presentation_repo, slide_repo, storage_service, template_client, renderer, block_cache, flights
+    )
+
+
+def get_export_use_case(
+    presentation_repo: PresentationRepository = Depends(get_presentation_repository),
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service),
+    renderer: OfficeRenderer = Depends(get_office_renderer),
+    flights: SingleFlight = Depends(get_render_flights)
+) -> ExportUseCase:
+    """Get export use case"""
+    return ExportUseCase(presentation_repo, storage_service, renderer, flights)
+
+
+def get_version_use_case(
+    presentation_repo: PresentationRepository = Depends(get_presentation_repository),
+    slide_repo: SlideRepository = Depends(get_slide_repository),
+    version_repo: PresentationVersionRepository = Depends(get_version_repository),
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service)
+) -> VersionUseCase:
+    """Get version use case"""
+    return VersionUseCase(presentation_repo, slide_repo, version_repo, storage_service)
 
 
 # JWT authentication dependency
-async def verify_jwt_token(authorization: Optional[str] = Header(None)) -> str:
+async def verify_jwt_token(request: Request, authorization: Optional[str] = Header(None)) -> str:
     """
     Verify JWT token from Authorization header
     
     Args:
+        request: Incoming request (used to reach the app-scoped token verifier)
         authorization: Authorization header value
         
     Returns:
@@ -148,30 +229,11 @@ async def verify_jwt_token(authorization: Optional[str] = Header(None)) -> str:
                 detail="Invalid authentication scheme"
             )
         
-        # Prepare public key for RSA verification
-        from cryptography.hazmat.primitives import serialization
-        from cryptography.hazmat.backends import default_backend
-        import base64
-        
-        # Decode public key from base64
-        public_key_bytes = base64.b64decode(settings.JWT_PUBLIC_KEY)
-        
-        # Load the public key
-        public_key = serialization.load_der_public_key(
-            public_key_bytes,
-            backend=default_backend()
-        )
-        
-        # Verify token with RSA public key
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=[settings.JWT_ALGORITHM],
-            audience=settings.JWT_AUDIENCE,
-            issuer=settings.JWT_ISSUER
-        )
+        # Verify token with the cached RSA public key(s)
+        verifier: TokenVerifier = request.app.state.token_verifier
+        payload = verifier.verify(token)
         
-        logger.info(f"JWT token validated successfully for user: {payload.get('http://schemas.xmlsoap.org/ws/2005/05/identity/claims/nameidentifier', 'unknown')}")
+        logger.debug(f"JWT token validated successfully for user: {payload.get('http://schemas.xmlsoap.org/ws/2005/05/identity/claims/nameidentifier', 'unknown')}")
         return token
         
     except ValueError as e:
@@ -1,38 +1,55 @@
 """API routes for Presentation Builder Service"""
+import base64
 import logging
-from typing import List
+from email.utils import format_datetime
+from typing import List, Optional, Tuple
+from urllib.parse import quote
 from uuid import UUID
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse, JSONResponse
-import io
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse, JSONResponse, RedirectResponse
 
 from app.application.dtos import (
     CreatePresentationRequest,
     AddSlideRequest,
+    MoveSlideRequest,
     AddBlockRequest,
     UpdateBlockValuesRequest,
     PresentationResponse,
     SlideResponse,
     BlockResponse,
     GenerateResponse,
-    ErrorResponse
+    GenerationJobResponse,
+    ErrorResponse,
+    PresentationSummaryResponse,
+    PresentationPageResponse,
+    CreateVersionRequest,
+    VersionResponse
 )
 from app.application.use_cases import (
     PresentationUseCase,
     SlideUseCase,
     BlockUseCase,
-    GenerationUseCase
+    GenerationUseCase,
+    ThumbnailUseCase,
+    ExportUseCase,
+    VersionUseCase
 )
 from app.api.dependencies import (
     get_presentation_use_case,
     get_slide_use_case,
     get_block_use_case,
     get_generation_use_case,
+    get_thumbnail_use_case,
+    get_export_use_case,
+    get_version_use_case,
     verify_jwt_token,
     get_storage_service
 )
-from app.infrastructure.storage import MinIOStorageService
+from app.infrastructure.storage import AsyncMinIOStorageService
+from app.infrastructure.office_renderer import RendererUnavailable
+from app.infrastructure.repositories import VersionConflict
+from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -74,7 +91,7 @@ async def get_presentation(
     use_case: PresentationUseCase = Depends(get_presentation_use_case)
 ):
     """Get presentation by ID"""
-    presentation = use_case.get_presentation(presentation_id)
+    presentation = await use_case.get_presentation(presentation_id)
     if not presentation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presentation not found")
     response = PresentationResponse.model_validate(presentation)
@@ -90,12 +107,59 @@ async def get_presentations(
     use_case: PresentationUseCase = Depends(get_presentation_use_case)
 ):
     """Get all presentations"""
-    presentations = use_case.get_all_presentations(skip, limit)
+    presentations = await use_case.get_all_presentations(skip, limit)
     # Use by_alias=True to get camelCase
     presentations_data = [PresentationResponse.model_validate(p).model_dump(by_alias=True, mode='json') for p in presentations]
     return JSONResponse(content=presentations_data)
 
 
+def _encode_cursor(position: Tuple[datetime, UUID]) -> str:
+    """Opaque page cursor from (updated_at, id)"""
+    updated_at, presentation_id = position
+    return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{presentation_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Parse a page cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        updated_at, presentation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), UUID(presentation_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+@router.get("/projects/{project_id}/presentations")
+async def list_project_presentations(
+    project_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    token: str = Depends(verify_jwt_token),
+    use_case: PresentationUseCase = Depends(get_presentation_use_case)
+):
+    """
+    List a project's presentations, most recently updated first
+    
+    Items are summaries with slide counts (no slides). Pass nextCursor of a
+    page as cursor to get the next one; it is null on the last page.
+    """
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    rows, next_position = await use_case.list_project_presentations(project_id, limit, after)
+    response = PresentationPageResponse(
+        items=[PresentationSummaryResponse.model_validate(row) for row in rows],
+        next_cursor=_encode_cursor(next_position) if next_position else None
+    )
+    return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
+
+
 @router.delete("/presentations/{presentation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_presentation(
     presentation_id: UUID,
@@ -103,7 +167,7 @@ async def delete_presentation(
     use_case: PresentationUseCase = Depends(get_presentation_use_case)
 ):
     """Delete a presentation"""
-    success = use_case.delete_presentation(presentation_id)
+    success = await use_case.delete_presentation(presentation_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presentation not found")
 
@@ -122,7 +186,7 @@ async def add_slide(
     Downloads the current PPTX, adds a blank slide, and saves it back to MinIO.
     """
     try:
-        slide = use_case.add_slide(presentation_id, request.clone_from_index, request.layout_index)
+        slide = await use_case.add_slide(presentation_id, request.clone_from_index, request.layout_index)
         response = SlideResponse.model_validate(slide)
         # Use by_alias=True to return camelCase
         return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
@@ -140,12 +204,67 @@ async def get_slides(
     use_case: SlideUseCase = Depends(get_slide_use_case)
 ):
     """Get all slides for a presentation"""
-    slides = use_case.get_slides(presentation_id)
+    slides = await use_case.get_slides(presentation_id)
     # Use by_alias=True and mode='json' to get camelCase with slideNumber
     slides_data = [SlideResponse.model_validate(s).model_dump(by_alias=True, mode='json') for s in slides]
     return JSONResponse(content=slides_data)
 
 
+@router.get("/presentations/{presentation_id}/slides/{slide_id}/thumbnail")
+async def get_slide_thumbnail(
+    presentation_id: UUID,
+    slide_id: UUID,
+    request: Request,
+    token: str = Depends(verify_jwt_token),
+    use_case: ThumbnailUseCase = Depends(get_thumbnail_use_case)
+):
+    """
+    Get a PNG thumbnail of a slide
+    
+    The ETag is the slide content hash: it changes only when something on this
+    slide changes (If-None-Match -> 304).
+    """
+    try:
+        content_hash, png_data = await use_case.get_slide_thumbnail(presentation_id, slide_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except RendererUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rendering thumbnail of slide {slide_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    headers = {"ETag": f'"{content_hash}"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=png_data, media_type="image/png", headers=headers)
+
+
+@router.post("/presentations/{presentation_id}/slides/{slide_id}/move", response_model=SlideResponse)
+async def move_slide(
+    presentation_id: UUID,
+    slide_id: UUID,
+    request: MoveSlideRequest,
+    token: str = Depends(verify_jwt_token),
+    use_case: SlideUseCase = Depends(get_slide_use_case)
+):
+    """
+    Move a slide to another position
+    
+    Reorders slides in the PPTX without touching slide content; in the database
+    only the moved slide's sort key is rewritten.
+    """
+    try:
+        slide = await use_case.move_slide(presentation_id, slide_id, request.to_index)
+        response = SlideResponse.model_validate(slide)
+        return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error moving slide: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.delete("/presentations/{presentation_id}/slides/{slide_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_slide(
     presentation_id: UUID,
@@ -155,7 +274,7 @@ async def delete_slide(
 ):
     """Delete a slide from presentation"""
     try:
-        success = use_case.delete_slide(presentation_id, slide_id)
+        success = await use_case.delete_slide(presentation_id, slide_id)
         if not success:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slide not found")
     except ValueError as e:
@@ -212,14 +331,8 @@ async def add_block_to_slide_by_id(
     Alternative endpoint for frontend that uses slide_id instead of slide_index.
     """
     try:
-        # Get all slides to find the index of the given slide_id
-        slides = slide_use_case.get_slides(presentation_id)
-        slide_index = None
-        for idx, slide in enumerate(slides):
-            if slide.id == slide_id:
-                slide_index = idx
-                break
-        
+        # Find the index of the given slide_id
+        slide_index = await slide_use_case.get_slide_index(presentation_id, slide_id)
         if slide_index is None:
             raise ValueError(f"Slide {slide_id} not found in presentation")
         
@@ -327,10 +440,25 @@ async def generate_presentation(
     """
     Finalize and generate the presentation
     
-    Updates the presentation status to 'Generated' and returns the final file URL.
+    Assembles the deck (in deferred assembly mode), updates the presentation
+    status to 'Generated' and returns the final file URL. With generation jobs
+    enabled the assembly is queued instead: the response is 202 with the job id
+    to poll at /presentations/{id}/generation-jobs/{job_id}.
     """
     try:
-        presentation = use_case.generate_presentation(presentation_id)
+        if settings.DEFERRED_ASSEMBLY and settings.GENERATION_JOBS_ENABLED:
+            job = await use_case.enqueue_generation(presentation_id)
+            presentation = await use_case.presentation_repo.get_by_id(presentation_id)
+            response = GenerateResponse(
+                presentation_id=presentation.id,
+                status=presentation.status,
+                file_url=presentation.file_url,
+                message="Presentation generation queued",
+                job_id=job.id
+            )
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=response.model_dump(mode='json'))
+        
+        presentation = await use_case.generate_presentation(presentation_id)
         return GenerateResponse(
             presentation_id=presentation.id,
             status=presentation.status,
@@ -344,57 +472,364 @@ async def generate_presentation(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/presentations/{presentation_id}/generation-jobs/{job_id}")
+async def get_generation_job(
+    presentation_id: UUID,
+    job_id: UUID,
+    token: str = Depends(verify_jwt_token),
+    use_case: GenerationUseCase = Depends(get_generation_use_case)
+):
+    """Get generation job status and progress (slides assembled of total)"""
+    job = await use_case.get_job(presentation_id, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Generation job not found")
+    response = GenerationJobResponse.model_validate(job)
+    return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
+
+
+@router.post("/presentations/{presentation_id}/generation-jobs/{job_id}/cancel")
+async def cancel_generation_job(
+    presentation_id: UUID,
+    job_id: UUID,
+    token: str = Depends(verify_jwt_token),
+    use_case: GenerationUseCase = Depends(get_generation_use_case)
+):
+    """Cancel a generation job (running jobs stop after the current slide)"""
+    try:
+        job = await use_case.cancel_job(presentation_id, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Generation job not found")
+        response = GenerationJobResponse.model_validate(job)
+        return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling generation job: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+def _etag_matches(header_value: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match value with an ETag"""
+    if not header_value:
+        return False
+    if header_value.strip() == "*":
+        return True
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return any(strip(tag) == strip(etag) for tag in header_value.split(","))
+
+
+def _if_range_matches(header_value: str, etag: str) -> bool:
+    """
+    Strong comparison of an If-Range value with an ETag (RFC 9110, 13.1.5)
+    
+    Weak ETags never match, so a range of a deck that may differ byte-wise is
+    not served; a date validator is not supported and gets the full file.
+    """
+    if etag.startswith("W/"):
+        return False
+    return header_value.strip() == etag
+
+
+def _attachment_headers(name: str, extension: str) -> Tuple[str, str]:
+    """
+    Build the download file name and Content-Disposition for a presentation
+    
+    Returns:
+        (file name, Content-Disposition value)
+    """
+    safe_name = name.replace(' ', '_').replace('/', '_')
+    filename = f"{safe_name}.{extension}"
+    
+    # ASCII fallback и UTF-8 encoded имя для поддержки кириллицы (RFC 5987)
+    encoded_filename = quote(filename.encode('utf-8'))
+    content_disposition = f'attachment; filename="presentation.{extension}"; filename*=UTF-8\'\'{encoded_filename}'
+    return filename, content_disposition
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range
+    
+    Returns:
+        (first byte, last byte) inclusive, or None to serve the whole file
+        (malformed or multi-range headers)
+        
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end or (not first and not last):
+        raise ValueError(f"Range {range_header} not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
 @router.get("/presentations/{presentation_id}/download")
 async def download_presentation(
     presentation_id: UUID,
+    request: Request,
     token: str = Depends(verify_jwt_token),
     presentation_use_case: PresentationUseCase = Depends(get_presentation_use_case),
-    storage_service: MinIOStorageService = Depends(get_storage_service)
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service)
 ):
     """
     Download presentation PPTX file
     
-    Returns the PPTX file as a downloadable stream.
+    Streams the file from MinIO in chunks. Supports conditional GET
+    (ETag / If-None-Match -> 304) and single byte ranges (Range / If-Range ->
+    206). With DOWNLOAD_PRESIGNED_REDIRECT the client is redirected to a
+    short-lived presigned MinIO URL instead.
     """
     try:
         logger.info(f"Download request for presentation: {presentation_id}")
         
-        # Get presentation
-        presentation = presentation_use_case.get_presentation(presentation_id)
+        # Only the row is needed: file, name and updated_at, not the slide tree
+        presentation = await presentation_use_case.get_presentation_row(presentation_id)
         if not presentation:
             logger.error(f"Presentation {presentation_id} not found")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Presentation not found")
         
-        logger.info(f"Downloading from MinIO: {presentation.file_url}")
-        
-        # Download file from MinIO
         object_name = presentation.file_url
-        pptx_data = storage_service.download_file(object_name)
+        stat = await storage_service.stat_file(object_name)
+        
+        # Object ETag changes with every upload; updated_at is the fallback
+        if stat.etag:
+            etag = f'"{stat.etag}"'
+        else:
+            etag = f'W/"{presentation.id}-{int(presentation.updated_at.timestamp())}"'
         
-        # Create streaming response
-        safe_name = presentation.name.replace(' ', '_').replace('/', '_')
-        filename = f"{safe_name}.pptx"
+        common_headers = {
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+            "Accept-Ranges": "bytes"
+        }
+        if stat.last_modified:
+            common_headers["Last-Modified"] = format_datetime(stat.last_modified, usegmt=True)
         
-        logger.info(f"Sending file: {filename}, size: {len(pptx_data)} bytes")
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=common_headers)
         
-        # Encode filename для поддержки кириллицы (RFC 5987)
-        from urllib.parse import quote
+        filename, content_disposition = _attachment_headers(presentation.name, "pptx")
         
-        # ASCII fallback и UTF-8 encoded имя
-        ascii_filename = "presentation.pptx"
-        encoded_filename = quote(filename.encode('utf-8'))
+        if settings.DOWNLOAD_PRESIGNED_REDIRECT:
+            url = await storage_service.get_presigned_download_url(
+                object_name,
+                timedelta(seconds=settings.DOWNLOAD_PRESIGNED_EXPIRY),
+                {"response-content-disposition": content_disposition, "response-content-type": PPTX_MEDIA_TYPE}
+            )
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": "no-store"})
+        
+        # Range is honoured only if the client's copy is still current (If-Range)
+        byte_range = None
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (not if_range or _if_range_matches(if_range, etag)):
+            try:
+                byte_range = _parse_range(range_header, stat.size)
+            except ValueError:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={**common_headers, "Content-Range": f"bytes */{stat.size}"}
+                )
+        
+        headers = {**common_headers, "Content-Disposition": content_disposition}
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+        else:
+            start, length = 0, stat.size
+            status_code = status.HTTP_200_OK
+        headers["Content-Length"] = str(length)
+        
+        logger.info(f"Streaming {object_name} as {filename}: {length} of {stat.size} bytes")
+        chunks = await storage_service.open_file_stream(
+            object_name, start, length if byte_range else 0, stat.etag or None
+        )
         
         return StreamingResponse(
-            io.BytesIO(pptx_data),
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-            headers={
-                "Content-Disposition": f'attachment; filename="{ascii_filename}"; filename*=UTF-8\'\'{encoded_filename}',
-                "Content-Length": str(len(pptx_data)),
-                "Cache-Control": "no-cache"
-            }
+            chunks,
+            status_code=status_code,
+            media_type=PPTX_MEDIA_TYPE,
+            headers=headers
         )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error downloading presentation: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/presentations/{presentation_id}/export.pdf")
+async def export_presentation_pdf(
+    presentation_id: UUID,
+    request: Request,
+    token: str = Depends(verify_jwt_token),
+    use_case: ExportUseCase = Depends(get_export_use_case),
+    storage_service: AsyncMinIOStorageService = Depends(get_storage_service)
+):
+    """
+    Download the presentation as PDF
+    
+    The PDF is converted from the deck /download serves on first request and
+    then served from storage until the deck changes; the ETag follows the
+    deck version (If-None-Match -> 304). With DOWNLOAD_PRESIGNED_REDIRECT the
+    client is redirected to a presigned MinIO URL of the PDF.
+    """
+    try:
+        presentation, version, object_name = await use_case.export_pdf(presentation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except RendererUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting presentation {presentation_id} to PDF: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    common_headers = {"ETag": f'"{version}-pdf"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), common_headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=common_headers)
+    
+    filename, content_disposition = _attachment_headers(presentation.name, "pdf")
+    try:
+        if settings.DOWNLOAD_PRESIGNED_REDIRECT:
+            url = await storage_service.get_presigned_download_url(
+                object_name,
+                timedelta(seconds=settings.DOWNLOAD_PRESIGNED_EXPIRY),
+                {"response-content-disposition": content_disposition, "response-content-type": "application/pdf"}
+            )
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": "no-store"})
+        
+        stat = await storage_service.stat_file(object_name)
+        chunks = await storage_service.open_file_stream(object_name, match_etag=stat.etag or None)
+    except Exception as e:
+        logger.error(f"Error streaming PDF export {object_name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    
+    logger.info(f"Streaming {object_name} as {filename}: {stat.size} bytes")
+    return StreamingResponse(
+        chunks,
+        media_type="application/pdf",
+        headers={**common_headers, "Content-Disposition": content_disposition, "Content-Length": str(stat.size)}
+    )
+
+
+# Version endpoints
+@router.post("/presentations/{presentation_id}/versions", response_model=VersionResponse, status_code=status.HTTP_201_CREATED)
+async def create_version(
+    presentation_id: UUID,
+    request: CreateVersionRequest = CreateVersionRequest(),
+    token: str = Depends(verify_jwt_token),
+    use_case: VersionUseCase = Depends(get_version_use_case)
+):
+    """
+    Take a version snapshot of the presentation
+    
+    Only deck parts that no earlier version has are stored; uploadedParts and
+    uploadedBytes tell how much the snapshot added.
+    """
+    try:
+        version, uploaded_parts, uploaded_bytes = await use_case.create_version(presentation_id, request.label)
+        response = VersionResponse.model_validate(version).model_copy(
+            update={"uploaded_parts": uploaded_parts, "uploaded_bytes": uploaded_bytes}
+        )
+        return JSONResponse(
+            content=response.model_dump(by_alias=True, mode='json'),
+            status_code=status.HTTP_201_CREATED
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating version of presentation {presentation_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/presentations/{presentation_id}/versions")
+async def list_versions(
+    presentation_id: UUID,
+    token: str = Depends(verify_jwt_token),
+    use_case: VersionUseCase = Depends(get_version_use_case)
+):
+    """List versions of a presentation, newest first"""
+    try:
+        rows = await use_case.list_versions(presentation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    versions = [VersionResponse.model_validate(row).model_dump(by_alias=True, mode='json') for row in rows]
+    return JSONResponse(content=versions)
+
+
+@router.get("/presentations/{presentation_id}/versions/{number}/download")
+async def download_version(
+    presentation_id: UUID,
+    number: int,
+    request: Request,
+    token: str = Depends(verify_jwt_token),
+    use_case: VersionUseCase = Depends(get_version_use_case)
+):
+    """
+    Download the deck of a version
+    
+    The PPTX is reassembled from stored parts while it is streamed (no
+    Content-Length). A version never changes, so its id is a strong ETag.
+    """
+    try:
+        presentation, version = await use_case.get_version(presentation_id, number)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    common_headers = {"ETag": f'"{version.id}"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), common_headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=common_headers)
+    
+    filename, content_disposition = _attachment_headers(f"{presentation.name} v{number}", "pptx")
+    logger.info(f"Streaming version {number} of presentation {presentation_id} as {filename}")
+    return StreamingResponse(
+        use_case.stream_version(version),
+        media_type=PPTX_MEDIA_TYPE,
+        headers={**common_headers, "Content-Disposition": content_disposition}
+    )
+
+
+@router.post("/presentations/{presentation_id}/versions/{number}/restore", response_model=PresentationResponse)
+async def restore_version(
+    presentation_id: UUID,
+    number: int,
+    token: str = Depends(verify_jwt_token),
+    use_case: VersionUseCase = Depends(get_version_use_case)
+):
+    """
+    Restore a version
+    
+    The current state is saved as a new version first; then the deck and its
+    slides, blocks and values are replaced with the version's.
+    """
+    try:
+        presentation = await use_case.restore_version(presentation_id, number)
+        response = PresentationResponse.model_validate(presentation)
+        return JSONResponse(content=response.model_dump(by_alias=True, mode='json'))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except VersionConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error restoring version {number} of presentation {presentation_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
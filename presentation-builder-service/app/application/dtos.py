@@ -25,6 +25,14 @@ class AddSlideRequest(BaseModel):
         populate_by_name = True  # Allow both snake_case and camelCase
 
 
+class MoveSlideRequest(BaseModel):
+    """Request to move a slide to another position"""
+    to_index: int = Field(ge=0, description="New 0-based slide position (clamped to the last slide)", alias="toIndex")
+    
+    class Config:
+        populate_by_name = True
+
+
 class AddBlockRequest(BaseModel):
     """Request to add a block to a slide"""
     template_block_id: Optional[UUID] = Field(default=None, alias="templateBlockId")
@@ -53,6 +61,11 @@ class UpdateBlockValuesRequest(BaseModel):
     values: Dict[str, Any] = Field(description="Dictionary of field_key: value pairs")
 
 
+class CreateVersionRequest(BaseModel):
+    """Request to take a version snapshot (optional, can be empty body)"""
+    label: Optional[str] = Field(default=None, max_length=255)
+
+
 # Response DTOs - Define in correct order (dependencies first)
 class BlockValueResponse(BaseModel):
     """Block value response"""
@@ -130,12 +143,74 @@ class PresentationResponse(BaseModel):
     )
 
 
+class PresentationSummaryResponse(BaseModel):
+    """Presentation list item (without slides)"""
+    id: UUID
+    project_id: UUID = Field(serialization_alias='projectId')
+    name: str
+    status: str
+    file_url: Optional[str] = Field(default=None, serialization_alias='fileUrl')
+    created_at: datetime = Field(serialization_alias='createdAt')
+    updated_at: datetime = Field(serialization_alias='updatedAt')
+    slide_count: int = Field(serialization_alias='slideCount')
+    
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True
+    )
+
+
+class PresentationPageResponse(BaseModel):
+    """Page of presentation list items"""
+    items: List[PresentationSummaryResponse]
+    next_cursor: Optional[str] = Field(default=None, serialization_alias='nextCursor')  # None on the last page
+
+
+class VersionResponse(BaseModel):
+    """Presentation version (without its manifest)"""
+    id: UUID
+    presentation_id: UUID = Field(serialization_alias='presentationId')
+    number: int
+    label: Optional[str] = None
+    size: int
+    part_count: int = Field(serialization_alias='partCount')
+    created_at: datetime = Field(serialization_alias='createdAt')
+    # Set when the version was just created: what the snapshot added to storage
+    uploaded_parts: Optional[int] = Field(default=None, serialization_alias='uploadedParts')
+    uploaded_bytes: Optional[int] = Field(default=None, serialization_alias='uploadedBytes')
+    
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True
+    )
+
+
 class GenerateResponse(BaseModel):
     """Response after generating presentation"""
     presentation_id: UUID
     status: str
     file_url: str
     message: str
+    job_id: Optional[UUID] = None  # Set when generation runs as a background job
+
+
+class GenerationJobResponse(BaseModel):
+    """Generation job state"""
+    id: UUID
+    presentation_id: UUID = Field(serialization_alias='presentationId')
+    status: str
+    progress_current: int = Field(serialization_alias='progressCurrent')
+    progress_total: int = Field(serialization_alias='progressTotal')
+    cancel_requested: bool = Field(serialization_alias='cancelRequested')
+    error: Optional[str] = None
+    created_at: datetime = Field(serialization_alias='createdAt')
+    started_at: Optional[datetime] = Field(default=None, serialization_alias='startedAt')
+    finished_at: Optional[datetime] = Field(default=None, serialization_alias='finishedAt')
+    
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True
+    )
 
 
 class ErrorResponse(BaseModel):
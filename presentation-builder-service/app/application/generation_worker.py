@@ -0,0 +1,212 @@
+"""Background worker for deck generation jobs"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from app.config.database import SessionLocal
+from app.application.use_cases import GenerationUseCase
+from app.infrastructure.repositories import (
+    PresentationRepository,
+    SlideRepository,
+    GenerationJobRepository
+)
+from app.infrastructure.storage import AsyncMinIOStorageService
+from app.infrastructure.template_client import TemplateServiceClient
+from app.infrastructure.block_cache import BlockCache
+from app.infrastructure.deck_assembly import assemble_deck, GenerationCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationWorker:
+    """
+    Runs queued generation jobs from the generation_jobs table
+
+    Each of `concurrency` loops claims the oldest runnable job (respecting the
+    per-tenant limit), collects blocks and values on the event loop and runs
+    the CPU-bound python-pptx assembly in a process pool. A monitor task
+    forwards per-slide progress to the job row, refreshes the heartbeat and
+    relays cancellation requests to the assembling process.
+    """
+
+    def __init__(
+        self,
+        template_client: TemplateServiceClient,
+        storage_service: AsyncMinIOStorageService,
+        block_cache: Optional[BlockCache],
+        concurrency: int = 2,
+        process_pool_size: int = 2,
+        max_running_per_tenant: int = 1,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 5.0,
+        stale_after: float = 60.0
+    ):
+        """
+        Initialize worker
+
+        Args:
+            template_client: Template service client
+            storage_service: Storage for base decks and generated files
+            block_cache: Template block cache
+            concurrency: Jobs processed at the same time by this instance
+            process_pool_size: Processes for python-pptx assembly
+            max_running_per_tenant: Running jobs allowed per tenant across all instances
+            poll_interval: Seconds between queue polls when idle
+            heartbeat_interval: Seconds between heartbeats of a running job
+            stale_after: Seconds without heartbeat after which a running job is reclaimed
+        """
+        self.template_client = template_client
+        self.storage_service = storage_service
+        self.block_cache = block_cache
+        self.concurrency = concurrency
+        self.process_pool_size = process_pool_size
+        self.max_running_per_tenant = max_running_per_tenant
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the process pool and the job loops"""
+        # spawn: the parent runs threads (DB pool, MinIO), which fork does not copy safely
+        context = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(max_workers=self.process_pool_size, mp_context=context)
+        self._manager = await asyncio.to_thread(context.Manager)
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        logger.info(f"Generation worker {self.worker_id} started ({self.concurrency} loop(s), {self.process_pool_size} process(es))")
+
+    async def stop(self):
+        """Stop the job loops; interrupted jobs are reclaimed once their heartbeat is stale"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager:
+            self._manager.shutdown()
+
+    async def _loop(self):
+        while True:
+            try:
+                job_id = await self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim generation job: {e}")
+                job_id = None
+            if job_id is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._run(job_id)
+
+    async def _claim(self) -> Optional[UUID]:
+        async with SessionLocal() as db:
+            stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+            job = await GenerationJobRepository(db).claim_next(self.worker_id, self.max_running_per_tenant, stale_before)
+            return job.id if job else None
+
+    async def _run(self, job_id: UUID):
+        async with SessionLocal() as db:
+            jobs = GenerationJobRepository(db)
+            presentation_repo = PresentationRepository(db)
+            use_case = GenerationUseCase(
+                presentation_repo,
+                self.storage_service,
+                SlideRepository(db),
+                self.template_client,
+                self.block_cache,
+                jobs
+            )
+            job = await jobs.get_by_id(job_id)
+            status, error = "Failed", None
+            try:
+                presentation = await presentation_repo.get_by_id(job.presentation_id)
+                if not presentation:
+                    raise ValueError(f"Presentation {job.presentation_id} not found")
+                logger.info(f"Running generation job {job_id} for presentation {presentation.id} (attempt {job.attempts})")
+
+                base_data, blocks, slides_spec = await use_case.prepare_assembly(presentation)
+                await jobs.update_progress(job_id, 0, len(slides_spec))
+
+                progress_queue = self._manager.Queue()
+                cancel_event = self._manager.Event()
+                monitor = asyncio.create_task(self._monitor(job_id, progress_queue, cancel_event))
+                try:
+                    pptx_data = await asyncio.get_running_loop().run_in_executor(
+                        self._pool,
+                        assemble_deck,
+                        base_data,
+                        {block_id: (block.version, block.data) for block_id, block in blocks.items()},
+                        slides_spec,
+                        progress_queue,
+                        cancel_event
+                    )
+                finally:
+                    monitor.cancel()
+                    await asyncio.gather(monitor, return_exceptions=True)
+                await self._drain_progress(jobs, job_id, progress_queue)
+
+                await self.storage_service.upload_file(io.BytesIO(pptx_data), presentation.file_url)
+                presentation.status = "Generated"
+                presentation.updated_at = datetime.utcnow()
+                await presentation_repo.update(presentation)
+                status = "Succeeded"
+                logger.info(f"Generation job {job_id} finished: {len(slides_spec)} slide(s)")
+            except GenerationCancelled as e:
+                status = "Cancelled"
+                logger.info(f"Generation job {job_id} cancelled: {e}")
+            except asyncio.CancelledError:
+                # Worker shutdown: leave the job Running so another worker reclaims it
+                raise
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Generation job {job_id} failed: {e}")
+            try:
+                if status != "Succeeded":
+                    await db.rollback()
+                    await use_case.reset_generation_status(job.presentation_id)
+                await jobs.finish(job_id, status, error)
+            except Exception as e:
+                logger.error(f"Failed to record result of generation job {job_id}: {e}")
+
+    async def _monitor(self, job_id: UUID, progress_queue, cancel_event):
+        """Forward progress, keep the heartbeat fresh and relay cancellation"""
+        # Own session: the job's session is in use by _run while this task polls
+        async with SessionLocal() as db:
+            jobs = GenerationJobRepository(db)
+            loop = asyncio.get_running_loop()
+            last_heartbeat = loop.time()
+            try:
+                while True:
+                    await self._drain_progress(jobs, job_id, progress_queue)
+                    if loop.time() - last_heartbeat >= self.heartbeat_interval:
+                        if await jobs.heartbeat(job_id):
+                            cancel_event.set()
+                        last_heartbeat = loop.time()
+                    await asyncio.sleep(min(self.heartbeat_interval, 0.5))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Progress monitor of job {job_id} stopped: {e}")
+
+    @staticmethod
+    async def _drain_progress(jobs: GenerationJobRepository, job_id: UUID, progress_queue):
+        latest = None
+        while True:
+            try:
+                latest = await asyncio.to_thread(progress_queue.get_nowait)
+            except queue.Empty:
+                break
+        if latest:
+            await jobs.update_progress(job_id, *latest)
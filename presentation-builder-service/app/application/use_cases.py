@@ -1,37 +1,303 @@
 """Business logic use cases"""
+import asyncio
 import logging
 import io
-from typing import List, Optional, Dict, Any
+import os
+from collections import deque
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID, uuid4
 from datetime import datetime
 
-from app.domain.entities import Presentation, PresentationSlide, SlideBlock, SlideBlockValue
+from app.config.settings import settings
+from app.domain.entities import (
+    Presentation,
+    PresentationSlide,
+    SlideBlock,
+    SlideBlockValue,
+    GenerationJob,
+    PresentationVersion
+)
+from app.domain.order_keys import key_between
 from app.infrastructure.repositories import (
     PresentationRepository, 
     SlideRepository, 
     BlockRepository,
-    BlockValueRepository
+    BlockValueRepository,
+    GenerationJobRepository,
+    PresentationVersionRepository
 )
-from app.infrastructure.storage import MinIOStorageService
+from app.infrastructure.storage import AsyncMinIOStorageService
 from app.infrastructure.pptx_service import PPTXService
 from app.infrastructure.template_client import TemplateServiceClient
 from app.infrastructure.project_client import ProjectServiceClient
+from app.infrastructure.master_template import MasterTemplateCache
+from app.infrastructure.block_cache import BlockCache, CachedBlock
+from app.infrastructure.office_renderer import OfficeRenderer
+from app.infrastructure.single_flight import SingleFlight
+from app.infrastructure.deck_parts import DeckZipWriter, decode_part, encode_part, part_hash, split_deck
 
 logger = logging.getLogger(__name__)
 
 
+async def load_template_block(
+    template_client: TemplateServiceClient,
+    block_cache: Optional[BlockCache],
+    template_block_id: UUID,
+    block_info: Optional[Dict[str, Any]] = None
+) -> CachedBlock:
+    """
+    Get a parsed template block, downloading it only when its version changed
+    
+    Args:
+        template_client: Template service client
+        block_cache: Template block cache (None disables caching)
+        template_block_id: UUID of the template block
+        block_info: Block metadata if already fetched (its updated_at is used as the version)
+        
+    Returns:
+        Parsed block
+        
+    Raises:
+        ValueError: If the block cannot be downloaded or parsed
+    """
+    version = None
+    if block_cache:
+        if block_info is None:
+            cached = await asyncio.to_thread(block_cache.get_validated, template_block_id)
+            if cached:
+                return cached
+            block_info = await template_client.get_template_block(template_block_id)
+        
+        # updated_at from block metadata is the cache version
+        version = str(block_info.get("updated_at") or "") if block_info else ""
+        if version:
+            cached = await asyncio.to_thread(block_cache.get, template_block_id, version)
+            if cached:
+                return cached
+    
+    # Download block PPTX from template service
+    block_pptx_data = await template_client.download_block_pptx(template_block_id)
+    if not block_pptx_data:
+        raise ValueError(f"Could not download template block {template_block_id}")
+    
+    try:
+        if version:
+            return await asyncio.to_thread(block_cache.put, template_block_id, version, block_pptx_data)
+        # Metadata unavailable: use the download once without caching it
+        return await asyncio.to_thread(CachedBlock.parse, template_block_id, "", block_pptx_data)
+    except Exception as e:
+        raise ValueError(f"Invalid template block {template_block_id}: {e}")
+
+
+def base_pptx_object_name(object_name: str) -> str:
+    """Object name of the assembly base deck stored next to a presentation file"""
+    root, ext = os.path.splitext(object_name)
+    return f"{root}.base{ext or '.pptx'}"
+
+
+def pdf_export_prefix(presentation_id: UUID) -> str:
+    """Prefix under which PDF exports of a presentation are stored"""
+    return f"exports/{presentation_id}/"
+
+
+def thumbnail_prefix(presentation_id: UUID) -> str:
+    """Prefix under which slide thumbnails of a presentation are stored"""
+    return f"thumbnails/{presentation_id}/"
+
+
+def version_prefix(presentation_id: UUID) -> str:
+    """Prefix under which version snapshot parts of a presentation are stored"""
+    return f"versions/{presentation_id}/"
+
+
+def version_part_object_name(presentation_id: UUID, digest: str) -> str:
+    """Object name of a deck part stored by content hash"""
+    return f"{version_prefix(presentation_id)}parts/{digest}"
+
+
+def build_fields_data(
+    blocks: List[SlideBlock],
+    template_blocks: Dict[UUID, Dict[str, Any]],
+    block_values: Dict[UUID, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Build auto-layout field data for all blocks on a slide
+    
+    Args:
+        blocks: Blocks of the slide
+        template_blocks: Template block metadata by template block id
+        block_values: field_key -> value by slide block id
+        
+    Returns:
+        Field data in the format of PPTXService.fill_template_with_data
+    """
+    all_fields_data = []
+    global_order_index = 0
+    
+    for slide_block in sorted(blocks, key=lambda b: b.position_index):
+        block_template = template_blocks.get(slide_block.template_block_id)
+        if not block_template:
+            logger.warning(f"Template block {slide_block.template_block_id} not found, skipping")
+            continue
+        
+        block_values_dict = block_values.get(slide_block.id, {})
+        
+        # Получаем поля из template_block и сортируем по order_index
+        for field in sorted(block_template.get("fields", []), key=lambda f: f.get("order_index", 0)):
+            field_key = field.get("key")
+            
+            # Проверяем, есть ли значение для этого поля
+            if field_key in block_values_dict and block_values_dict[field_key]:
+                field_value = block_values_dict[field_key]
+                field_metadata = field.get("metadata", {})
+                
+                # Извлекаем метаданные шрифта
+                font_info = field_metadata.get("font") or {}
+                
+                font_metadata = {
+                    "name": font_info.get("name") or "Arial",
+                    "size": font_info.get("size") or 18,
+                    "color": font_info.get("color") or "#000000",
+                    "bold": font_info.get("bold") or False,
+                    "italic": font_info.get("italic") or False,
+                    "alignment": field_metadata.get("alignment") or "LEFT"
+                }
+                
+                logger.debug(f"Block {slide_block.position_index}, Field {field_key}: font_metadata={font_metadata}")
+                
+                all_fields_data.append({
+                    "text": str(field_value),
+                    "font_metadata": font_metadata,
+                    "order_index": global_order_index,
+                    "block_id": slide_block.id,
+                    "field_key": field_key
+                })
+                global_order_index += 1
+    
+    return all_fields_data
+
+
+async def load_base_pptx(storage_service: AsyncMinIOStorageService, object_name: str) -> bytes:
+    """
+    Get the deck deferred assembly starts from
+    
+    Edits do not touch the stored file in deferred mode, so before the first
+    generation it is still the initial template; it is kept as the base for
+    all later generations.
+    
+    Args:
+        storage_service: Storage service
+        object_name: Object name of the presentation file
+        
+    Returns:
+        Base deck PPTX bytes
+    """
+    base_object_name = base_pptx_object_name(object_name)
+    if not await storage_service.file_exists(base_object_name):
+        await storage_service.copy_file(object_name, base_object_name)
+    return await storage_service.download_file(base_object_name)
+
+
+async def ensure_slide_origins(
+    slide_repo: SlideRepository,
+    slides: List[PresentationSlide],
+    base_data: bytes
+):
+    """
+    Store base slide origins of slides that do not have them yet
+    
+    Slides stored before origins were tracked were matched to base slides by
+    position: slide i was base slide i, and slides past the base deck used
+    the layout of its first slide. That mapping is applied once, to the
+    current order, and stored, so later moves and deletes keep it.
+    
+    Args:
+        slide_repo: Slide repository
+        slides: All slides of the presentation in slide order
+        base_data: Base deck PPTX bytes
+    """
+    if all(slide.has_origin for slide in slides):
+        return
+    
+    base_slide_ids = await asyncio.to_thread(PPTXService.slide_ids, base_data)
+    for index, slide in enumerate(slides):
+        if slide.has_origin:
+            continue
+        if index < len(base_slide_ids):
+            slide.base_slide_id = base_slide_ids[index]
+        elif base_slide_ids:
+            slide.layout_slide_id = base_slide_ids[0]
+        else:
+            slide.layout_index = 6
+    await slide_repo.save_origins(slides)
+    logger.info(f"Stored base slide origins of {len(slides)} slide(s) by position")
+
+
+async def prepare_slides(
+    template_client: TemplateServiceClient,
+    block_cache: Optional[BlockCache],
+    slides: List[PresentationSlide]
+) -> Tuple[Dict[UUID, CachedBlock], List[Tuple[List[UUID], List[Dict[str, Any]], Dict[str, Any]]]]:
+    """
+    Collect template blocks and field data for assembling slides
+    
+    Args:
+        template_client: Template service client
+        block_cache: Template block cache
+        slides: Slides with blocks and values loaded
+        
+    Returns:
+        (parsed template blocks by id,
+         per slide: (template block ids in position order, field data, origin))
+        
+    Raises:
+        ValueError: If a template block is missing or invalid
+    """
+    # Each template block is fetched and parsed once, however often it is used
+    template_block_ids = list({block.template_block_id for slide in slides for block in slide.blocks})
+    block_infos = await asyncio.gather(
+        *(template_client.get_template_block(tid) for tid in template_block_ids)
+    )
+    template_blocks = dict(zip(template_block_ids, block_infos))
+    missing = [str(tid) for tid, info in template_blocks.items() if not info]
+    if missing:
+        raise ValueError(f"Template blocks not found: {', '.join(missing)}")
+    
+    parsed_blocks = await asyncio.gather(
+        *(load_template_block(template_client, block_cache, tid, template_blocks[tid])
+          for tid in template_block_ids)
+    )
+    
+    slides_spec = []
+    for slide in slides:
+        blocks = sorted(slide.blocks, key=lambda b: b.position_index)
+        block_values = {
+            block.id: {bv.field_key: bv.value.get("value", "") for bv in block.values}
+            for block in blocks
+        }
+        slides_spec.append((
+            [block.template_block_id for block in blocks],
+            build_fields_data(blocks, template_blocks, block_values),
+            slide.origin
+        ))
+    
+    return dict(zip(template_block_ids, parsed_blocks)), slides_spec
+
+
 class PresentationUseCase:
     """Use cases for presentation management"""
     
     def __init__(
         self,
         presentation_repo: PresentationRepository,
-        storage_service: MinIOStorageService,
-        project_client: ProjectServiceClient
+        storage_service: AsyncMinIOStorageService,
+        project_client: ProjectServiceClient,
+        master_template_cache: MasterTemplateCache
     ):
         self.presentation_repo = presentation_repo
         self.storage_service = storage_service
         self.project_client = project_client
+        self.master_template_cache = master_template_cache
     
     async def create_presentation(
         self,
@@ -52,39 +318,23 @@ class PresentationUseCase:
         Returns:
             Created presentation
         """
-        # Verify project exists
-        project_exists = await self.project_client.check_project_exists(project_id, auth_token)
+        # Verify project exists while the master template is being resolved
+        project_check = asyncio.create_task(
+            self.project_client.check_project_exists(project_id, auth_token)
+        )
+        try:
+            source_url, source_etag, pptx_data = await self._resolve_initial_pptx(template_url)
+        except BaseException:
+            project_check.cancel()
+            raise
+        
+        project_exists = await project_check
         if not project_exists:
             raise ValueError(f"Project {project_id} not found")
         
-        # Determine which template to use
-        from app.config.settings import settings
-        
-        # Priority: 1) custom template_url parameter, 2) default MASTER_TEMPLATE_URL, 3) empty presentation
-        effective_template_url = template_url or settings.MASTER_TEMPLATE_URL
-        
-        if effective_template_url:
-            try:
-                # Load master template from MinIO
-                logger.info(f"Creating presentation from template: {effective_template_url}")
-                template_data = self.storage_service.download_file(effective_template_url)
-                pptx_data = PPTXService.create_presentation_from_template(template_data)
-                logger.info("Successfully created presentation from master template")
-            except Exception as e:
-                logger.error(f"Failed to load template {effective_template_url}: {e}")
-                logger.warning("Falling back to empty presentation")
-                pptx_data = PPTXService.create_empty_presentation()
-        else:
-            # Create empty PPTX (original behavior)
-            logger.info("Creating empty presentation (no master template configured)")
-            pptx_data = PPTXService.create_empty_presentation()
-        
-        # Upload to MinIO
+        # Store in MinIO (server-side copy of the template when possible)
         object_name = f"presentations/{uuid4()}.pptx"
-        file_url = self.storage_service.upload_file(
-            io.BytesIO(pptx_data),
-            object_name
-        )
+        file_url = await self._store_initial_pptx(source_url, source_etag, pptx_data, object_name)
         
         # Create presentation entity
         presentation = Presentation(
@@ -95,7 +345,7 @@ class PresentationUseCase:
             file_url=file_url
         )
         
-        created_presentation = self.presentation_repo.create(presentation)
+        created_presentation = await self.presentation_repo.create(presentation)
         
         # Create first slide entity (the PPTX already has one slide from template or blank)
         from app.infrastructure.repositories import SlideRepository
@@ -105,35 +355,128 @@ class PresentationUseCase:
         first_slide = PresentationSlide(
             id=uuid4(),
             presentation_id=created_presentation.id,
-            order_index=0
+            sort_key=key_between(None, None)
         )
-        slide_repo.create(first_slide)
+        if settings.DEFERRED_ASSEMBLY:
+            # Deferred assembly keeps the initial deck as its base: the first slide is its first slide
+            base_slide_ids = await asyncio.to_thread(PPTXService.slide_ids, pptx_data)
+            if base_slide_ids:
+                first_slide.base_slide_id = base_slide_ids[0]
+            else:
+                first_slide.layout_index = 6
+        await slide_repo.create(first_slide)
         
         # Refresh presentation to include the slide
-        created_presentation = self.presentation_repo.get_by_id(created_presentation.id)
+        created_presentation = await self.presentation_repo.get_with_slides(created_presentation.id)
         
         return created_presentation
     
-    def get_presentation(self, presentation_id: UUID) -> Optional[Presentation]:
-        """Get presentation by ID"""
-        return self.presentation_repo.get_by_id(presentation_id)
+    async def _resolve_initial_pptx(self, template_url: Optional[str]) -> Tuple[Optional[str], Optional[str], bytes]:
+        """
+        Resolve the initial PPTX for a new presentation
+        
+        Args:
+            template_url: Optional custom template URL in MinIO
+            
+        Returns:
+            (template object name or None, template ETag or None, PPTX bytes)
+        """
+        # Determine which template to use
+        # Priority: 1) custom template_url parameter, 2) default MASTER_TEMPLATE_URL, 3) empty presentation
+        effective_template_url = template_url or settings.MASTER_TEMPLATE_URL
+        
+        if effective_template_url:
+            try:
+                # Master template is cached in memory and only re-downloaded when its ETag changes
+                logger.info(f"Creating presentation from template: {effective_template_url}")
+                etag, template_data = await self.master_template_cache.get(self.storage_service, effective_template_url)
+                return effective_template_url, etag, template_data
+            except Exception as e:
+                logger.error(f"Failed to load template {effective_template_url}: {e}")
+                logger.warning("Falling back to empty presentation")
+        else:
+            # Create empty PPTX (original behavior)
+            logger.info("Creating empty presentation (no master template configured)")
+        
+        return None, None, await asyncio.to_thread(self.master_template_cache.empty_presentation)
+    
+    async def _store_initial_pptx(
+        self,
+        source_url: Optional[str],
+        source_etag: Optional[str],
+        pptx_data: bytes,
+        object_name: str
+    ) -> str:
+        """
+        Store the initial PPTX of a new presentation
+        
+        The template is copied server-side when it still has the validated ETag;
+        otherwise the cached bytes are uploaded.
+        
+        Returns:
+            Object name of the stored file
+        """
+        if source_url:
+            try:
+                return await self.storage_service.copy_file(source_url, object_name, match_etag=source_etag)
+            except Exception as e:
+                logger.warning(f"Server-side copy of {source_url} failed ({e}), uploading cached template")
+        
+        return await self.storage_service.upload_file(io.BytesIO(pptx_data), object_name)
     
-    def get_all_presentations(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
+    async def get_presentation(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get presentation by ID with slides, blocks and values"""
+        return await self.presentation_repo.get_with_slides(presentation_id)
+    
+    async def get_presentation_row(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get presentation by ID without its slides (one query)"""
+        return await self.presentation_repo.get_by_id(presentation_id)
+    
+    async def get_all_presentations(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
         """Get all presentations"""
-        return self.presentation_repo.get_all(skip, limit)
+        return await self.presentation_repo.get_all(skip, limit)
     
-    def delete_presentation(self, presentation_id: UUID) -> bool:
+    async def list_project_presentations(
+        self,
+        project_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> Tuple[List[Tuple], Optional[Tuple[datetime, UUID]]]:
+        """
+        Get a page of a project's presentations, most recently updated first
+        
+        Args:
+            project_id: UUID of the project
+            limit: Page size
+            after: Position returned with the previous page
+            
+        Returns:
+            (summary rows, position of the next page or None on the last page)
+        """
+        # One extra row tells whether there is a next page
+        rows = await self.presentation_repo.list_by_project(project_id, limit + 1, after)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].updated_at, rows[-1].id)
+    
+    async def delete_presentation(self, presentation_id: UUID) -> bool:
         """Delete presentation"""
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             return False
         
         # Delete file from MinIO
         if presentation.file_url:
             object_name = presentation.file_url  # file_url already contains just the object_name
-            self.storage_service.delete_file(object_name)
-        
-        return self.presentation_repo.delete(presentation_id)
+            await self.storage_service.delete_file(object_name)
+            if settings.DEFERRED_ASSEMBLY:
+                await self.storage_service.delete_file(base_pptx_object_name(object_name))
+            await self.storage_service.delete_prefix(pdf_export_prefix(presentation_id))
+            await self.storage_service.delete_prefix(thumbnail_prefix(presentation_id))
+            await self.storage_service.delete_prefix(version_prefix(presentation_id))
+        
+        return await self.presentation_repo.delete(presentation_id)
 
 
 class SlideUseCase:
@@ -143,16 +486,19 @@ class SlideUseCase:
         self,
         presentation_repo: PresentationRepository,
         slide_repo: SlideRepository,
-        storage_service: MinIOStorageService
+        storage_service: AsyncMinIOStorageService
     ):
         self.presentation_repo = presentation_repo
         self.slide_repo = slide_repo
         self.storage_service = storage_service
     
-    def add_slide(self, presentation_id: UUID, clone_from_index: Optional[int] = 0, layout_index: int = 6) -> PresentationSlide:
+    async def add_slide(self, presentation_id: UUID, clone_from_index: Optional[int] = 0, layout_index: int = 6) -> PresentationSlide:
         """
         Add a new slide to presentation
         
+        In deferred assembly mode the file is not touched; the layout the
+        slide gets is stored with it and applied at generation.
+        
         Args:
             presentation_id: UUID of the presentation
             clone_from_index: Index of slide to clone (None = use blank layout, 0 = clone first slide)
@@ -162,14 +508,91 @@ class SlideUseCase:
             Created slide
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
+        slide = PresentationSlide(id=uuid4(), presentation_id=presentation_id)
+        if settings.DEFERRED_ASSEMBLY:
+            origins = await self._get_origins(presentation)
+            slide_count = len(origins)
+            last_key = origins[-1].sort_key if origins else None
+            self._set_added_slide_origin(slide, origins, clone_from_index, layout_index)
+        else:
+            await self._add_pptx_slide(presentation, clone_from_index, layout_index)
+            slide_count, last_key = await self.slide_repo.get_last_sort_key(presentation_id)
+        
+        # Create slide entity after the last slide
+        slide.sort_key = key_between(last_key, None)
+        
+        # Update presentation timestamp
+        presentation.updated_at = datetime.utcnow()
+        await self.presentation_repo.update(presentation)
+        
+        slide = await self.slide_repo.create(slide)
+        slide.order_index = slide_count
+        return slide
+    
+    async def _get_origins(self, presentation: Presentation) -> List[Tuple]:
+        """Get slide origin rows, storing them first for slides that do not have them yet"""
+        origins = await self.slide_repo.get_origins(presentation.id)
+        if all(self._row_has_origin(row) for row in origins):
+            return origins
+        
+        slides = await self.slide_repo.get_by_presentation(presentation.id)
+        base_data = await load_base_pptx(self.storage_service, presentation.file_url)
+        await ensure_slide_origins(self.slide_repo, slides, base_data)
+        return await self.slide_repo.get_origins(presentation.id)
+    
+    @staticmethod
+    def _row_has_origin(row) -> bool:
+        return row.base_slide_id is not None or row.layout_slide_id is not None or row.layout_index is not None
+    
+    @staticmethod
+    def _set_added_slide_origin(
+        slide: PresentationSlide,
+        origins: List[Tuple],
+        clone_from_index: Optional[int],
+        layout_index: int
+    ):
+        """
+        Record the layout an added slide gets at deferred assembly
+        
+        The same choice as _add_slide_to_pptx: the layout of the slide at
+        clone_from_index if there is one, otherwise layout layout_index.
+        """
+        if clone_from_index is not None and clone_from_index < len(origins):
+            source = origins[clone_from_index]
+            if source.base_slide_id is not None:
+                slide.layout_slide_id = source.base_slide_id
+            elif source.layout_slide_id is not None:
+                slide.layout_slide_id = source.layout_slide_id
+            else:
+                slide.layout_index = source.layout_index
+        else:
+            slide.layout_index = layout_index
+    
+    async def _add_pptx_slide(self, presentation: Presentation, clone_from_index: Optional[int], layout_index: int):
+        """Add a slide to the stored PPTX file"""
         # Download current PPTX
         object_name = presentation.file_url  # file_url already contains just the object_name
-        pptx_data = self.storage_service.download_file(object_name)
+        pptx_data = await self.storage_service.download_file(object_name)
+        
+        updated_pptx = await asyncio.to_thread(
+            self._add_slide_to_pptx, pptx_data, presentation.id, clone_from_index, layout_index
+        )
         
+        # Save updated PPTX
+        await self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+    
+    @staticmethod
+    def _add_slide_to_pptx(
+        pptx_data: bytes,
+        presentation_id: UUID,
+        clone_from_index: Optional[int],
+        layout_index: int
+    ) -> bytes:
+        """Add a slide to PPTX data (CPU-bound, run in a thread)"""
         # Load presentation
         prs = PPTXService.load_presentation(pptx_data)
         
@@ -191,34 +614,101 @@ class SlideUseCase:
             slide_index = PPTXService.add_slide(prs, layout_index)
             logger.info(f"Added blank slide to presentation {presentation_id}")
         
-        # Save updated PPTX
-        updated_pptx = PPTXService.save_presentation(prs)
-        self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+        return PPTXService.save_presentation(prs)
+    
+    async def get_slides(self, presentation_id: UUID) -> List[PresentationSlide]:
+        """Get all slides for a presentation"""
+        return await self.slide_repo.get_by_presentation(presentation_id)
+    
+    async def get_slide_index(self, presentation_id: UUID, slide_id: UUID) -> Optional[int]:
+        """Get the position of a slide in its presentation (None if not found)"""
+        slide_ids = await self.slide_repo.get_ids_by_presentation(presentation_id)
+        return slide_ids.index(slide_id) if slide_id in slide_ids else None
+    
+    async def move_slide(self, presentation_id: UUID, slide_id: UUID, to_index: int) -> PresentationSlide:
+        """
+        Move a slide to another position
         
-        # Create slide entity
-        existing_slides = self.slide_repo.get_by_presentation(presentation_id)
-        order_index = len(existing_slides)
+        The slide gets a sort key between its new neighbours, so the move
+        updates this slide's row only. In the PPTX only the slide order
+        (sldIdLst in presentation.xml) changes; slide parts are not touched.
+        With DEFERRED_ASSEMBLY the PPTX is left alone: slides reference
+        their base deck slide by id, and assembly orders base slides by
+        the sort keys.
         
-        slide = PresentationSlide(
-            id=uuid4(),
-            presentation_id=presentation_id,
-            order_index=order_index
-        )
+        Args:
+            presentation_id: UUID of the presentation
+            slide_id: UUID of the slide to move
+            to_index: New 0-based position (clamped to the slide range)
+            
+        Returns:
+            Moved slide with its new order_index
+            
+        Raises:
+            ValueError: If the presentation or slide is not found
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation:
+            raise ValueError(f"Presentation {presentation_id} not found")
         
-        # Update presentation timestamp
-        presentation.updated_at = datetime.utcnow()
-        self.presentation_repo.update(presentation)
+        if settings.DEFERRED_ASSEMBLY:
+            # Origins must be stored before the order changes, or legacy
+            # slides would be mapped to base slides by their new positions
+            origins = await self._get_origins(presentation)
+            sort_keys = [(row.id, row.sort_key) for row in origins]
+        else:
+            sort_keys = await self.slide_repo.get_sort_keys(presentation_id)
+        slide_ids = [key_slide_id for key_slide_id, _ in sort_keys]
+        if slide_id not in slide_ids:
+            raise ValueError(f"Slide {slide_id} not found in presentation")
+        from_index = slide_ids.index(slide_id)
+        to_index = max(0, min(to_index, len(sort_keys) - 1))
+        
+        if to_index != from_index:
+            # Neighbours at the new position, with the slide itself taken out
+            others = [key for key_slide_id, key in sort_keys if key_slide_id != slide_id]
+            before = others[to_index - 1] if to_index > 0 else None
+            after = others[to_index] if to_index < len(others) else None
+            
+            if not settings.DEFERRED_ASSEMBLY:
+                await self._move_pptx_slide(presentation.file_url, from_index, to_index)
+            
+            await self.slide_repo.update_sort_key(slide_id, key_between(before, after))
+            presentation.updated_at = datetime.utcnow()
+            await self.presentation_repo.update(presentation)
+            logger.info(f"Moved slide {slide_id} of presentation {presentation_id}: {from_index} -> {to_index}")
         
-        return self.slide_repo.create(slide)
+        slide = await self.slide_repo.get_with_blocks(slide_id)
+        slide.order_index = to_index
+        return slide
     
-    def get_slides(self, presentation_id: UUID) -> List[PresentationSlide]:
-        """Get all slides for a presentation"""
-        return self.slide_repo.get_by_presentation(presentation_id)
+    async def _move_pptx_slide(self, object_name: str, from_index: int, to_index: int):
+        """Move a slide in the stored PPTX file"""
+        # Download current PPTX
+        pptx_data = await self.storage_service.download_file(object_name)
+        
+        updated_pptx = await asyncio.to_thread(self._move_slide_in_pptx, pptx_data, from_index, to_index)
+        
+        # Save updated PPTX
+        await self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+    
+    @staticmethod
+    def _move_slide_in_pptx(pptx_data: bytes, from_index: int, to_index: int) -> bytes:
+        """Move a slide in PPTX data (CPU-bound, run in a thread)"""
+        prs = PPTXService.load_presentation(pptx_data)
+        
+        if max(from_index, to_index) < len(prs.slides):
+            PPTXService.move_slide(prs, from_index, to_index)
+        
+        return PPTXService.save_presentation(prs)
     
-    def delete_slide(self, presentation_id: UUID, slide_id: UUID) -> bool:
+    async def delete_slide(self, presentation_id: UUID, slide_id: UUID) -> bool:
         """
         Delete a slide from presentation
         
+        With DEFERRED_ASSEMBLY only the row is deleted; assembly drops base
+        deck slides that no remaining slide references.
+        
         Args:
             presentation_id: UUID of the presentation
             slide_id: UUID of the slide to delete
@@ -227,41 +717,53 @@ class SlideUseCase:
             True if deleted successfully
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
-        # Get slide
-        slide = self.slide_repo.get_by_id(slide_id)
-        if not slide or slide.presentation_id != presentation_id:
+        # Slide position in the PPTX is its position in sort key order
+        if settings.DEFERRED_ASSEMBLY:
+            # Store origins while positions still match the base deck
+            slide_ids = [row.id for row in await self._get_origins(presentation)]
+        else:
+            slide_ids = await self.slide_repo.get_ids_by_presentation(presentation_id)
+        if slide_id not in slide_ids:
             return False
         
-        # Download current PPTX
-        object_name = presentation.file_url
-        pptx_data = self.storage_service.download_file(object_name)
-        
-        # Load presentation and delete slide
-        prs = PPTXService.load_presentation(pptx_data)
-        
-        # Delete slide from PPTX
-        if slide.order_index < len(prs.slides):
-            rId = prs.slides._sldIdLst[slide.order_index].rId
-            prs.part.drop_rel(rId)
-            del prs.slides._sldIdLst[slide.order_index]
-        
-        # Save updated PPTX
-        updated_pptx = PPTXService.save_presentation(prs)
-        self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+        if not settings.DEFERRED_ASSEMBLY:
+            await self._delete_pptx_slide(presentation.file_url, slide_ids.index(slide_id))
         
         # Delete slide entity
-        success = self.slide_repo.delete(slide_id)
+        success = await self.slide_repo.delete(slide_id)
         
         # Update presentation timestamp
         if success:
             presentation.updated_at = datetime.utcnow()
-            self.presentation_repo.update(presentation)
+            await self.presentation_repo.update(presentation)
         
         return success
+    
+    async def _delete_pptx_slide(self, object_name: str, slide_index: int):
+        """Delete a slide from the stored PPTX file"""
+        # Download current PPTX
+        pptx_data = await self.storage_service.download_file(object_name)
+        
+        updated_pptx = await asyncio.to_thread(self._delete_slide_from_pptx, pptx_data, slide_index)
+        
+        # Save updated PPTX
+        await self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+    
+    @staticmethod
+    def _delete_slide_from_pptx(pptx_data: bytes, slide_index: int) -> bytes:
+        """Delete a slide from PPTX data (CPU-bound, run in a thread)"""
+        # Load presentation and delete slide
+        prs = PPTXService.load_presentation(pptx_data)
+        
+        # Delete slide from PPTX
+        if slide_index < len(prs.slides):
+            PPTXService.delete_slide(prs, slide_index)
+        
+        return PPTXService.save_presentation(prs)
 
 
 class BlockUseCase:
@@ -273,8 +775,9 @@ class BlockUseCase:
         slide_repo: SlideRepository,
         block_repo: BlockRepository,
         value_repo: BlockValueRepository,
-        storage_service: MinIOStorageService,
-        template_client: TemplateServiceClient
+        storage_service: AsyncMinIOStorageService,
+        template_client: TemplateServiceClient,
+        block_cache: Optional[BlockCache] = None
     ):
         self.presentation_repo = presentation_repo
         self.slide_repo = slide_repo
@@ -282,6 +785,7 @@ class BlockUseCase:
         self.value_repo = value_repo
         self.storage_service = storage_service
         self.template_client = template_client
+        self.block_cache = block_cache
     
     async def add_block_to_slide(
         self,
@@ -301,53 +805,59 @@ class BlockUseCase:
             Created block
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
         # Get slide
-        slides = self.slide_repo.get_by_presentation(presentation_id)
-        if slide_index >= len(slides):
+        slide_ids = await self.slide_repo.get_ids_by_presentation(presentation_id)
+        if slide_index >= len(slide_ids):
             raise ValueError(f"Slide index {slide_index} out of range")
         
-        slide = slides[slide_index]
-        
-        # Download block PPTX from template service
-        block_pptx_data = await self.template_client.download_block_pptx(template_block_id)
-        if not block_pptx_data:
-            raise ValueError(f"Could not download template block {template_block_id}")
-        
-        # Download current presentation PPTX
-        object_name = presentation.file_url  # file_url already contains just the object_name
-        pptx_data = self.storage_service.download_file(object_name)
-        
-        # Load presentation and copy shapes from block
-        prs = PPTXService.load_presentation(pptx_data)
-        success = PPTXService.copy_shapes_from_block(prs, block_pptx_data, slide_index)
-        
-        if not success:
-            raise ValueError("Failed to copy shapes from block")
+        slide_id = slide_ids[slide_index]
         
-        # Save updated PPTX
-        updated_pptx = PPTXService.save_presentation(prs)
-        self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+        if settings.DEFERRED_ASSEMBLY:
+            # Shapes are copied at generate time; only make sure the block exists
+            if not await self.template_client.get_template_block(template_block_id):
+                raise ValueError(f"Template block {template_block_id} not found")
+        else:
+            # Parsed block from the local cache or template service
+            template_block = await load_template_block(self.template_client, self.block_cache, template_block_id)
+            
+            # Download current presentation PPTX
+            object_name = presentation.file_url  # file_url already contains just the object_name
+            pptx_data = await self.storage_service.download_file(object_name)
+            
+            updated_pptx = await asyncio.to_thread(
+                self._copy_block_to_pptx, pptx_data, template_block.source_slide, slide_index
+            )
+            
+            # Save updated PPTX
+            await self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
         
         # Create block entity
-        existing_blocks = self.block_repo.get_by_slide(slide.id)
-        position_index = len(existing_blocks)
+        position_index = await self.block_repo.count_by_slide(slide_id)
         
         block = SlideBlock(
             id=uuid4(),
-            slide_id=slide.id,
+            slide_id=slide_id,
             template_block_id=template_block_id,
             position_index=position_index
         )
         
         # Update presentation timestamp
         presentation.updated_at = datetime.utcnow()
-        self.presentation_repo.update(presentation)
+        await self.presentation_repo.update(presentation)
         
-        return self.block_repo.create(block)
+        return await self.block_repo.create(block)
+    
+    @staticmethod
+    def _copy_block_to_pptx(pptx_data: bytes, source_slide, slide_index: int) -> bytes:
+        """Copy block shapes onto a slide of PPTX data (CPU-bound, run in a thread)"""
+        prs = PPTXService.load_presentation(pptx_data)
+        if not PPTXService.copy_shapes_from_slide(prs, source_slide, slide_index):
+            raise ValueError("Failed to copy shapes from block")
+        return PPTXService.save_presentation(prs)
     
     async def update_block_values(
         self,
@@ -367,12 +877,12 @@ class BlockUseCase:
             Updated block
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
         # Get block
-        block = self.block_repo.get_by_id(block_id)
+        block = await self.block_repo.get_by_id(block_id)
         if not block:
             raise ValueError(f"Block {block_id} not found")
         
@@ -381,94 +891,92 @@ class BlockUseCase:
         if not template_block:
             raise ValueError(f"Template block {block.template_block_id} not found")
         
-        # Update values in database
-        for field_key, value in values.items():
-            self.value_repo.upsert(block_id, field_key, {"value": value})
+        # Diff against stored values: only changed fields are written and re-rendered
+        stored_values = {bv.field_key: bv.value.get("value") for bv in block.values}
+        changed_values = {k: v for k, v in values.items() if stored_values.get(k) != v}
+        if not changed_values:
+            logger.info(f"Block {block_id} values unchanged, skipping re-render")
+            return block
         
-        # Download current presentation PPTX
-        object_name = presentation.file_url
-        pptx_data = self.storage_service.download_file(object_name)
+        # Update values in database (single INSERT ... ON CONFLICT)
+        await self.value_repo.upsert_many(block_id, {k: {"value": v} for k, v in changed_values.items()})
         
-        # Load presentation
-        prs = PPTXService.load_presentation(pptx_data)
+        if settings.DEFERRED_ASSEMBLY:
+            # Values are rendered when the deck is assembled at generate time
+            presentation.updated_at = datetime.utcnow()
+            await self.presentation_repo.update(presentation)
+            return await self.block_repo.get_by_id(block_id)
         
-        # Get slide
-        slide = self.slide_repo.get_by_id(block.slide_id)
+        # Slide position in the PPTX is its position in sort key order
+        slide_index = (await self.slide_repo.get_ids_by_presentation(presentation_id)).index(block.slide_id)
         
         # Получаем ВСЕ блоки на слайде, отсортированные по position_index
-        all_blocks_on_slide = self.block_repo.get_by_slide(slide.id)
+        all_blocks_on_slide = await self.block_repo.get_by_slide(block.slide_id)
         all_blocks_on_slide_sorted = sorted(all_blocks_on_slide, key=lambda b: b.position_index)
         
         logger.info(f"Slide has {len(all_blocks_on_slide_sorted)} blocks total, updating block {block_id}")
         
         # Подготавливаем данные полей для ВСЕХ блоков на слайде
-        all_fields_data = []
-        global_order_index = 0
-        
+        template_blocks = {}
+        block_values = {}
         for slide_block in all_blocks_on_slide_sorted:
             # Получаем метаданные блока из template service
-            block_template = await self.template_client.get_block_by_id(slide_block.template_block_id)
-            if not block_template:
-                logger.warning(f"Template block {slide_block.template_block_id} not found, skipping")
-                continue
+            if slide_block.template_block_id not in template_blocks:
+                template_blocks[slide_block.template_block_id] = await self.template_client.get_block_by_id(slide_block.template_block_id)
             
-            # Получаем значения для этого блока
-            block_values = self.value_repo.get_by_block(slide_block.id)
-            block_values_dict = {bv.field_key: bv.value.get("value", "") for bv in block_values}
+            # Получаем значения для этого блока (загружены вместе с блоками)
+            block_values[slide_block.id] = {bv.field_key: bv.value.get("value", "") for bv in slide_block.values}
             
             # Если это текущий блок, используем новые значения
             if slide_block.id == block_id:
-                block_values_dict.update(values)
-            
-            # Получаем поля из template_block и сортируем по order_index
-            for field in sorted(block_template.get("fields", []), key=lambda f: f.get("order_index", 0)):
-                field_key = field.get("key")
-                
-                # Проверяем, есть ли значение для этого поля
-                if field_key in block_values_dict and block_values_dict[field_key]:
-                    field_value = block_values_dict[field_key]
-                    field_metadata = field.get("metadata", {})
-                    
-                    # Извлекаем метаданные шрифта
-                    font_info = field_metadata.get("font") or {}
-                    
-                    font_metadata = {
-                        "name": font_info.get("name") or "Arial",
-                        "size": font_info.get("size") or 18,
-                        "color": font_info.get("color") or "#000000",
-                        "bold": font_info.get("bold") or False,
-                        "italic": font_info.get("italic") or False,
-                        "alignment": field_metadata.get("alignment") or "LEFT"
-                    }
-                    
-                    logger.debug(f"Block {slide_block.position_index}, Field {field_key}: font_metadata={font_metadata}")
-                    
-                    all_fields_data.append({
-                        "text": str(field_value),
-                        "font_metadata": font_metadata,
-                        "order_index": global_order_index
-                    })
-                    global_order_index += 1
-        
-        # Используем новый метод fill_template_with_data для автоматического размещения ВСЕХ блоков
-        logger.info(f"Filling slide {slide.order_index} with {len(all_fields_data)} fields from {len(all_blocks_on_slide_sorted)} blocks")
-        success = PPTXService.fill_template_with_data(prs, slide.order_index, all_fields_data)
+                block_values[slide_block.id].update(values)
         
-        if not success:
-            logger.warning("Failed to use auto-layout, falling back to simple placeholder replacement")
-            # Fallback на старый метод
-            replacements = {k: str(v) for k, v in values.items()}
-            PPTXService.replace_placeholders(prs, slide.order_index, replacements)
+        all_fields_data = build_fields_data(all_blocks_on_slide_sorted, template_blocks, block_values)
+        
+        # Download current presentation PPTX
+        object_name = presentation.file_url
+        pptx_data = await self.storage_service.download_file(object_name)
+        
+        updated_pptx = await asyncio.to_thread(
+            self._render_block_values, pptx_data, slide_index, all_fields_data, block_id, changed_values
+        )
         
         # Save updated PPTX
-        updated_pptx = PPTXService.save_presentation(prs)
-        self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
+        await self.storage_service.upload_file(io.BytesIO(updated_pptx), object_name)
         
         # Update presentation timestamp
         presentation.updated_at = datetime.utcnow()
-        self.presentation_repo.update(presentation)
+        await self.presentation_repo.update(presentation)
         
-        return self.block_repo.get_by_id(block_id)
+        return await self.block_repo.get_by_id(block_id)
+    
+    @staticmethod
+    def _render_block_values(
+        pptx_data: bytes,
+        slide_index: int,
+        all_fields_data: List[Dict[str, Any]],
+        block_id: UUID,
+        changed_values: Dict[str, Any]
+    ) -> bytes:
+        """Write changed block values into a slide of PPTX data (CPU-bound, run in a thread)"""
+        prs = PPTXService.load_presentation(pptx_data)
+        
+        # Сначала пробуем обновить только изменившиеся поля на месте
+        changed_fields = {(str(block_id), field_key) for field_key in changed_values}
+        success = PPTXService.update_fields_in_place(prs, slide_index, all_fields_data, changed_fields)
+        
+        if not success:
+            # Используем fill_template_with_data для автоматического размещения ВСЕХ блоков
+            logger.info(f"Filling slide {slide_index} with {len(all_fields_data)} fields")
+            success = PPTXService.fill_template_with_data(prs, slide_index, all_fields_data)
+        
+        if not success:
+            logger.warning("Failed to use auto-layout, falling back to simple placeholder replacement")
+            # Fallback на старый метод
+            replacements = {k: str(v) for k, v in changed_values.items()}
+            PPTXService.replace_placeholders(prs, slide_index, replacements)
+        
+        return PPTXService.save_presentation(prs)
     
     async def delete_block(
         self,
@@ -488,17 +996,17 @@ class BlockUseCase:
             True if deleted successfully
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
         # Get block
-        block = self.block_repo.get_by_id(block_id)
+        block = await self.block_repo.get_by_id(block_id)
         if not block or block.slide_id != slide_id:
             return False
         
         # Delete block entity (cascade will delete values)
-        success = self.block_repo.delete(block_id)
+        success = await self.block_repo.delete(block_id)
         
         # Note: We're not removing shapes from PPTX here as it's complex
         # The shapes will remain in the file but won't have associated data
@@ -507,7 +1015,7 @@ class BlockUseCase:
         # Update presentation timestamp
         if success:
             presentation.updated_at = datetime.utcnow()
-            self.presentation_repo.update(presentation)
+            await self.presentation_repo.update(presentation)
         
         return success
 
@@ -518,15 +1026,26 @@ class GenerationUseCase:
     def __init__(
         self,
         presentation_repo: PresentationRepository,
-        storage_service: MinIOStorageService
+        storage_service: AsyncMinIOStorageService,
+        slide_repo: SlideRepository,
+        template_client: TemplateServiceClient,
+        block_cache: Optional[BlockCache] = None,
+        job_repo: Optional[GenerationJobRepository] = None
     ):
         self.presentation_repo = presentation_repo
         self.storage_service = storage_service
+        self.slide_repo = slide_repo
+        self.template_client = template_client
+        self.block_cache = block_cache
+        self.job_repo = job_repo
     
-    def generate_presentation(self, presentation_id: UUID) -> Presentation:
+    async def generate_presentation(self, presentation_id: UUID) -> Presentation:
         """
         Finalize and generate the presentation
         
+        In deferred assembly mode the deck is built here from the DB structure;
+        otherwise the stored PPTX is already up to date.
+        
         Args:
             presentation_id: UUID of the presentation
             
@@ -534,12 +1053,542 @@ class GenerationUseCase:
             Updated presentation
         """
         # Get presentation
-        presentation = self.presentation_repo.get_by_id(presentation_id)
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
         if not presentation:
             raise ValueError(f"Presentation {presentation_id} not found")
         
+        if settings.DEFERRED_ASSEMBLY:
+            await self._assemble(presentation)
+        
         # Update status to Generated
         presentation.status = "Generated"
         presentation.updated_at = datetime.utcnow()
         
-        return self.presentation_repo.update(presentation)
+        return await self.presentation_repo.update(presentation)
+    
+    async def enqueue_generation(self, presentation_id: UUID) -> GenerationJob:
+        """
+        Queue deck assembly for a background worker
+        
+        Args:
+            presentation_id: UUID of the presentation
+            
+        Returns:
+            New job, or the presentation's job that is already queued or running
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation:
+            raise ValueError(f"Presentation {presentation_id} not found")
+        
+        active_job = await self.job_repo.get_active_by_presentation(presentation_id)
+        if active_job:
+            return active_job
+        
+        job = await self.job_repo.create(GenerationJob(
+            id=uuid4(),
+            presentation_id=presentation_id,
+            tenant_id=presentation.project_id,
+            status="Queued"
+        ))
+        
+        presentation.status = "Generating"
+        presentation.updated_at = datetime.utcnow()
+        await self.presentation_repo.update(presentation)
+        
+        logger.info(f"Queued generation job {job.id} for presentation {presentation_id}")
+        return job
+    
+    async def get_job(self, presentation_id: UUID, job_id: UUID) -> Optional[GenerationJob]:
+        """Get a generation job of a presentation"""
+        job = await self.job_repo.get_by_id(job_id)
+        if not job or job.presentation_id != presentation_id:
+            return None
+        return job
+    
+    async def cancel_job(self, presentation_id: UUID, job_id: UUID) -> Optional[GenerationJob]:
+        """
+        Cancel a generation job
+        
+        Queued jobs are cancelled immediately; running jobs stop after the
+        slide being assembled.
+        
+        Returns:
+            Updated job or None if not found
+        """
+        if not await self.get_job(presentation_id, job_id):
+            return None
+        job = await self.job_repo.request_cancel(job_id)
+        if job and job.status == "Cancelled":
+            await self.reset_generation_status(presentation_id)
+        return job
+    
+    async def reset_generation_status(self, presentation_id: UUID):
+        """Return a presentation whose generation did not complete to Draft"""
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if presentation and presentation.status == "Generating":
+            presentation.status = "Draft"
+            presentation.updated_at = datetime.utcnow()
+            await self.presentation_repo.update(presentation)
+    
+    async def prepare_assembly(
+        self,
+        presentation: Presentation
+    ) -> Tuple[bytes, Dict[UUID, CachedBlock], List[Tuple[List[UUID], List[Dict[str, Any]], Dict[str, Any]]]]:
+        """
+        Collect everything deck assembly needs
+        
+        Args:
+            presentation: Presentation to assemble
+            
+        Returns:
+            (base deck, parsed template blocks by id,
+             per slide: (template block ids in position order, field data, origin))
+        """
+        # Slides come with blocks and values in one query
+        slides = await self.slide_repo.get_by_presentation(presentation.id)
+        base_data = await load_base_pptx(self.storage_service, presentation.file_url)
+        await ensure_slide_origins(self.slide_repo, slides, base_data)
+        blocks, slides_spec = await prepare_slides(self.template_client, self.block_cache, slides)
+        return base_data, blocks, slides_spec
+    
+    async def _assemble(self, presentation: Presentation):
+        """Build the deck from slides, blocks and values and store it in one upload"""
+        base_data, blocks, slides_spec = await self.prepare_assembly(presentation)
+        slides = [
+            ([blocks[block_id].source_slide for block_id in block_ids], fields_data, origin)
+            for block_ids, fields_data, origin in slides_spec
+        ]
+        pptx_data = await asyncio.to_thread(PPTXService.assemble_presentation, base_data, slides)
+        await self.storage_service.upload_file(io.BytesIO(pptx_data), presentation.file_url)
+        logger.info(f"Assembled presentation {presentation.id}: {len(slides)} slide(s), {len(blocks)} template block(s)")
+
+
+class ThumbnailUseCase:
+    """Use cases for slide thumbnails"""
+    
+    def __init__(
+        self,
+        presentation_repo: PresentationRepository,
+        slide_repo: SlideRepository,
+        storage_service: AsyncMinIOStorageService,
+        template_client: TemplateServiceClient,
+        renderer: OfficeRenderer,
+        block_cache: Optional[BlockCache] = None,
+        flights: Optional[SingleFlight] = None
+    ):
+        self.presentation_repo = presentation_repo
+        self.slide_repo = slide_repo
+        self.storage_service = storage_service
+        self.template_client = template_client
+        self.renderer = renderer
+        self.block_cache = block_cache
+        self.flights = flights or SingleFlight()
+    
+    async def get_slide_thumbnail(self, presentation_id: UUID, slide_id: UUID) -> Tuple[str, bytes]:
+        """
+        Get a PNG thumbnail of a slide
+        
+        Thumbnails are stored in MinIO under the hash of the slide's content
+        (slide size, slide XML and the parts it uses), so a slide is rendered
+        again only after something on it changed, and editing one slide never
+        re-renders the others. Only the slide itself is rendered, as a
+        one-slide deck. Thumbnails of earlier slide contents are removed with
+        the presentation.
+        
+        Args:
+            presentation_id: UUID of the presentation
+            slide_id: UUID of the slide
+            
+        Returns:
+            (content hash, PNG bytes)
+            
+        Raises:
+            ValueError: If the presentation or slide is not found
+            RendererUnavailable: If LibreOffice is not available
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation:
+            raise ValueError(f"Presentation {presentation_id} not found")
+        
+        slide_ids = await self.slide_repo.get_ids_by_presentation(presentation_id)
+        if slide_id not in slide_ids:
+            raise ValueError(f"Slide {slide_id} not found in presentation")
+        slide_index = slide_ids.index(slide_id)
+        
+        if settings.DEFERRED_ASSEMBLY:
+            # The stored file is only current after generation: assemble this slide alone
+            slide = await self.slide_repo.get_with_blocks(slide_id)
+            base_data = await load_base_pptx(self.storage_service, presentation.file_url)
+            if not slide.has_origin:
+                await ensure_slide_origins(
+                    self.slide_repo, await self.slide_repo.get_by_presentation(presentation_id), base_data
+                )
+            blocks, slides_spec = await prepare_slides(self.template_client, self.block_cache, [slide])
+            pptx_data = await asyncio.to_thread(self._assemble_slide, base_data, blocks, slides_spec[0])
+            slide_index = 0
+        else:
+            pptx_data = await self.storage_service.download_file(presentation.file_url)
+        
+        prs = await asyncio.to_thread(PPTXService.load_presentation, pptx_data)
+        if slide_index >= len(prs.slides):
+            raise ValueError(f"Slide {slide_id} is not in the presentation file")
+        content_hash = await asyncio.to_thread(PPTXService.slide_content_hash, prs.slides[slide_index])
+        
+        width = settings.THUMBNAIL_WIDTH
+        object_name = f"{thumbnail_prefix(presentation_id)}{content_hash}-{width}.png"
+        if await self.storage_service.file_exists(object_name):
+            return content_hash, await self.storage_service.download_file(object_name)
+        
+        async def render() -> bytes:
+            height = round(width * prs.slide_height / prs.slide_width)
+            slide_deck = await asyncio.to_thread(PPTXService.extract_slide, prs, slide_index)
+            export_options = (
+                f'{{"PixelWidth":{{"type":"long","value":"{width}"}},'
+                f'"PixelHeight":{{"type":"long","value":"{height}"}}}}'
+            )
+            png_data = await self.renderer.convert(slide_deck, f"png:impress_png_Export:{export_options}")
+            await self.storage_service.upload_file(io.BytesIO(png_data), object_name, content_type="image/png")
+            logger.info(f"Rendered thumbnail of slide {slide_id} ({content_hash[:12]}, {width}x{height})")
+            return png_data
+        
+        # Identical slides requested at the same time are rendered once
+        return content_hash, await self.flights.run(object_name, render)
+    
+    @staticmethod
+    def _assemble_slide(
+        base_data: bytes,
+        blocks: Dict[UUID, CachedBlock],
+        slide_spec: Tuple[List[UUID], List[Dict[str, Any]], Dict[str, Any]]
+    ) -> bytes:
+        """Assemble a one-slide deck with the slide built as at generation (CPU-bound)"""
+        block_ids, fields_data, origin = slide_spec
+        # The origin makes it start from the same base slide (or layout) as in the full deck
+        return PPTXService.assemble_presentation(
+            base_data, [([blocks[block_id].source_slide for block_id in block_ids], fields_data, origin)]
+        )
+
+
+class ExportUseCase:
+    """Use cases for exporting presentations to other formats"""
+    
+    def __init__(
+        self,
+        presentation_repo: PresentationRepository,
+        storage_service: AsyncMinIOStorageService,
+        renderer: OfficeRenderer,
+        flights: Optional[SingleFlight] = None
+    ):
+        self.presentation_repo = presentation_repo
+        self.storage_service = storage_service
+        self.renderer = renderer
+        self.flights = flights or SingleFlight()
+    
+    async def export_pdf(self, presentation_id: UUID) -> Tuple[Presentation, str, str]:
+        """
+        Make sure a PDF of the presentation's current file is stored
+        
+        The PDF is the deck /download serves, converted by LibreOffice. It is
+        stored under the ETag of that PPTX, which changes with every upload
+        of the deck: an unchanged deck is converted once and then served from
+        storage, and concurrent requests for the same version wait for one
+        conversion. Exports of previous versions are removed with the
+        presentation.
+        
+        Args:
+            presentation_id: UUID of the presentation
+            
+        Returns:
+            (presentation, PPTX ETag the PDF was made from, object name of the PDF)
+            
+        Raises:
+            ValueError: If the presentation is not found
+            RendererUnavailable: If LibreOffice is not available
+            RuntimeError: If the conversion fails or times out
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation:
+            raise ValueError(f"Presentation {presentation_id} not found")
+        
+        version = await self.storage_service.get_file_etag(presentation.file_url)
+        object_name = f"{pdf_export_prefix(presentation_id)}{version}.pdf"
+        if await self.storage_service.file_exists(object_name):
+            return presentation, version, object_name
+        
+        async def convert():
+            # Read exactly the version the PDF is named after (412 if replaced meanwhile)
+            chunks = await self.storage_service.open_file_stream(presentation.file_url, match_etag=version)
+            pptx_data = b"".join([chunk async for chunk in chunks])
+            
+            started = datetime.now()
+            pdf_data = await self.renderer.convert(pptx_data, "pdf", timeout=settings.PDF_EXPORT_TIMEOUT)
+            await self.storage_service.upload_file(io.BytesIO(pdf_data), object_name, content_type="application/pdf")
+            logger.info(
+                f"Exported presentation {presentation_id} to PDF ({version}, {len(pdf_data)} bytes) "
+                f"in {(datetime.now() - started).total_seconds():.1f}s"
+            )
+        
+        await self.flights.run(object_name, convert)
+        return presentation, version, object_name
+
+
+class VersionUseCase:
+    """Use cases for presentation version snapshots"""
+    
+    def __init__(
+        self,
+        presentation_repo: PresentationRepository,
+        slide_repo: SlideRepository,
+        version_repo: PresentationVersionRepository,
+        storage_service: AsyncMinIOStorageService
+    ):
+        self.presentation_repo = presentation_repo
+        self.slide_repo = slide_repo
+        self.version_repo = version_repo
+        self.storage_service = storage_service
+    
+    async def create_version(self, presentation_id: UUID, label: Optional[str] = None) -> Tuple[PresentationVersion, int, int]:
+        """
+        Take a snapshot of the presentation
+        
+        The deck is split into its OPC parts (slide XML, layouts, media, ...).
+        Parts are stored by content hash and only those no version of the
+        presentation has yet are uploaded, so a snapshot stores what changed
+        since the earlier ones, not the whole deck. Slides, blocks and values
+        are saved with the manifest. Versions beyond VERSION_RETENTION are
+        removed, oldest first.
+        
+        Args:
+            presentation_id: UUID of the presentation
+            label: Optional version label
+            
+        Returns:
+            (version, number of uploaded parts, uploaded bytes)
+            
+        Raises:
+            ValueError: If the presentation is not found
+            VersionConflict: If the version could not be stored because of a concurrent change
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation or not presentation.file_url:
+            raise ValueError(f"Presentation {presentation_id} not found")
+        
+        result = await self._snapshot(presentation, label)
+        await self._prune(presentation_id)
+        return result
+    
+    async def _snapshot(self, presentation: Presentation, label: Optional[str]) -> Tuple[PresentationVersion, int, int]:
+        """Store the parts of the current deck that are not stored yet and create the version"""
+        pptx_data = await self.storage_service.download_file(presentation.file_url)
+        manifest, parts = await asyncio.to_thread(split_deck, pptx_data)
+        slides = await self.slide_repo.get_by_presentation(presentation.id)
+        
+        # Held until create() commits: a concurrent prune cannot delete parts
+        # this version skips uploading, and the version number stays unique
+        await self.version_repo.lock_presentation(presentation.id)
+        stored = await self.version_repo.get_part_hashes(presentation.id)
+        new_parts = await asyncio.to_thread(
+            self._encode_parts, {digest: data for digest, data in parts.items() if digest not in stored}
+        )
+        # Uploads run in the storage pool, so at most its size are in flight
+        await asyncio.gather(*(
+            self.storage_service.upload_file(
+                io.BytesIO(blob),
+                version_part_object_name(presentation.id, digest),
+                content_type="application/octet-stream"
+            )
+            for digest, blob in new_parts.items()
+        ))
+        
+        number = await self.version_repo.get_last_number(presentation.id) + 1
+        version = await self.version_repo.create(PresentationVersion(
+            id=uuid4(),
+            presentation_id=presentation.id,
+            number=number,
+            label=label,
+            parts=manifest,
+            slides=self._slides_state(slides),
+            size=len(pptx_data)
+        ))
+        
+        uploaded_bytes = sum(len(blob) for blob in new_parts.values())
+        logger.info(
+            f"Created version {number} of presentation {presentation.id}: {len(manifest)} part(s), "
+            f"{len(new_parts)} new ({uploaded_bytes} of {len(pptx_data)} bytes uploaded)"
+        )
+        return version, len(new_parts), uploaded_bytes
+    
+    @staticmethod
+    def _encode_parts(parts: Dict[str, bytes]) -> Dict[str, bytes]:
+        """Encode parts for storage (CPU-bound, run in a thread)"""
+        return {digest: encode_part(data) for digest, data in parts.items()}
+    
+    async def _prune(self, presentation_id: UUID):
+        """Remove versions beyond the retention limit and the parts only they used"""
+        # Committed only after the parts are deleted, so a snapshot cannot
+        # see the dropped versions' parts as stored in the meantime
+        await self.version_repo.lock_presentation(presentation_id)
+        dropped = await self.version_repo.delete_oldest(presentation_id, settings.VERSION_RETENTION)
+        if dropped:
+            unreferenced = dropped - await self.version_repo.get_part_hashes(presentation_id)
+            await self.storage_service.delete_files(
+                version_part_object_name(presentation_id, digest) for digest in unreferenced
+            )
+        await self.version_repo.commit()
+    
+    async def list_versions(self, presentation_id: UUID) -> List[Tuple]:
+        """
+        List versions of a presentation, newest first
+        
+        Raises:
+            ValueError: If the presentation is not found
+        """
+        if not await self.presentation_repo.exists(presentation_id):
+            raise ValueError(f"Presentation {presentation_id} not found")
+        return await self.version_repo.list_by_presentation(presentation_id)
+    
+    async def get_version(self, presentation_id: UUID, number: int) -> Tuple[Presentation, PresentationVersion]:
+        """
+        Get a version with its presentation
+        
+        Raises:
+            ValueError: If the presentation or version is not found
+        """
+        presentation = await self.presentation_repo.get_by_id(presentation_id)
+        if not presentation:
+            raise ValueError(f"Presentation {presentation_id} not found")
+        version = await self.version_repo.get_by_number(presentation_id, number)
+        if not version:
+            raise ValueError(f"Version {number} of presentation {presentation_id} not found")
+        return presentation, version
+    
+    async def stream_version(self, version: PresentationVersion) -> AsyncIterator[bytes]:
+        """
+        Reassemble the deck of a version
+        
+        Parts are fetched in manifest order, VERSION_PART_PREFETCH ahead of
+        the one being written, and the zip is produced member by member: the
+        deck is streamed out as it is built and only parts in flight are held
+        in memory. The same version always yields the same bytes.
+        
+        Args:
+            version: Version to reassemble
+            
+        Yields:
+            Chunks of the PPTX file
+            
+        Raises:
+            RuntimeError: If a stored part does not match its hash
+        """
+        entries = version.parts
+        writer = DeckZipWriter()
+        pending = deque()
+        next_index = 0
+        try:
+            for entry in entries:
+                while next_index < len(entries) and len(pending) < max(1, settings.VERSION_PART_PREFETCH):
+                    pending.append(asyncio.create_task(self.storage_service.download_file(
+                        version_part_object_name(version.presentation_id, entries[next_index]["sha256"])
+                    )))
+                    next_index += 1
+                blob = await pending.popleft()
+                yield await asyncio.to_thread(self._add_part, writer, entry, blob)
+            yield writer.close()
+        finally:
+            # Client disconnected or a part failed: drop prefetched parts
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _add_part(writer: DeckZipWriter, entry: Dict[str, Any], blob: bytes) -> bytes:
+        """Decode a stored part, check it against its hash and write it (CPU-bound, run in a thread)"""
+        try:
+            data = decode_part(blob)
+        except ValueError:
+            data = None
+        if data is None or part_hash(data) != entry["sha256"]:
+            raise RuntimeError(f"Stored part {entry['sha256']} ({entry['name']}) is corrupted")
+        return writer.add(entry["name"], data, entry["deflate"])
+    
+    async def restore_version(self, presentation_id: UUID, number: int) -> Presentation:
+        """
+        Make a version the current state of the presentation
+        
+        The current state is saved as a new version first, so a restore can
+        itself be undone. Then the deck file is replaced with the version's
+        deck and the slides, blocks and values with the saved ones (slides
+        get new ids).
+        
+        Args:
+            presentation_id: UUID of the presentation
+            number: Number of the version to restore
+            
+        Returns:
+            Presentation with its restored slides
+            
+        Raises:
+            ValueError: If the presentation or version is not found
+            VersionConflict: If the pre-restore snapshot could not be stored
+        """
+        presentation, version = await self.get_version(presentation_id, number)
+        
+        await self._snapshot(presentation, f"Before restoring version {number}")
+        
+        pptx_data = b"".join([chunk async for chunk in self.stream_version(version)])
+        await self.storage_service.upload_file(io.BytesIO(pptx_data), presentation.file_url)
+        await self.slide_repo.replace_by_presentation(
+            presentation_id, self._build_slides(presentation_id, version.slides)
+        )
+        
+        presentation.updated_at = datetime.utcnow()
+        await self.presentation_repo.update(presentation)
+        logger.info(f"Restored version {number} of presentation {presentation_id}")
+        
+        # Pruned only now: the restored version may be the oldest one
+        await self._prune(presentation_id)
+        return await self.presentation_repo.get_with_slides(presentation_id)
+    
+    @staticmethod
+    def _slides_state(slides: List[PresentationSlide]) -> List[Dict[str, Any]]:
+        """Serialize slides with blocks and values for a version"""
+        return [
+            {
+                "sort_key": slide.sort_key,
+                **slide.origin,
+                "blocks": [
+                    {
+                        "template_block_id": str(block.template_block_id),
+                        "position_index": block.position_index,
+                        "values": {value.field_key: value.value for value in block.values}
+                    }
+                    for block in sorted(slide.blocks, key=lambda b: b.position_index)
+                ]
+            }
+            for slide in slides
+        ]
+    
+    @staticmethod
+    def _build_slides(presentation_id: UUID, state: List[Dict[str, Any]]) -> List[PresentationSlide]:
+        """Create slide trees from a version's saved state"""
+        return [
+            PresentationSlide(
+                id=uuid4(),
+                presentation_id=presentation_id,
+                sort_key=slide["sort_key"],
+                base_slide_id=slide.get("base_slide_id"),
+                layout_slide_id=slide.get("layout_slide_id"),
+                layout_index=slide.get("layout_index"),
+                blocks=[
+                    SlideBlock(
+                        id=uuid4(),
+                        template_block_id=UUID(block["template_block_id"]),
+                        position_index=block["position_index"],
+                        values=[
+                            SlideBlockValue(id=uuid4(), field_key=field_key, value=value)
+                            for field_key, value in block["values"].items()
+                        ]
+                    )
+                    for block in slide["blocks"]
+                ]
+            )
+            for slide in state
+        ]
@@ -1,36 +1,62 @@
 """Database configuration and session management"""
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Iterator, List, Optional
 
 from app.config.settings import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
+# Create async SQLAlchemy engine (asyncpg)
+engine = create_async_engine(
+    settings.async_database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     echo=False
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attributes cannot be lazily re-loaded with AsyncSession
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Create Base class for models
 Base = declarative_base()
 
+# Statement counter of the current request (set by count_queries)
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("query_counter", default=None)
 
-def get_db() -> Generator[Session, None, None]:
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[List[int]]:
     """
-    Dependency for getting database session
+    Count SQL statements executed in this context (including spawned tasks)
     
     Yields:
-        Session: Database session
+        One-element list holding the running count
     """
-    db = SessionLocal()
+    counter = [0]
+    token = _query_counter.set(counter)
     try:
-        yield db
+        yield counter
     finally:
-        db.close()
+        _query_counter.reset(token)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting database session
+    
+    Yields:
+        AsyncSession: Database session
+    """
+    async with SessionLocal() as db:
+        yield db
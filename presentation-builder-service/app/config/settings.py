@@ -1,6 +1,6 @@
 """Application settings and configuration"""
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -19,6 +19,10 @@ class Settings(BaseSettings):
     DB_USER: str = Field(default="postgres")
     DB_PASSWORD: str = Field(default="postgres")
     DB_NAME: str = Field(default="presentation_builder")
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    # Add X-DB-Query-Count to responses (used by scripts/check_query_counts.py)
+    DB_QUERY_COUNT_HEADER: bool = Field(default=False)
     
     # MinIO Configuration
     MINIO_ENDPOINT: str = Field(default="minio:9000")
@@ -26,6 +30,42 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = Field(default="minioadmin")
     MINIO_BUCKET_NAME: str = Field(default="presentations")
     MINIO_USE_SSL: bool = Field(default=False)
+    MINIO_REGION: str = Field(default="us-east-1")
+    # Endpoint clients use for presigned download URLs (defaults to MINIO_ENDPOINT)
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = Field(default=None)
+    MINIO_PUBLIC_USE_SSL: bool = Field(default=False)
+    # Threads for blocking MinIO calls (bounds concurrent transfers per instance)
+    STORAGE_THREAD_POOL_SIZE: int = Field(default=8)
+    # Files above the part size are uploaded as multipart (minimum part size is 5 MiB)
+    STORAGE_MULTIPART_PART_SIZE: int = Field(default=16 * 1024 * 1024)
+    STORAGE_MULTIPART_CONCURRENCY: int = Field(default=4)
+    
+    # Presentation download
+    DOWNLOAD_CHUNK_SIZE: int = Field(default=256 * 1024)
+    # Redirect downloads to a presigned MinIO URL instead of proxying the bytes
+    DOWNLOAD_PRESIGNED_REDIRECT: bool = Field(default=False)
+    DOWNLOAD_PRESIGNED_EXPIRY: int = Field(default=300)
+    
+    # Headless LibreOffice used for rendering (thumbnails, PDF export)
+    OFFICE_SOFFICE_PATH: str = Field(default="soffice")
+    OFFICE_POOL_SIZE: int = Field(default=2)
+    OFFICE_CONVERT_TIMEOUT: int = Field(default=60)
+    # Profiles kept here survive restarts (temp dir if not set)
+    OFFICE_WORK_DIR: Optional[str] = Field(default=None)
+    # Initialize all profiles at startup (in the background)
+    OFFICE_WARM_UP: bool = Field(default=True)
+    
+    # Slide thumbnails are cached in MinIO under thumbnails/{presentation_id}/ by slide content hash
+    THUMBNAIL_WIDTH: int = Field(default=480)
+    
+    # PDF exports are cached in MinIO under exports/{presentation_id}/ by PPTX ETag
+    PDF_EXPORT_TIMEOUT: int = Field(default=180)
+    
+    # Version snapshots: deck parts are stored in MinIO under versions/{presentation_id}/
+    # by content hash and shared between versions
+    VERSION_RETENTION: int = Field(default=50)
+    # Parts fetched ahead while a version is reassembled
+    VERSION_PART_PREFETCH: int = Field(default=4)
     
     # Consul Configuration
     CONSUL_HOST: str = Field(default="consul")
@@ -38,10 +78,25 @@ class Settings(BaseSettings):
     JWT_ISSUER: str = Field(default="AuthService")
     JWT_AUDIENCE: str = Field(default="ApiClients")
     JWT_ALGORITHM: str = Field(default="RS256")
+    # Comma-separated base64 DER keys still accepted while rotating JWT_PUBLIC_KEY
+    JWT_PREVIOUS_PUBLIC_KEYS: str = Field(default="")
+    JWT_CACHE_SIZE: int = Field(default=10000)
+    JWT_CACHE_MAX_TTL: float = Field(default=300.0)
     
     # External Services
     TEMPLATE_SERVICE_NAME: str = Field(default="template-service")
     PROJECT_SERVICE_NAME: str = Field(default="project-service")
+    SERVICE_DISCOVERY_REFRESH_INTERVAL: float = Field(default=15.0)
+    # Cache TTLs (seconds) for project existence checks; 0 disables caching
+    PROJECT_EXISTS_CACHE_TTL: float = Field(default=60.0)
+    PROJECT_NOT_FOUND_CACHE_TTL: float = Field(default=10.0)
+    
+    # Shared HTTP client for downstream services
+    HTTP_CLIENT_TIMEOUT: float = Field(default=30.0)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100)
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = Field(default=30.0)
+    HTTP_CLIENT_HTTP2: bool = Field(default=True)
     
     # Master Template Configuration
     # Оставьте пустым для использования пустой презентации
@@ -50,6 +105,38 @@ class Settings(BaseSettings):
         default=None,
         description="URL мастер-шаблона в MinIO bucket (относительный путь)"
     )
+    # Как долго (в секундах) кэшированный мастер-шаблон используется без проверки ETag
+    MASTER_TEMPLATE_REVALIDATE_INTERVAL: float = Field(default=30.0)
+    # Сколько разных шаблонов (template_url) держать в памяти; при превышении
+    # вытесняется давно не использованный
+    MASTER_TEMPLATE_CACHE_SIZE: int = Field(default=16)
+    
+    # Deferred assembly: slide/block edits only touch the DB and the deck is built
+    # from it by POST /presentations/{id}/generate. Enable only for presentations
+    # whose file was not edited in immediate mode (the first generation keeps the
+    # current file as the assembly base).
+    DEFERRED_ASSEMBLY: bool = Field(default=False)
+    
+    # Background generation jobs (used in deferred assembly mode)
+    GENERATION_JOBS_ENABLED: bool = Field(default=True)
+    # Run the job worker inside this API process
+    GENERATION_WORKER_ENABLED: bool = Field(default=True)
+    GENERATION_WORKER_CONCURRENCY: int = Field(default=2)
+    GENERATION_PROCESS_POOL_SIZE: int = Field(default=2)
+    GENERATION_MAX_JOBS_PER_TENANT: int = Field(default=1)
+    GENERATION_POLL_INTERVAL: float = Field(default=1.0)
+    GENERATION_HEARTBEAT_INTERVAL: float = Field(default=5.0)
+    GENERATION_JOB_STALE_AFTER: float = Field(default=60.0)
+    
+    # Template block cache: parsed blocks in memory, spilled PPTX files on disk
+    BLOCK_CACHE_MEMORY_BYTES: int = Field(default=256 * 1024 * 1024)
+    BLOCK_CACHE_DIR: Optional[str] = Field(default="/tmp/presentation-builder/block-cache")
+    BLOCK_CACHE_DISK_BYTES: int = Field(default=2 * 1024 * 1024 * 1024)
+    # Как долго (в секундах) кэшированный блок используется без проверки updated_at
+    BLOCK_CACHE_REVALIDATE_INTERVAL: float = Field(default=30.0)
+    
+    # Directories with TTF/OTF fonts used to measure text layout (os.pathsep-separated)
+    FONT_DIRS: str = Field(default="/usr/share/fonts:/usr/local/share/fonts")
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO")
@@ -62,6 +149,16 @@ class Settings(BaseSettings):
         """Get database URL for SQLAlchemy"""
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    @property
+    def async_database_url(self) -> str:
+        """Get database URL for the async SQLAlchemy engine (asyncpg)"""
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+    
+    @property
+    def jwt_previous_public_keys(self) -> List[str]:
+        """Get previous JWT public keys accepted during rotation"""
+        return [key.strip() for key in self.JWT_PREVIOUS_PUBLIC_KEYS.split(",") if key.strip()]
+    
     @property
     def consul_address(self) -> str:
         """Get Consul address"""
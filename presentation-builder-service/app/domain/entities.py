@@ -1,7 +1,7 @@
 """Domain entities and database models"""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, UniqueConstraint, Index
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -21,11 +21,18 @@ class Presentation(Base):
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    slides = relationship("PresentationSlide", back_populates="presentation", cascade="all, delete-orphan")
+    slides = relationship(
+        "PresentationSlide",
+        back_populates="presentation",
+        cascade="all, delete-orphan",
+        order_by="PresentationSlide.sort_key"
+    )
     
     __table_args__ = (
         Index('idx_presentations_project_id', 'project_id'),
         Index('idx_presentations_status', 'status'),
+        # Keyset pagination of a project's presentations
+        Index('idx_presentations_project_updated', 'project_id', updated_at.desc(), id.desc()),
     )
 
 
@@ -35,15 +42,40 @@ class PresentationSlide(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     presentation_id = Column(UUID(as_uuid=True), ForeignKey("presentations.id", ondelete="CASCADE"), nullable=False)
-    order_index = Column(Integer, nullable=False)
+    # Fractional order key (app.domain.order_keys); compared bytewise, so moving
+    # a slide rewrites only its own key
+    sort_key = Column(Text(collation="C"), nullable=False)
+    # Deferred assembly only: the base deck slide (p:sldId/@id) this slide is,
+    # or for an added slide the base slide whose layout it uses, or else the
+    # layout index. All NULL for slides stored before these were tracked.
+    base_slide_id = Column(Integer, nullable=True)
+    layout_slide_id = Column(Integer, nullable=True)
+    layout_index = Column(Integer, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     
+    # Position of the slide in its presentation (0-based, not stored): set by
+    # the repository and use cases that know it from reading slides in order
+    order_index = None
+    
     # Relationships
     presentation = relationship("Presentation", back_populates="slides")
     blocks = relationship("SlideBlock", back_populates="slide", cascade="all, delete-orphan")
     
+    @property
+    def origin(self) -> dict:
+        """Where deferred assembly starts this slide from (see PPTXService.assemble_presentation)"""
+        return {
+            "base_slide_id": self.base_slide_id,
+            "layout_slide_id": self.layout_slide_id,
+            "layout_index": self.layout_index
+        }
+    
+    @property
+    def has_origin(self) -> bool:
+        return any(value is not None for value in self.origin.values())
+    
     __table_args__ = (
-        UniqueConstraint('presentation_id', 'order_index', name='uq_presentation_slide_order'),
+        UniqueConstraint('presentation_id', 'sort_key', name='uq_presentation_slide_sort_key'),
         Index('idx_slides_presentation_id', 'presentation_id'),
     )
 
@@ -87,3 +119,60 @@ class SlideBlockValue(Base):
         Index('idx_values_slide_block_id', 'slide_block_id'),
         Index('idx_values_field_key', 'field_key'),
     )
+
+
+class PresentationVersion(Base):
+    """
+    Snapshot of a presentation: deck parts manifest and slide state
+    
+    Part data lives in MinIO under versions/{presentation_id}/parts/{sha256}
+    and is shared by all versions of the presentation that contain it.
+    """
+    __tablename__ = "presentation_versions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    presentation_id = Column(UUID(as_uuid=True), ForeignKey("presentations.id", ondelete="CASCADE"), nullable=False)
+    number = Column(Integer, nullable=False)
+    label = Column(Text, nullable=True)
+    # Zip members in archive order: [{"name", "sha256", "size", "deflate"}]
+    parts = Column(JSONB, nullable=False)
+    # Slides with blocks and values: [{"sort_key", "blocks": [{"template_block_id", "position_index", "values": {...}}]}]
+    slides = Column(JSONB, nullable=False)
+    # Size of the deck file the snapshot was taken from
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('presentation_id', 'number', name='uq_presentation_version_number'),
+    )
+    
+    @property
+    def part_count(self) -> int:
+        return len(self.parts)
+
+
+class GenerationJob(Base):
+    """Deck generation job - row of the local Postgres job queue"""
+    __tablename__ = "generation_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    presentation_id = Column(UUID(as_uuid=True), ForeignKey("presentations.id", ondelete="CASCADE"), nullable=False)
+    # Concurrency limits are applied per tenant (the presentation's project)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String(50), nullable=False, default="Queued")
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_generation_jobs_status_created', 'status', 'created_at'),
+        Index('idx_generation_jobs_tenant_status', 'tenant_id', 'status'),
+        Index('idx_generation_jobs_presentation_id', 'presentation_id'),
+    )
@@ -0,0 +1,202 @@
+"""
+Fractional order keys
+
+Slides are ordered by string keys that sort bytewise (COLLATE "C"). A key
+between any two keys always exists, so inserting or moving an item writes
+only that item's key and never renumbers its neighbours.
+
+A key is an integer part followed by an optional fraction, both in base-62
+digits ("0-9A-Za-z"). The first character of the integer part encodes its
+length: "a" is followed by 1 digit, "b" by 2, ... "z" by 26; "Z" by 1, "Y"
+by 2, ... "A" by 26 for the negative side. The first key is "a0" and
+appending after the last key increments the integer part ("a0", "a1", ...
+"az", "b00"), so keys grow by one character per 62**n appends, not per
+append. Keys between neighbours take the midpoint of their fractions.
+This is the scheme of the fractional-indexing library by David Greenspan.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Fraction strictly between fractions a and b (b None means 1)"""
+    zero = DIGITS[0]
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+    if a.endswith(zero) or (b is not None and b.endswith(zero)):
+        raise ValueError("Fraction with a trailing zero")
+    if b:
+        # Common prefix (a padded with zeros) is kept as is
+        n = 0
+        while (a[n] if n < len(a) else zero) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    # Consecutive digits
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key {key!r}")
+    return key[:length]
+
+
+def validate_key(key: str):
+    """
+    Check that a string is a valid order key
+
+    Raises:
+        ValueError: If it is not
+    """
+    if not key:
+        raise ValueError("Empty order key")
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key {key!r}")
+    integer = _integer_part(key)
+    if any(digit not in DIGITS for digit in key[1:]):
+        raise ValueError(f"Invalid order key {key!r}")
+    if key[len(integer):].endswith(DIGITS[0]):
+        raise ValueError(f"Invalid order key {key!r}")
+
+
+def _increment_integer(x: str) -> Optional[str]:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    # Carry out of the integer part: one digit longer (or shorter on the negative side)
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> Optional[str]:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """
+    Generate a key that sorts strictly between a and b
+
+    Args:
+        a: Lower key (None = before the first key)
+        b: Upper key (None = after the last key)
+
+    Returns:
+        New order key
+
+    Raises:
+        ValueError: If a key is invalid or a >= b
+    """
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + DIGITS[0]
+        integer_b = _integer_part(b)
+        fraction_b = b[len(integer_b):]
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        result = _decrement_integer(integer_b)
+        if result is None:
+            raise ValueError("Cannot decrement order key any further")
+        return result
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        result = _increment_integer(integer_a)
+        return result if result is not None else integer_a + _midpoint(fraction_a, None)
+
+    integer_b = _integer_part(b)
+    fraction_b = b[len(integer_b):]
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    result = _increment_integer(integer_a)
+    if result is None:
+        raise ValueError("Cannot increment order key any further")
+    if result < b:
+        return result
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], n: int) -> List[str]:
+    """
+    Generate n sorted keys between a and b, as short as possible
+
+    Args:
+        a: Lower key (None = before the first key)
+        b: Upper key (None = after the last key)
+        n: Number of keys
+
+    Returns:
+        Sorted list of new order keys
+    """
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(n - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(None, keys[-1]))
+        return list(reversed(keys))
+    middle = n // 2
+    key = key_between(a, b)
+    return keys_between(a, key, middle) + [key] + keys_between(key, b, n - middle - 1)
@@ -1,36 +1,64 @@
 """Repository interfaces for domain entities"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
 from uuid import UUID
 
-from app.domain.entities import Presentation, PresentationSlide, SlideBlock, SlideBlockValue
+from app.domain.entities import (
+    Presentation,
+    PresentationSlide,
+    SlideBlock,
+    SlideBlockValue,
+    GenerationJob,
+    PresentationVersion
+)
 
 
 class IPresentationRepository(ABC):
     """Interface for presentation repository"""
     
     @abstractmethod
-    def create(self, presentation: Presentation) -> Presentation:
+    async def create(self, presentation: Presentation) -> Presentation:
         """Create a new presentation"""
         pass
     
     @abstractmethod
-    def get_by_id(self, presentation_id: UUID) -> Optional[Presentation]:
-        """Get presentation by ID"""
+    async def get_by_id(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get presentation by ID (without slides)"""
         pass
     
     @abstractmethod
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
+    async def get_with_slides(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get presentation with slides, blocks and values"""
+        pass
+    
+    @abstractmethod
+    async def exists(self, presentation_id: UUID) -> bool:
+        """Check if a presentation exists"""
+        pass
+    
+    @abstractmethod
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
         """Get all presentations"""
         pass
     
     @abstractmethod
-    def update(self, presentation: Presentation) -> Presentation:
+    async def list_by_project(
+        self,
+        project_id: UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Tuple]:
+        """List presentation summaries of a project, most recently updated first"""
+        pass
+    
+    @abstractmethod
+    async def update(self, presentation: Presentation) -> Presentation:
         """Update presentation"""
         pass
     
     @abstractmethod
-    def delete(self, presentation_id: UUID) -> bool:
+    async def delete(self, presentation_id: UUID) -> bool:
         """Delete presentation"""
         pass
 
@@ -39,51 +67,101 @@ class ISlideRepository(ABC):
     """Interface for slide repository"""
     
     @abstractmethod
-    def create(self, slide: PresentationSlide) -> PresentationSlide:
+    async def create(self, slide: PresentationSlide) -> PresentationSlide:
         """Create a new slide"""
         pass
     
     @abstractmethod
-    def get_by_id(self, slide_id: UUID) -> Optional[PresentationSlide]:
-        """Get slide by ID"""
+    async def get_by_id(self, slide_id: UUID) -> Optional[PresentationSlide]:
+        """Get slide by ID (without blocks)"""
+        pass
+    
+    @abstractmethod
+    async def get_with_blocks(self, slide_id: UUID) -> Optional[PresentationSlide]:
+        """Get slide by ID with blocks and values"""
+        pass
+    
+    @abstractmethod
+    async def get_by_presentation(self, presentation_id: UUID) -> List[PresentationSlide]:
+        """Get all slides for a presentation with blocks and values"""
+        pass
+    
+    @abstractmethod
+    async def get_sort_keys(self, presentation_id: UUID) -> List[Tuple[UUID, str]]:
+        """Get (slide id, sort key) pairs in slide order"""
+        pass
+    
+    @abstractmethod
+    async def get_last_sort_key(self, presentation_id: UUID) -> Tuple[int, Optional[str]]:
+        """Get the slide count and the sort key of the last slide"""
+        pass
+    
+    @abstractmethod
+    async def update_sort_key(self, slide_id: UUID, sort_key: str) -> bool:
+        """Set the sort key of a slide"""
         pass
     
     @abstractmethod
-    def get_by_presentation(self, presentation_id: UUID) -> List[PresentationSlide]:
-        """Get all slides for a presentation"""
+    async def get_origins(self, presentation_id: UUID) -> List[Tuple]:
+        """Get (id, sort_key, base_slide_id, layout_slide_id, layout_index) rows in slide order"""
         pass
     
     @abstractmethod
-    def delete(self, slide_id: UUID) -> bool:
+    async def save_origins(self, slides: List[PresentationSlide]) -> None:
+        """Store the origin columns set on loaded slides"""
+        pass
+    
+    @abstractmethod
+    async def get_ids_by_presentation(self, presentation_id: UUID) -> List[UUID]:
+        """Get slide ids of a presentation in slide order"""
+        pass
+    
+    @abstractmethod
+    async def count_by_presentation(self, presentation_id: UUID) -> int:
+        """Count slides of a presentation"""
+        pass
+    
+    @abstractmethod
+    async def delete(self, slide_id: UUID) -> bool:
         """Delete slide"""
         pass
+    
+    @abstractmethod
+    async def replace_by_presentation(self, presentation_id: UUID, slides: List[PresentationSlide]) -> None:
+        """Replace all slides of a presentation (with their blocks and values)"""
+        pass
 
 
 class IBlockRepository(ABC):
     """Interface for block repository"""
     
     @abstractmethod
-    def create(self, block: SlideBlock) -> SlideBlock:
+    async def create(self, block: SlideBlock) -> SlideBlock:
         """Create a new block"""
         pass
     
     @abstractmethod
-    def get_by_id(self, block_id: UUID) -> Optional[SlideBlock]:
+    async def get_by_id(self, block_id: UUID) -> Optional[SlideBlock]:
         """Get block by ID"""
         pass
     
     @abstractmethod
-    def get_by_slide(self, slide_id: UUID) -> List[SlideBlock]:
-        """Get all blocks for a slide"""
+    async def get_by_slide(self, slide_id: UUID) -> List[SlideBlock]:
+        """Get all blocks for a slide with values"""
         pass
     
     @abstractmethod
-    def update(self, block: SlideBlock) -> SlideBlock:
+    async def count_by_slide(self, slide_id: UUID) -> int:
+        """Count blocks on a slide"""
+        pass
+    
+    @abstractmethod
+    async def update(self, block: SlideBlock) -> SlideBlock:
         """Update block"""
         pass
     
     @abstractmethod
-    def delete(self, block_id: UUID) -> bool:
+    async def delete(self, block_id: UUID) -> bool:
         """Delete block"""
         pass
 
@@ -92,21 +170,114 @@ class IBlockValueRepository(ABC):
     """Interface for block value repository"""
     
     @abstractmethod
-    def create(self, value: SlideBlockValue) -> SlideBlockValue:
+    async def create(self, value: SlideBlockValue) -> SlideBlockValue:
         """Create a new block value"""
         pass
     
     @abstractmethod
-    def get_by_block(self, block_id: UUID) -> List[SlideBlockValue]:
+    async def get_by_block(self, block_id: UUID) -> List[SlideBlockValue]:
         """Get all values for a block"""
         pass
     
     @abstractmethod
-    def upsert(self, block_id: UUID, field_key: str, value: dict) -> SlideBlockValue:
+    async def upsert(self, block_id: UUID, field_key: str, value: dict) -> SlideBlockValue:
         """Upsert a block value"""
         pass
     
     @abstractmethod
-    def delete_by_block(self, block_id: UUID) -> bool:
+    async def upsert_many(self, block_id: UUID, values: Dict[str, dict]) -> List[SlideBlockValue]:
+        """Upsert several values of a block in one statement"""
+        pass
+    
+    @abstractmethod
+    async def delete_by_block(self, block_id: UUID) -> bool:
         """Delete all values for a block"""
         pass
+
+
+class IGenerationJobRepository(ABC):
+    """Interface for generation job queue repository"""
+    
+    @abstractmethod
+    async def create(self, job: GenerationJob) -> GenerationJob:
+        """Enqueue a new job"""
+        pass
+    
+    @abstractmethod
+    async def get_by_id(self, job_id: UUID) -> Optional[GenerationJob]:
+        """Get job by ID"""
+        pass
+    
+    @abstractmethod
+    async def get_active_by_presentation(self, presentation_id: UUID) -> Optional[GenerationJob]:
+        """Get the queued or running job of a presentation"""
+        pass
+    
+    @abstractmethod
+    async def claim_next(self, worker_id: str, max_running_per_tenant: int, stale_before: datetime) -> Optional[GenerationJob]:
+        """Claim the oldest runnable job"""
+        pass
+    
+    @abstractmethod
+    async def update_progress(self, job_id: UUID, current: int, total: int) -> None:
+        """Record job progress"""
+        pass
+    
+    @abstractmethod
+    async def heartbeat(self, job_id: UUID) -> bool:
+        """Refresh job heartbeat, returns True if cancellation was requested"""
+        pass
+    
+    @abstractmethod
+    async def finish(self, job_id: UUID, status: str, error: Optional[str] = None) -> None:
+        """Mark job as finished"""
+        pass
+    
+    @abstractmethod
+    async def request_cancel(self, job_id: UUID) -> Optional[GenerationJob]:
+        """Request job cancellation"""
+        pass
+
+
+class IPresentationVersionRepository(ABC):
+    """Interface for presentation version repository"""
+    
+    @abstractmethod
+    async def create(self, version: PresentationVersion) -> PresentationVersion:
+        """Create a new version"""
+        pass
+    
+    @abstractmethod
+    async def get_by_number(self, presentation_id: UUID, number: int) -> Optional[PresentationVersion]:
+        """Get a version of a presentation by its number"""
+        pass
+    
+    @abstractmethod
+    async def list_by_presentation(self, presentation_id: UUID) -> List[Tuple]:
+        """List version summaries of a presentation, newest first"""
+        pass
+    
+    @abstractmethod
+    async def get_last_number(self, presentation_id: UUID) -> int:
+        """Get the number of the latest version (0 if there are none)"""
+        pass
+    
+    @abstractmethod
+    async def get_part_hashes(self, presentation_id: UUID) -> Set[str]:
+        """Get hashes of all parts referenced by versions of a presentation"""
+        pass
+    
+    @abstractmethod
+    async def delete_oldest(self, presentation_id: UUID, keep: int) -> Set[str]:
+        """Delete all but the newest versions (uncommitted) and return hashes of parts they referenced"""
+        pass
+    
+    @abstractmethod
+    async def lock_presentation(self, presentation_id: UUID) -> None:
+        """Serialize version changes of a presentation until the transaction ends"""
+        pass
+    
+    @abstractmethod
+    async def commit(self) -> None:
+        """Commit the current transaction, releasing the presentation lock"""
+        pass
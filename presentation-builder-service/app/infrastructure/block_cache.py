@@ -0,0 +1,320 @@
+"""Local cache of template block PPTX files"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from pptx.presentation import Presentation as PPTXPresentation
+
+from app.infrastructure.pptx_service import PPTXService
+
+logger = logging.getLogger(__name__)
+
+# Rough memory cost of a parsed lxml tree per byte of uncompressed XML
+PARSED_XML_OVERHEAD = 4
+
+
+class CachedBlock:
+    """Block PPTX bytes with the parsed presentation"""
+
+    def __init__(self, block_id: UUID, version: str, data: bytes, presentation: PPTXPresentation):
+        self.block_id = block_id
+        self.version = version
+        self.data = data
+        self.presentation = presentation
+        self.size = len(data) + self._parsed_size(data)
+
+    @classmethod
+    def parse(cls, block_id: UUID, version: str, data: bytes) -> "CachedBlock":
+        """
+        Parse block PPTX data
+
+        Raises:
+            ValueError: If the block PPTX has no slides
+            Exception: If the block PPTX cannot be parsed
+        """
+        prs = PPTXService.load_presentation(data)
+        if len(prs.slides) == 0:
+            raise ValueError(f"Template block {block_id} has no slides")
+        return cls(block_id, version, data, prs)
+
+    @property
+    def source_slide(self):
+        """First slide of the block (blocks are single-slide templates)"""
+        return self.presentation.slides[0]
+
+    @staticmethod
+    def _parsed_size(data: bytes) -> int:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            return sum(
+                info.file_size * (PARSED_XML_OVERHEAD if info.filename.endswith(".xml") else 1)
+                for info in archive.infolist()
+            )
+
+
+class BlockCache:
+    """
+    Two-tier cache of template blocks keyed by block id and version
+
+    The memory tier keeps parsed blocks (LRU, bounded by memory_budget bytes).
+    Blocks evicted from memory are spilled to disk as PPTX files (LRU,
+    bounded by disk_budget bytes), so they are only parsed again, not
+    downloaded again. The version is the block's updated_at from Template
+    Service: a new version of a block replaces the old one in both tiers.
+
+    Cached presentations are shared and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int,
+        disk_dir: Optional[str] = None,
+        disk_budget: int = 0,
+        revalidate_interval: float = 30.0
+    ):
+        """
+        Initialize cache
+
+        Args:
+            memory_budget: Memory tier budget in bytes (estimated, 0 disables the tier)
+            disk_dir: Directory for spilled blocks (None disables the disk tier)
+            disk_budget: Disk tier budget in bytes
+            revalidate_interval: Seconds during which a cached block is used without a version check
+        """
+        self.memory_budget = memory_budget
+        self.disk_dir = disk_dir if disk_budget > 0 else None
+        self.disk_budget = disk_budget
+        self.revalidate_interval = revalidate_interval
+
+        self._memory: "OrderedDict[Tuple[UUID, str], CachedBlock]" = OrderedDict()
+        self._memory_size = 0
+        # path -> size in bytes
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        # block_id -> (version, last_validated_at)
+        self._versions: Dict[UUID, Tuple[str, float]] = {}
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    def get_validated(self, block_id: UUID) -> Optional[CachedBlock]:
+        """
+        Get a block whose version was checked within revalidate_interval
+
+        Args:
+            block_id: UUID of the template block
+
+        Returns:
+            Cached block or None if its version has to be checked first
+        """
+        with self._lock:
+            known = self._versions.get(block_id)
+        if not known or time.monotonic() - known[1] >= self.revalidate_interval:
+            return None
+        return self._lookup(block_id, known[0])
+
+    def get(self, block_id: UUID, version: str) -> Optional[CachedBlock]:
+        """
+        Get a block of a specific version from memory or disk
+
+        The version is taken as current for the next revalidate_interval seconds.
+
+        Args:
+            block_id: UUID of the template block
+            version: Block version (updated_at)
+
+        Returns:
+            Cached block or None
+        """
+        with self._lock:
+            self._drop_other_versions(block_id, version)
+            self._mark_validated(block_id, version)
+        return self._lookup(block_id, version)
+
+    def _lookup(self, block_id: UUID, version: str) -> Optional[CachedBlock]:
+        key = (block_id, version)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._hits["memory"] += 1
+                return entry
+            path = self._disk_path(block_id, version)
+            on_disk = path in self._disk
+            if on_disk:
+                self._disk.move_to_end(path)
+
+        if not on_disk:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            entry = CachedBlock.parse(block_id, version, data)
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cached block {path}: {e}")
+            with self._lock:
+                self._remove_disk(path)
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._hits["disk"] += 1
+            self._store_memory(entry)
+        return entry
+
+    def put(self, block_id: UUID, version: str, data: bytes) -> CachedBlock:
+        """
+        Parse and cache a downloaded block
+
+        Args:
+            block_id: UUID of the template block
+            version: Block version (updated_at)
+            data: Block PPTX file data
+
+        Returns:
+            Cached block
+
+        Raises:
+            ValueError: If the block PPTX has no slides
+            Exception: If the block PPTX cannot be parsed
+        """
+        entry = CachedBlock.parse(block_id, version, data)
+        with self._lock:
+            self._drop_other_versions(block_id, version)
+            self._mark_validated(block_id, version)
+            self._store_memory(entry)
+        logger.info(f"Cached template block {block_id} (version {version}, ~{entry.size} bytes)")
+        return entry
+
+    def invalidate(self, block_id: Optional[UUID] = None):
+        """
+        Drop cached blocks from both tiers
+
+        Args:
+            block_id: Block to drop (None drops all)
+        """
+        with self._lock:
+            for key in [k for k in self._memory if block_id is None or k[0] == block_id]:
+                self._memory_size -= self._memory.pop(key).size
+            prefix = f"{block_id}-" if block_id is not None else ""
+            for path in [p for p in self._disk if os.path.basename(p).startswith(prefix)]:
+                self._remove_disk(path)
+            if block_id is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(block_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters"""
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+                "memory_hits": self._hits["memory"],
+                "disk_hits": self._hits["disk"],
+                "misses": self._misses
+            }
+
+    def _mark_validated(self, block_id: UUID, version: str):
+        self._versions[block_id] = (version, time.monotonic())
+
+    def _drop_other_versions(self, block_id: UUID, version: str):
+        for key in [k for k in self._memory if k[0] == block_id and k[1] != version]:
+            self._memory_size -= self._memory.pop(key).size
+        current = self._disk_path(block_id, version)
+        for path in [p for p in self._disk if os.path.basename(p).startswith(f"{block_id}-") and p != current]:
+            self._remove_disk(path)
+
+    def _store_memory(self, entry: CachedBlock):
+        key = (entry.block_id, entry.version)
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous.size
+        self._memory[key] = entry
+        self._memory_size += entry.size
+
+        # Evict least recently used blocks to disk; the new entry always stays
+        while self._memory_size > self.memory_budget and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= evicted.size
+            self._spill(evicted)
+        if self._memory_size > self.memory_budget:
+            self._memory.pop(key)
+            self._memory_size -= entry.size
+            self._spill(entry)
+
+    # Disk tier
+
+    def _disk_path(self, block_id: UUID, version: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        version_hash = hashlib.sha1(version.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.disk_dir, f"{block_id}-{version_hash}.pptx")
+
+    def _load_disk_index(self):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            files = []
+            for filename in os.listdir(self.disk_dir):
+                path = os.path.join(self.disk_dir, filename)
+                if filename.endswith(".tmp"):
+                    os.remove(path)
+                elif filename.endswith(".pptx"):
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, path, stat.st_size))
+            for _, path, size in sorted(files):
+                self._disk[path] = size
+                self._disk_size += size
+            self._evict_disk()
+            logger.info(f"Block cache: {len(self._disk)} block(s) on disk in {self.disk_dir}")
+        except OSError as e:
+            logger.warning(f"Block cache disk tier disabled ({self.disk_dir}): {e}")
+            self.disk_dir = None
+
+    def _spill(self, entry: CachedBlock):
+        path = self._disk_path(entry.block_id, entry.version)
+        if path is None or len(entry.data) > self.disk_budget:
+            return
+        if path in self._disk:
+            self._disk.move_to_end(path)
+            return
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(entry.data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to spill block {entry.block_id} to disk: {e}")
+            return
+        self._disk[path] = len(entry.data)
+        self._disk_size += len(entry.data)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_budget and self._disk:
+            path = next(iter(self._disk))
+            self._remove_disk(path)
+
+    def _remove_disk(self, path: str):
+        size = self._disk.pop(path, None)
+        if size is None:
+            return
+        self._disk_size -= size
+        try:
+            os.remove(path)
+        except OSError:
+            pass
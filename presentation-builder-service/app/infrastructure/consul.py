@@ -1,6 +1,8 @@
 """Consul service discovery and registration"""
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Dict, List, Optional
 import consul
 
 from app.config.settings import settings
@@ -82,3 +84,137 @@ class ConsulClient:
         except Exception as e:
             logger.error(f"Error discovering service {service_name}: {e}")
             return None
+    
+    def discover_service_instances(self, service_name: str) -> List[str]:
+        """
+        Discover all healthy instances of a service
+        
+        Args:
+            service_name: Name of the service to discover
+            
+        Returns:
+            List of service URLs (empty if none are passing)
+            
+        Raises:
+            Exception: If Consul is unreachable
+        """
+        _, services = self.consul.health.service(service_name, passing=True)
+        urls = []
+        for service in services or []:
+            address = service['Service']['Address'] or service['Node']['Address']
+            port = service['Service']['Port']
+            urls.append(f"http://{address}:{port}")
+        return urls
+
+
+class ServiceResolver:
+    """
+    Cached service discovery with background refresh and failover
+    
+    Consul is queried off the event loop on a fixed interval; request paths
+    only read the cached instance list. Instances that fail a request are
+    demoted to the end of the list for FAILURE_COOLDOWN seconds.
+    """
+    
+    FAILURE_COOLDOWN = 30.0
+    
+    def __init__(self, consul_client: ConsulClient, refresh_interval: float):
+        """
+        Initialize resolver
+        
+        Args:
+            consul_client: Consul client used for lookups
+            refresh_interval: Seconds between background refreshes
+        """
+        self.consul_client = consul_client
+        self.refresh_interval = refresh_interval
+        self._defaults: Dict[str, str] = {}
+        self._instances: Dict[str, List[str]] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._cursor: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def register(self, service_name: str, default_url: str):
+        """
+        Register a service to be resolved
+        
+        Args:
+            service_name: Consul service name
+            default_url: URL used when Consul has no healthy instances
+        """
+        self._defaults[service_name] = default_url
+    
+    async def refresh(self):
+        """Refresh instance lists for all registered services"""
+        for service_name in self._defaults:
+            try:
+                urls = await asyncio.to_thread(
+                    self.consul_client.discover_service_instances, service_name
+                )
+            except Exception as e:
+                logger.error(f"Error discovering service {service_name}: {e}")
+                continue
+            
+            if urls:
+                if urls != self._instances.get(service_name):
+                    logger.info(f"Discovered {service_name} instances: {urls}")
+                self._instances[service_name] = urls
+            else:
+                logger.warning(f"Service {service_name} not found in Consul, keeping last known instances")
+    
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+    
+    async def start(self):
+        """Resolve all services once and start the background refresh task"""
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_urls(self, service_name: str) -> List[str]:
+        """
+        Get candidate URLs for a service in the order they should be tried
+        
+        Healthy instances are rotated round-robin; recently failed ones go last.
+        
+        Args:
+            service_name: Consul service name
+            
+        Returns:
+            Ordered list of base URLs
+        """
+        urls = self._instances.get(service_name)
+        if not urls:
+            default_url = self._defaults.get(service_name)
+            return [default_url] if default_url else []
+        
+        cursor = self._cursor.get(service_name, 0)
+        self._cursor[service_name] = cursor + 1
+        offset = cursor % len(urls)
+        rotated = urls[offset:] + urls[:offset]
+        
+        now = time.monotonic()
+        healthy = [u for u in rotated if now - self._failed_at.get(u, float("-inf")) > self.FAILURE_COOLDOWN]
+        demoted = [u for u in rotated if u not in healthy]
+        return healthy + demoted
+    
+    def mark_failed(self, url: str):
+        """
+        Demote an instance after a connection-level failure
+        
+        Args:
+            url: Base URL of the failed instance
+        """
+        self._failed_at[url] = time.monotonic()
+        logger.warning(f"Marked instance {url} as failed for {self.FAILURE_COOLDOWN:.0f}s")
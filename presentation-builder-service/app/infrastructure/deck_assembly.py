@@ -0,0 +1,78 @@
+"""Deck assembly in worker processes"""
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from app.infrastructure.block_cache import CachedBlock
+from app.infrastructure.pptx_service import PPTXService
+
+logger = logging.getLogger(__name__)
+
+# Parsed blocks kept by each worker process between jobs
+PROCESS_BLOCK_CACHE_SIZE = 64
+
+_parsed_blocks: "OrderedDict[Tuple[UUID, str], CachedBlock]" = OrderedDict()
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation job is cancelled while assembling"""
+    pass
+
+
+def _get_parsed_block(block_id: UUID, version: str, data: bytes) -> CachedBlock:
+    key = (block_id, version)
+    block = _parsed_blocks.get(key) if version else None
+    if block is not None:
+        _parsed_blocks.move_to_end(key)
+        return block
+    block = CachedBlock.parse(block_id, version, data)
+    if version:
+        _parsed_blocks[key] = block
+        while len(_parsed_blocks) > PROCESS_BLOCK_CACHE_SIZE:
+            _parsed_blocks.popitem(last=False)
+    return block
+
+
+def assemble_deck(
+    base_pptx_data: bytes,
+    blocks: Dict[UUID, Tuple[str, bytes]],
+    slides: List[Tuple[List[UUID], List[Dict], Dict]],
+    progress_queue=None,
+    cancel_event=None
+) -> bytes:
+    """
+    Assemble a deck from picklable inputs (runs in a process pool)
+
+    Args:
+        base_pptx_data: Base deck
+        blocks: Template block id -> (version, block PPTX data)
+        slides: Per slide: (template block ids in position order, field data, origin)
+        progress_queue: Queue receiving (slides done, total) after each slide
+        cancel_event: Event checked after each slide
+
+    Returns:
+        PPTX file as bytes
+
+    Raises:
+        GenerationCancelled: If cancel_event was set
+    """
+    source_slides = {
+        block_id: _get_parsed_block(block_id, version, data).source_slide
+        for block_id, (version, data) in blocks.items()
+    }
+
+    def on_slide(done: int, total: int):
+        if progress_queue is not None:
+            progress_queue.put((done, total))
+        if cancel_event is not None and cancel_event.is_set():
+            raise GenerationCancelled(f"Cancelled after {done} of {total} slide(s)")
+
+    return PPTXService.assemble_presentation(
+        base_pptx_data,
+        [
+            ([source_slides[block_id] for block_id in block_ids], fields_data, origin)
+            for block_ids, fields_data, origin in slides
+        ],
+        on_slide
+    )
@@ -0,0 +1,129 @@
+"""Splitting PPTX files into content-addressed parts and reassembling them"""
+import hashlib
+import io
+import zipfile
+import zlib
+from typing import Any, Dict, List, Tuple
+
+# Entries are written with a fixed timestamp: the same manifest always
+# reassembles into the same bytes
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# First byte of a stored part: zlib-compressed or as is
+_ZLIB = b"Z"
+_RAW = b"R"
+
+
+def part_hash(data: bytes) -> str:
+    """Content address of a part (SHA-256 hex)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_part(data: bytes) -> bytes:
+    """
+    Encode part data for storage
+
+    XML is stored compressed; data that does not compress (media) is
+    stored as is. The first byte tells which, so decoding does not depend
+    on how the part was used in any particular deck.
+    """
+    packed = zlib.compress(data)
+    if len(packed) < len(data):
+        return _ZLIB + packed
+    return _RAW + data
+
+
+def decode_part(blob: bytes) -> bytes:
+    """
+    Decode a stored part
+
+    Raises:
+        ValueError: If the blob is not an encoded part
+    """
+    marker, payload = blob[:1], blob[1:]
+    if marker == _ZLIB:
+        try:
+            return zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(f"Corrupted part data: {e}")
+    if marker == _RAW:
+        return payload
+    raise ValueError("Unknown part encoding")
+
+
+def split_deck(pptx_data: bytes) -> Tuple[List[Dict[str, Any]], Dict[str, bytes]]:
+    """
+    Split a PPTX (OPC zip) into its parts
+
+    Args:
+        pptx_data: PPTX file bytes
+
+    Returns:
+        (manifest: one {"name", "sha256", "size", "deflate"} entry per zip
+         member in archive order,
+         uncompressed part data by hash; identical parts appear once)
+
+    Raises:
+        zipfile.BadZipFile: If the data is not a zip archive
+    """
+    manifest = []
+    parts = {}
+    with zipfile.ZipFile(io.BytesIO(pptx_data)) as archive:
+        for info in archive.infolist():
+            data = archive.read(info)
+            digest = part_hash(data)
+            parts[digest] = data
+            manifest.append({
+                "name": info.filename,
+                "sha256": digest,
+                "size": len(data),
+                # Media is usually stored as is; keep each member's compression
+                "deflate": info.compress_type != zipfile.ZIP_STORED
+            })
+    return manifest, parts
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands out what was written since the last take()"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class DeckZipWriter:
+    """
+    Incremental zip writer for reassembling a deck from its parts
+
+    Each add() returns the archive bytes produced for that member, so the
+    archive can be streamed out while parts are still being fetched; only
+    the current part is held in memory. The archive is written without
+    seeking (sizes follow each member in a data descriptor).
+    """
+
+    def __init__(self):
+        self._sink = _ChunkSink()
+        self._archive = zipfile.ZipFile(self._sink, "w")
+
+    def add(self, name: str, data: bytes, deflate: bool = True) -> bytes:
+        """Write a member and return the bytes produced so far"""
+        info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED if deflate else zipfile.ZIP_STORED
+        self._archive.writestr(info, data)
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        """Write the central directory and return the remaining bytes"""
+        self._archive.close()
+        return self._sink.take()
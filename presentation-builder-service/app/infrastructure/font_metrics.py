@@ -0,0 +1,193 @@
+"""
+Font metrics for text measurement
+
+Glyph advance widths are read from installed TrueType/OpenType fonts with
+fontTools. Each face is parsed once into a codepoint -> advance table (in
+font units); text widths at any size are then a sum of table lookups scaled
+by size / unitsPerEm.
+"""
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from fontTools.ttLib import TTFont, TTCollection
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Metric-compatible substitutes for common Office fonts
+FONT_ALIASES = {
+    "arial": ["liberation sans", "arimo"],
+    "helvetica": ["liberation sans", "arimo"],
+    "times new roman": ["liberation serif", "tinos"],
+    "courier new": ["liberation mono", "cousine"],
+    "calibri": ["carlito"],
+    "cambria": ["caladea"],
+}
+
+FALLBACK_FAMILIES = ["liberation sans", "dejavu sans"]
+
+
+class FontMetrics:
+    """Advance widths of one font face"""
+
+    def __init__(self, name: str, advances: Dict[int, int], default_advance: int, units_per_em: int):
+        """
+        Initialize metrics
+
+        Args:
+            name: Face name (for logging)
+            advances: Codepoint -> advance width in font units
+            default_advance: Advance used for codepoints missing from the font
+            units_per_em: Font units per em
+        """
+        self.name = name
+        self.advances = advances
+        self.default_advance = default_advance
+        self.units_per_em = units_per_em
+        self._word_cache: Dict[str, int] = {}
+
+    @classmethod
+    def from_ttfont(cls, font: TTFont, name: str) -> "FontMetrics":
+        """Build metrics from a parsed fontTools font"""
+        hmtx = font["hmtx"].metrics
+        cmap = font.getBestCmap() or {}
+        advances = {codepoint: hmtx[glyph][0] for codepoint, glyph in cmap.items() if glyph in hmtx}
+        default_advance = hmtx[".notdef"][0] if ".notdef" in hmtx else font["head"].unitsPerEm // 2
+        return cls(name, advances, default_advance, font["head"].unitsPerEm)
+
+    def _units(self, text: str) -> int:
+        width = self._word_cache.get(text)
+        if width is None:
+            advances = self.advances
+            default = self.default_advance
+            width = sum(advances.get(ord(ch), default) for ch in text)
+            if len(self._word_cache) < 65536:
+                self._word_cache[text] = width
+        return width
+
+    def text_width(self, text: str, font_size: float) -> float:
+        """
+        Measure text width
+
+        Args:
+            text: Text without line breaks
+            font_size: Font size in points
+
+        Returns:
+            Width in points
+        """
+        return self._units(text) * font_size / self.units_per_em
+
+
+class HeuristicFontMetrics(FontMetrics):
+    """Average-character-width estimate used when no font file is available"""
+
+    AVG_CHAR_WIDTH_EM = 0.6
+
+    def __init__(self, name: str):
+        units_per_em = 1000
+        super().__init__(name, {}, int(units_per_em * self.AVG_CHAR_WIDTH_EM), units_per_em)
+
+
+class FontRegistry:
+    """Index of installed fonts by family and style"""
+
+    def __init__(self, font_dirs: List[str]):
+        """
+        Initialize registry (fonts are indexed lazily on first lookup)
+
+        Args:
+            font_dirs: Directories searched recursively for font files
+        """
+        self.font_dirs = font_dirs
+        # (family, bold, italic) -> (path, index in collection)
+        self._faces: Optional[Dict[Tuple[str, bool, bool], Tuple[str, int]]] = None
+        self._lock = threading.Lock()
+
+    def _index_font(self, faces, path: str, index: int, font: TTFont):
+        name_table = font["name"]
+        family = name_table.getDebugName(16) or name_table.getDebugName(1)
+        if not family:
+            return
+        bold = bool(font["OS/2"].fsSelection & 0x20) if "OS/2" in font else False
+        italic = bool(font["OS/2"].fsSelection & 0x01) if "OS/2" in font else False
+        faces.setdefault((family.lower(), bold, italic), (path, index))
+
+    def _build_index(self) -> Dict[Tuple[str, bool, bool], Tuple[str, int]]:
+        faces: Dict[Tuple[str, bool, bool], Tuple[str, int]] = {}
+        for font_dir in self.font_dirs:
+            for root, _, files in os.walk(font_dir):
+                for filename in sorted(files):
+                    if not filename.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        if filename.lower().endswith(".ttc"):
+                            for index, font in enumerate(TTCollection(path, lazy=True).fonts):
+                                self._index_font(faces, path, index, font)
+                        else:
+                            self._index_font(faces, path, 0, TTFont(path, lazy=True))
+                    except Exception as e:
+                        logger.debug(f"Skipping font {path}: {e}")
+        logger.info(f"Indexed {len(faces)} font faces")
+        return faces
+
+    def find(self, family: str, bold: bool = False, italic: bool = False) -> Optional[Tuple[str, int]]:
+        """
+        Find the font file for a family and style
+
+        Falls back to metric-compatible aliases, then to the regular face.
+
+        Returns:
+            (path, index in collection) or None
+        """
+        with self._lock:
+            if self._faces is None:
+                self._faces = self._build_index()
+        family = family.lower()
+        for candidate in [family, *FONT_ALIASES.get(family, [])]:
+            for style in ((bold, italic), (bold, False), (False, False)):
+                face = self._faces.get((candidate, *style))
+                if face:
+                    return face
+        return None
+
+
+font_registry = FontRegistry([d for d in settings.FONT_DIRS.split(os.pathsep) if d])
+
+
+@lru_cache(maxsize=64)
+def get_font_metrics(family: str, bold: bool = False, italic: bool = False) -> FontMetrics:
+    """
+    Get metrics for a font, parsing its file at most once
+
+    Args:
+        family: Font family name (e.g. "Arial")
+        bold: Bold face
+        italic: Italic face
+
+    Returns:
+        FontMetrics (heuristic if no suitable font is installed)
+    """
+    for candidate in [family, *FALLBACK_FAMILIES]:
+        face = font_registry.find(candidate, bold, italic)
+        if face is None:
+            continue
+        path, index = face
+        try:
+            font = TTFont(path, fontNumber=index, lazy=True)
+            metrics = FontMetrics.from_ttfont(font, os.path.basename(path))
+            if candidate != family:
+                logger.info(f"Font {family} not installed, measuring with {metrics.name}")
+            return metrics
+        except Exception as e:
+            logger.warning(f"Failed to load font {path}: {e}")
+
+    logger.warning(f"No font file found for {family}, using average character width")
+    return HeuristicFontMetrics(family)
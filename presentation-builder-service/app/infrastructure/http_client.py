@@ -0,0 +1,94 @@
+"""Shared HTTP client for downstream service calls"""
+import logging
+from typing import List, Optional
+import httpx
+
+from app.config.settings import settings
+from app.infrastructure.consul import ServiceResolver
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the application-scoped HTTP client
+
+    One pooled client is shared by all downstream service clients, so
+    connections are kept alive between requests. HTTP/2 is negotiated via
+    ALPN on TLS endpoints; plain-HTTP services keep using HTTP/1.1.
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    return httpx.AsyncClient(
+        http2=settings.HTTP_CLIENT_HTTP2,
+        timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+class ServiceHttpClient:
+    """Base class for clients of services resolved through Consul"""
+
+    SERVICE_NAME: str = ""
+    DEFAULT_URL: str = ""
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        resolver: Optional[ServiceResolver] = None,
+        base_url: Optional[str] = None
+    ):
+        """
+        Initialize service client
+
+        Args:
+            http_client: Shared pooled HTTP client
+            resolver: Service resolver (optional, uses base_url or DEFAULT_URL if not provided)
+            base_url: Fixed base URL of the service (disables discovery)
+        """
+        self.http_client = http_client
+        self.resolver = resolver
+        self.base_url = base_url
+
+    def _candidate_urls(self) -> List[str]:
+        if self.base_url:
+            return [self.base_url]
+        if self.resolver:
+            urls = self.resolver.get_urls(self.SERVICE_NAME)
+            if urls:
+                return urls
+        return [self.DEFAULT_URL]
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a request, failing over to the next instance on transport errors
+
+        Args:
+            method: HTTP method
+            path: Request path, starting with "/"
+            **kwargs: Passed to httpx.AsyncClient.request
+
+        Returns:
+            Response from the first instance that answered
+
+        Raises:
+            httpx.HTTPError: If every instance failed or the response is an error status
+        """
+        last_error: Optional[httpx.TransportError] = None
+        for base_url in self._candidate_urls():
+            try:
+                response = await self.http_client.request(method, f"{base_url}{path}", **kwargs)
+            except httpx.TransportError as e:
+                logger.warning(f"{self.SERVICE_NAME} instance {base_url} unreachable: {e}")
+                if self.resolver:
+                    self.resolver.mark_failed(base_url)
+                last_error = e
+                continue
+            response.raise_for_status()
+            return response
+        raise last_error
@@ -0,0 +1,99 @@
+"""In-memory cache of master templates for new presentations"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.infrastructure.storage import AsyncMinIOStorageService
+from app.infrastructure.pptx_service import PPTXService
+
+logger = logging.getLogger(__name__)
+
+
+class MasterTemplateCache:
+    """
+    Master template bytes held in memory and revalidated by ETag
+
+    A template is downloaded and validated with python-pptx once per ETag.
+    New presentations are then created from the cached bytes as-is, without
+    a load/save cycle, since the template would come out unchanged.
+    """
+
+    def __init__(self, revalidate_interval: float = 30.0, max_entries: int = 16):
+        """
+        Initialize cache
+
+        Args:
+            revalidate_interval: Seconds during which a cached template is used without an ETag check
+            max_entries: Number of templates kept; the least recently used one is dropped first
+        """
+        self.revalidate_interval = revalidate_interval
+        self.max_entries = max_entries
+        # object_name -> (etag, data, last_validated_at), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+        self._empty_presentation: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    async def get(self, storage_service: AsyncMinIOStorageService, object_name: str) -> Tuple[str, bytes]:
+        """
+        Get a master template, downloading it only if its ETag changed
+
+        Args:
+            storage_service: Storage service to read the template from
+            object_name: Template object name in MinIO
+
+        Returns:
+            (etag, PPTX bytes)
+
+        Raises:
+            Exception: If the template cannot be read or is not a valid PPTX
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(object_name)
+            if entry:
+                self._entries.move_to_end(object_name)
+        if entry and now - entry[2] < self.revalidate_interval:
+            return entry[0], entry[1]
+
+        etag = await storage_service.get_file_etag(object_name)
+        if entry and entry[0] == etag:
+            self._store(object_name, (etag, entry[1], now))
+            return etag, entry[1]
+
+        data = await storage_service.download_file(object_name)
+        # Validate once per version instead of on every presentation
+        prs = await asyncio.to_thread(PPTXService.load_presentation, data)
+        logger.info(f"Cached master template {object_name} (etag={etag}, {len(prs.slides)} slide(s), {len(data)} bytes)")
+
+        self._store(object_name, (etag, data, now))
+        return etag, data
+
+    def _store(self, object_name: str, entry: Tuple[str, bytes, float]):
+        with self._lock:
+            self._entries[object_name] = entry
+            self._entries.move_to_end(object_name)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.info(f"Evicted master template {evicted} from cache")
+
+    def empty_presentation(self) -> bytes:
+        """Get the bytes of an empty one-slide presentation (built once)"""
+        if self._empty_presentation is None:
+            self._empty_presentation = PPTXService.create_empty_presentation()
+        return self._empty_presentation
+
+    def invalidate(self, object_name: Optional[str] = None):
+        """
+        Drop cached templates
+
+        Args:
+            object_name: Template to drop (None drops all)
+        """
+        with self._lock:
+            if object_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(object_name, None)
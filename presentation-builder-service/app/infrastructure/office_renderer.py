@@ -0,0 +1,159 @@
+"""Headless LibreOffice renderer pool"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RendererUnavailable(Exception):
+    """Raised when no LibreOffice binary is available"""
+    pass
+
+
+class OfficeRenderer:
+    """
+    Converts office documents with headless LibreOffice
+
+    LibreOffice cannot run two conversions on one user profile, so the pool
+    holds pool_size profile directories: a conversion takes a profile, runs
+    `soffice --convert-to` with it and gives it back. Profiles are reused, so
+    only the first conversion on each pays for profile initialization, and
+    the number of concurrent soffice processes never exceeds pool_size.
+    warm_up() pays that cost for every profile ahead of the first request.
+    """
+
+    def __init__(
+        self,
+        soffice_path: str = "soffice",
+        pool_size: int = 2,
+        timeout: float = 60.0,
+        work_dir: Optional[str] = None
+    ):
+        """
+        Initialize renderer pool
+
+        Args:
+            soffice_path: LibreOffice binary (name on PATH or absolute path)
+            pool_size: Conversions running at the same time
+            timeout: Seconds after which a conversion is killed
+            work_dir: Directory for profiles and temporary files; profiles there
+                survive restarts (a temp dir removed on close if not given)
+        """
+        self.soffice = shutil.which(soffice_path)
+        self.timeout = timeout
+        self._owns_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="office-renderer-")
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        self._profiles: asyncio.Queue = asyncio.Queue()
+        for index in range(pool_size):
+            self._profiles.put_nowait(os.path.join(self.work_dir, f"profile-{index}"))
+
+        self.pool_size = pool_size
+        if not self.soffice:
+            logger.warning(f"LibreOffice binary '{soffice_path}' not found, rendering disabled")
+
+    @property
+    def available(self) -> bool:
+        return self.soffice is not None
+
+    async def warm_up(self):
+        """
+        Initialize every profile of the pool with a throwaway conversion
+
+        A fresh profile makes the first conversion on it several seconds
+        slower; failures are logged and leave the profile to be initialized
+        by its first real conversion. Without a LibreOffice binary this logs
+        an error: thumbnails and PDF export will answer 503.
+        """
+        if not self.soffice:
+            logger.error(
+                "LibreOffice warm-up requested but no soffice binary was found; "
+                "thumbnails and PDF export are unavailable (install LibreOffice or set OFFICE_SOFFICE_PATH)"
+            )
+            return
+        results = await asyncio.gather(
+            *(self.convert(b"", "pdf", source_suffix=".txt") for _ in range(self.pool_size)),
+            return_exceptions=True
+        )
+        failed = [result for result in results if isinstance(result, Exception)]
+        if failed:
+            logger.warning(f"LibreOffice warm-up failed for {len(failed)} of {self.pool_size} profiles: {failed[0]}")
+        else:
+            logger.info(f"LibreOffice pool warmed up ({self.pool_size} profiles)")
+
+    async def convert(
+        self,
+        data: bytes,
+        convert_to: str,
+        source_suffix: str = ".pptx",
+        timeout: Optional[float] = None
+    ) -> bytes:
+        """
+        Convert a document
+
+        Args:
+            data: Source document
+            convert_to: soffice --convert-to target, e.g. "pdf" or "png:impress_png_Export:{...}"
+            source_suffix: Extension of the source document
+            timeout: Seconds after which this conversion is killed (pool default if not given)
+
+        Returns:
+            Converted document
+
+        Raises:
+            RendererUnavailable: If LibreOffice is not installed
+            RuntimeError: If the conversion fails or times out
+        """
+        if not self.soffice:
+            raise RendererUnavailable("LibreOffice is not available")
+
+        timeout = timeout or self.timeout
+        profile = await self._profiles.get()
+        job_dir = tempfile.mkdtemp(dir=self.work_dir, prefix="job-")
+        try:
+            source = Path(job_dir) / f"document{source_suffix}"
+            await asyncio.to_thread(source.write_bytes, data)
+            out_dir = Path(job_dir) / "out"
+
+            process = await asyncio.create_subprocess_exec(
+                self.soffice,
+                "--headless", "--norestore", "--nologo", "--nodefault", "--nolockcheck",
+                f"-env:UserInstallation={Path(profile).as_uri()}",
+                "--convert-to", convert_to,
+                "--outdir", str(out_dir),
+                str(source),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise RuntimeError(f"LibreOffice conversion to {convert_to} timed out after {timeout}s")
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+
+            extension = convert_to.split(":", 1)[0]
+            result = out_dir / f"document.{extension}"
+            if process.returncode != 0 or not result.exists():
+                raise RuntimeError(
+                    f"LibreOffice conversion to {extension} failed (exit {process.returncode}): "
+                    f"{stderr.decode(errors='replace').strip()}"
+                )
+            return await asyncio.to_thread(result.read_bytes)
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._profiles.put_nowait(profile)
+
+    def close(self):
+        """Remove the temporary work directory"""
+        if self._owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -1,18 +1,27 @@
 """PPTX manipulation service using python-pptx"""
+import hashlib
 import io
 import os
 import logging
 import tempfile
-from typing import Dict, List, Optional, BinaryIO
+import zipfile
+from typing import Any, Callable, Dict, List, Optional, BinaryIO, Set, Tuple
 from uuid import UUID
+from lxml import etree
 from pptx import Presentation as PPTXPresentation
 from pptx.util import Inches, Pt
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
 
 from app.infrastructure.text_layout import TextLayoutService
+from app.infrastructure.slide_cloner import SlideCloner
 
 logger = logging.getLogger(__name__)
 
+# Relationships that do not affect how a slide renders
+HASH_SKIPPED_RELTYPES = (RT.NOTES_SLIDE, RT.SLIDE, RT.NOTES_MASTER, RT.HANDOUT_MASTER)
+
 
 class PPTXService:
     """Service for creating and manipulating PPTX files"""
@@ -92,6 +101,58 @@ class PPTXService:
         prs.slides.add_slide(slide_layout)
         return len(prs.slides) - 1
     
+    @staticmethod
+    def slide_ids(pptx_data: bytes) -> List[int]:
+        """
+        Get the slide ids (p:sldId/@id) of a deck in slide order
+        
+        Only presentation.xml is parsed, not the whole deck.
+        
+        Args:
+            pptx_data: PPTX file data
+            
+        Returns:
+            Slide ids; they stay the same when the deck is saved again
+        """
+        with zipfile.ZipFile(io.BytesIO(pptx_data)) as archive:
+            package_rels = etree.fromstring(archive.read("_rels/.rels"))
+            target = next(
+                rel.get("Target") for rel in package_rels if rel.get("Type") == RT.OFFICE_DOCUMENT
+            )
+            presentation = etree.fromstring(archive.read(target.lstrip("/")))
+        return [int(sld_id.get("id")) for sld_id in presentation.iter(qn("p:sldId"))]
+    
+    @staticmethod
+    def delete_slide(prs: PPTXPresentation, slide_index: int):
+        """
+        Remove a slide from the presentation
+        
+        Args:
+            prs: Presentation object
+            slide_index: Index of the slide to remove
+        """
+        rId = prs.slides._sldIdLst[slide_index].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[slide_index]
+    
+    @staticmethod
+    def move_slide(prs: PPTXPresentation, from_index: int, to_index: int):
+        """
+        Move a slide to another position
+        
+        Only the slide order in presentation.xml (sldIdLst) changes; the slide
+        part and its relationships are left as they are.
+        
+        Args:
+            prs: Presentation object
+            from_index: Current index of the slide
+            to_index: New index of the slide
+        """
+        sld_id_lst = prs.slides._sldIdLst
+        sld_id = sld_id_lst[from_index]
+        sld_id_lst.remove(sld_id)
+        sld_id_lst.insert(to_index, sld_id)
+    
     @staticmethod
     def copy_shapes_from_block(
         target_prs: PPTXPresentation,
@@ -118,14 +179,38 @@ class PPTXService:
                 logger.warning("Block has no slides")
                 return False
             
-            source_slide = block_prs.slides[0]
+            return PPTXService.copy_shapes_from_slide(target_prs, block_prs.slides[0], slide_index)
+            
+        except Exception as e:
+            logger.error(f"Error copying shapes from block: {e}")
+            return False
+    
+    @staticmethod
+    def copy_shapes_from_slide(
+        target_prs: PPTXPresentation,
+        source_slide,
+        slide_index: int
+    ) -> bool:
+        """
+        Copy all shapes from an already parsed block slide to a target presentation slide
+        
+        The source slide is only read, so it may come from a shared cache.
+        
+        Args:
+            target_prs: Target presentation
+            source_slide: Source slide (first slide of a block presentation)
+            slide_index: Target slide index
+            
+        Returns:
+            True if successful
+        """
+        try:
             target_slide = target_prs.slides[slide_index]
             
-            # Copy all shapes from source to target
-            for shape in source_slide.shapes:
-                PPTXService._copy_shape(shape, target_slide)
+            # Copy the whole shape tree at XML level (with images, charts, media)
+            copied = SlideCloner.copy_shapes(source_slide, target_slide)
             
-            logger.info(f"Copied {len(source_slide.shapes)} shapes to slide {slide_index}")
+            logger.info(f"Copied {copied} shapes to slide {slide_index}")
             return True
             
         except Exception as e:
@@ -133,80 +218,89 @@ class PPTXService:
             return False
     
     @staticmethod
-    def _copy_shape(source_shape, target_slide):
+    def assemble_presentation(
+        base_pptx_data: bytes,
+        slides: List[Tuple[List, List[Dict], Dict[str, Any]]],
+        on_slide: Optional[Callable[[int, int], None]] = None
+    ) -> bytes:
         """
-        Copy a single shape to target slide
+        Build a whole deck in a single pass
+        
+        Each slide names its origin in the base deck by slide id (p:sldId/@id),
+        so base slides follow their slides through moves and deletes:
+        
+        - base_slide_id: the slide is that base slide, with its content;
+        - otherwise it is a new slide with the layout of base slide
+          layout_slide_id (or of base_slide_id if an earlier slide already
+          is that slide), or else layout layout_index of the first master
+          (clamped to the available layouts).
+        
+        Base slides no slide starts from are removed, and the slides are put
+        in the requested order.
         
-        Note: This is a simplified implementation. 
-        For production, consider using more sophisticated shape cloning.
+        Args:
+            base_pptx_data: Base deck (master template with its initial slides)
+            slides: Per slide: (source slides of its blocks in position order,
+                field data for fill_template_with_data,
+                origin {"base_slide_id", "layout_slide_id", "layout_index"})
+            on_slide: Called with (slides done, total) after each slide; may raise to abort
+            
+        Returns:
+            PPTX file as bytes
+            
+        Raises:
+            ValueError: If block shapes cannot be copied
         """
-        try:
-            # Handle different shape types
-            if source_shape.shape_type == MSO_SHAPE_TYPE.TEXT_BOX:
-                # Copy text box
-                textbox = target_slide.shapes.add_textbox(
-                    source_shape.left,
-                    source_shape.top,
-                    source_shape.width,
-                    source_shape.height
-                )
-                if source_shape.has_text_frame:
-                    textbox.text_frame.text = source_shape.text_frame.text
-                    # Copy text formatting
-                    for src_para, tgt_para in zip(source_shape.text_frame.paragraphs, textbox.text_frame.paragraphs):
-                        tgt_para.alignment = src_para.alignment
-                        for src_run, tgt_run in zip(src_para.runs, tgt_para.runs):
-                            tgt_run.font.size = src_run.font.size
-                            tgt_run.font.bold = src_run.font.bold
-                            tgt_run.font.italic = src_run.font.italic
-                            if src_run.font.color.rgb:
-                                tgt_run.font.color.rgb = src_run.font.color.rgb
-            
-            elif source_shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                # Copy picture
-                image_stream = io.BytesIO(source_shape.image.blob)
-                target_slide.shapes.add_picture(
-                    image_stream,
-                    source_shape.left,
-                    source_shape.top,
-                    source_shape.width,
-                    source_shape.height
-                )
-            
-            elif source_shape.shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
-                # Copy auto shape
-                shape = target_slide.shapes.add_shape(
-                    source_shape.auto_shape_type,
-                    source_shape.left,
-                    source_shape.top,
-                    source_shape.width,
-                    source_shape.height
-                )
-                if source_shape.has_text_frame and shape.has_text_frame:
-                    shape.text_frame.text = source_shape.text_frame.text
-            
-            elif source_shape.shape_type == MSO_SHAPE_TYPE.TABLE:
-                # Copy table
-                table = target_slide.shapes.add_table(
-                    len(source_shape.table.rows),
-                    len(source_shape.table.columns),
-                    source_shape.left,
-                    source_shape.top,
-                    source_shape.width,
-                    source_shape.height
-                ).table
-                
-                # Copy cell contents
-                for row_idx, row in enumerate(source_shape.table.rows):
-                    for col_idx, cell in enumerate(row.cells):
-                        target_cell = table.cell(row_idx, col_idx)
-                        target_cell.text = cell.text
+        prs = PPTXService.load_presentation(base_pptx_data)
+        sld_id_lst = prs.slides._sldIdLst
+        base_slides = {
+            int(sld_id.id): (sld_id, slide) for sld_id, slide in zip(list(sld_id_lst), prs.slides)
+        }
+        
+        ordered = []
+        used = set()
+        for _, _, origin in slides:
+            base_slide_id = origin.get("base_slide_id")
+            if base_slide_id in base_slides and base_slide_id not in used:
+                used.add(base_slide_id)
+                ordered.append(base_slides[base_slide_id][0])
+                continue
+            prs.slides.add_slide(PPTXService._origin_layout(prs, base_slides, origin))
+            ordered.append(sld_id_lst[-1])
+        
+        for base_slide_id, (sld_id, _) in base_slides.items():
+            if base_slide_id not in used:
+                prs.part.drop_rel(sld_id.rId)
+                sld_id_lst.remove(sld_id)
+        for sld_id in ordered:
+            sld_id_lst.remove(sld_id)
+            sld_id_lst.append(sld_id)
+        
+        for slide_index, (source_slides, fields_data, _) in enumerate(slides):
+            for source_slide in source_slides:
+                if not PPTXService.copy_shapes_from_slide(prs, source_slide, slide_index):
+                    raise ValueError(f"Failed to copy block shapes to slide {slide_index}")
             
-            else:
-                logger.warning(f"Unsupported shape type: {source_shape.shape_type}")
-                
-        except Exception as e:
-            logger.error(f"Error copying shape: {e}")
+            if fields_data and not PPTXService.fill_template_with_data(prs, slide_index, fields_data):
+                logger.warning(f"Auto-layout failed for slide {slide_index}, leaving block placeholders as is")
+            
+            if on_slide:
+                on_slide(slide_index + 1, len(slides))
+        
+        logger.info(f"Assembled deck with {len(slides)} slide(s)")
+        return PPTXService.save_presentation(prs)
+    
+    @staticmethod
+    def _origin_layout(prs: PPTXPresentation, base_slides: Dict[int, Tuple], origin: Dict[str, Any]):
+        """Layout of a slide that does not start from a base slide"""
+        # A base slide already taken by an earlier slide still lends its layout
+        for key in ("layout_slide_id", "base_slide_id"):
+            if origin.get(key) in base_slides:
+                return base_slides[origin[key]][1].slide_layout
+        layout_index = origin.get("layout_index")
+        if layout_index is None:
+            layout_index = 6
+        return prs.slide_layouts[max(0, min(layout_index, len(prs.slide_layouts) - 1))]
     
     @staticmethod
     def replace_placeholders(
@@ -270,7 +364,9 @@ class PPTXService:
                         "italic": False,
                         "alignment": "LEFT"
                     },
-                    "order_index": 0
+                    "order_index": 0,
+                    "block_id": "<SlideBlock id>",  # метка shape (опционально)
+                    "field_key": "title"
                 }, ...]
             
         Returns:
@@ -366,20 +462,7 @@ class PPTXService:
             
             logger.info(f"Removed {len(shapes_to_remove)} shapes (placeholders and text boxes)")
             
-            # Фильтруем поля - убираем пустые значения
-            filtered_fields = []
-            for field in fields_data:
-                text = field.get("text", "")
-                # Пропускаем поля с пустым текстом или только пробелами
-                if text and text.strip():
-                    filtered_fields.append(field)
-                else:
-                    logger.debug(f"Skipping empty field at order_index {field.get('order_index', 0)}")
-            
-            logger.info(f"Filtered fields: {len(filtered_fields)} non-empty out of {len(fields_data)} total")
-            
-            # Сортируем поля по order_index
-            sorted_fields = sorted(filtered_fields, key=lambda x: x.get("order_index", 0))
+            sorted_fields = PPTXService._prepare_fields(fields_data)
             
             # Используем TextLayoutService для размещения полей
             success = TextLayoutService.add_fields_with_auto_layout(
@@ -395,11 +478,112 @@ class PPTXService:
             logger.error(f"Error filling template with data: {e}")
             return False
     
+    @staticmethod
+    def _prepare_fields(fields_data: List[Dict]) -> List[Dict]:
+        """Убрать пустые поля и отсортировать по order_index"""
+        # Фильтруем поля - убираем пустые значения
+        filtered_fields = []
+        for field in fields_data:
+            text = field.get("text", "")
+            # Пропускаем поля с пустым текстом или только пробелами
+            if text and text.strip():
+                filtered_fields.append(field)
+            else:
+                logger.debug(f"Skipping empty field at order_index {field.get('order_index', 0)}")
+        
+        logger.info(f"Filtered fields: {len(filtered_fields)} non-empty out of {len(fields_data)} total")
+        
+        # Сортируем поля по order_index
+        return sorted(filtered_fields, key=lambda x: x.get("order_index", 0))
+    
+    @staticmethod
+    def update_fields_in_place(
+        prs: PPTXPresentation,
+        slide_index: int,
+        fields_data: List[Dict],
+        changed_fields: Set[Tuple[str, str]]
+    ) -> bool:
+        """
+        Инкрементально обновить поля слайда, созданные fill_template_with_data
+        
+        Args:
+            prs: Presentation object
+            slide_index: Index of slide to modify
+            fields_data: Данные всех полей слайда (как для fill_template_with_data,
+                с ключами "block_id" и "field_key")
+            changed_fields: Множество (block_id, field_key) с изменившимся текстом
+            
+        Returns:
+            True if updated in place, False if a full fill is required
+        """
+        try:
+            slide = prs.slides[slide_index]
+            sorted_fields = PPTXService._prepare_fields(fields_data)
+            return TextLayoutService.update_fields_in_place(slide, prs, sorted_fields, changed_fields)
+        except Exception as e:
+            logger.error(f"Error updating fields in place: {e}")
+            return False
+    
     @staticmethod
     def get_slide_count(prs: PPTXPresentation) -> int:
         """Get number of slides in presentation"""
         return len(prs.slides)
     
+    @staticmethod
+    def slide_content_hash(slide) -> str:
+        """
+        Hash of everything a slide renders from
+        
+        Covers the slide size, the slide XML and all parts it references
+        (images, media, charts, layout, master, theme), so it changes when
+        anything visible on the slide changes and stays the same when other
+        slides change. Notes and links to other slides are not followed; from
+        a master only the theme and media are, not its other layouts.
+        
+        Args:
+            slide: python-pptx slide
+            
+        Returns:
+            SHA-256 hex digest
+        """
+        digest = hashlib.sha256()
+        # The size lives in presentation.xml, which the slide does not reference
+        presentation = slide.part.package.presentation_part.presentation
+        digest.update(f"{presentation.slide_width}x{presentation.slide_height}".encode("ascii"))
+        seen = set()
+        pending = [slide.part]
+        while pending:
+            part = pending.pop()
+            if part.partname in seen:
+                continue
+            seen.add(part.partname)
+            digest.update(part.content_type.encode("utf-8"))
+            digest.update(part.blob)
+            for rel in part.rels.values():
+                if rel.is_external or rel.reltype in HASH_SKIPPED_RELTYPES:
+                    continue
+                if rel.reltype == RT.SLIDE_LAYOUT and part.content_type == CT.PML_SLIDE_MASTER:
+                    continue
+                pending.append(rel.target_part)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def extract_slide(prs: PPTXPresentation, slide_index: int) -> bytes:
+        """
+        Save a one-slide deck with only the given slide (modifies prs)
+        
+        Args:
+            prs: Presentation object
+            slide_index: Index of the slide to keep
+            
+        Returns:
+            PPTX file as bytes
+        """
+        for index in reversed(range(len(prs.slides))):
+            if index != slide_index:
+                PPTXService.delete_slide(prs, index)
+        return PPTXService.save_presentation(prs)
+    
     @staticmethod
     def create_presentation_from_template(template_data: bytes) -> bytes:
         """
@@ -440,9 +624,10 @@ class PPTXService:
         slide_layout = source_slide.slide_layout
         new_slide = prs.slides.add_slide(slide_layout)
         
-        # Copy all shapes from the source slide
-        for shape in source_slide.shapes:
-            PPTXService._copy_shape(shape, new_slide)
+        # Replace the layout's empty placeholders with a copy of the source shape tree
+        SlideCloner.clear_shapes(new_slide)
+        SlideCloner.copy_shapes(source_slide, new_slide, keep_placeholders=True)
+        SlideCloner.copy_background(source_slide, new_slide)
         
         new_index = len(prs.slides) - 1
         logger.info(f"Cloned slide {source_slide_index} -> new slide at index {new_index}")
@@ -1,57 +1,46 @@
 """Client for Project Service integration"""
+import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from uuid import UUID
 import httpx
 
 from app.config.settings import settings
+from app.infrastructure.http_client import ServiceHttpClient
 
 logger = logging.getLogger(__name__)
 
 
-class ProjectServiceClient:
+class ProjectServiceClient(ServiceHttpClient):
     """Client for communicating with Project Service"""
     
-    def __init__(self, base_url: Optional[str] = None):
-        """
-        Initialize Project Service client
-        
-        Args:
-            base_url: Base URL of project service (optional, uses service discovery if not provided)
-        """
-        self.base_url = base_url or self._discover_service()
-        self.timeout = 30.0
+    SERVICE_NAME = settings.PROJECT_SERVICE_NAME
+    DEFAULT_URL = "http://project-service:8080"
     
-    def _discover_service(self) -> str:
-        """
-        Discover project service URL via Consul
-        
-        Returns:
-            Service URL
-        """
-        try:
-            import consul
-            c = consul.Consul(host=settings.CONSUL_HOST, port=settings.CONSUL_PORT)
-            _, services = c.health.service(settings.PROJECT_SERVICE_NAME, passing=True)
-            
-            if services:
-                service = services[0]
-                address = service['Service']['Address']
-                port = service['Service']['Port']
-                url = f"http://{address}:{port}"
-                logger.info(f"Discovered project service at: {url}")
-                return url
-            else:
-                logger.warning("Project service not found in Consul, using default")
-                return "http://project-service:8080"
-        except Exception as e:
-            logger.error(f"Error discovering project service: {e}")
-            return "http://project-service:8080"
+    # Upper bound for remembered (project, caller) existence results
+    EXISTENCE_CACHE_MAX_ENTRIES = 10000
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exists_ttl = settings.PROJECT_EXISTS_CACHE_TTL
+        self.not_found_ttl = settings.PROJECT_NOT_FOUND_CACHE_TTL
+        self._existence_cache: "OrderedDict[Tuple[UUID, str], Tuple[float, bool]]" = OrderedDict()
+        self._inflight: Dict[Tuple[UUID, str], asyncio.Future] = {}
+    
+    @staticmethod
+    def _caller_key(auth_token: str) -> str:
+        return hashlib.sha256(auth_token.encode("utf-8")).hexdigest()
     
     async def get_project(self, project_id: UUID, auth_token: str) -> Optional[Dict[str, Any]]:
         """
         Get project by ID
         
+        A 404 means the project is gone for every caller and a 403 that this
+        caller lost access; either drops the matching cached existence results.
+        
         Args:
             project_id: UUID of the project
             auth_token: JWT authentication token
@@ -61,20 +50,32 @@ class ProjectServiceClient:
         """
         try:
             headers = {"Authorization": f"Bearer {auth_token}"}
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/projects/{project_id}",
-                    headers=headers
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request(
+                "GET",
+                f"/api/projects/{project_id}",
+                headers=headers
+            )
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self.invalidate_project(project_id)
+            elif e.response.status_code == 403:
+                self._existence_cache.pop((project_id, self._caller_key(auth_token)), None)
+            logger.error(f"Error fetching project {project_id}: {e}")
+            return None
         except httpx.HTTPError as e:
             logger.error(f"Error fetching project {project_id}: {e}")
             return None
     
     async def check_project_exists(self, project_id: UUID, auth_token: str) -> bool:
         """
-        Check if a project exists
+        Check if a project exists and is visible to the caller
+        
+        Results are cached per (project, caller): positive answers for
+        PROJECT_EXISTS_CACHE_TTL seconds, 404/403 answers for
+        PROJECT_NOT_FOUND_CACHE_TTL seconds. Transport and server errors
+        are not cached. A 404 for any caller means the project is gone, so
+        it also drops the positive answers cached for other callers.
         
         Args:
             project_id: UUID of the project
@@ -83,5 +84,69 @@ class ProjectServiceClient:
         Returns:
             True if project exists
         """
-        project = await self.get_project(project_id, auth_token)
-        return project is not None
+        cache_key = (project_id, self._caller_key(auth_token))
+        cached = self._existence_cache.get(cache_key)
+        if cached is not None:
+            expires_at, exists = cached
+            if expires_at > time.monotonic():
+                self._existence_cache.move_to_end(cache_key)
+                return exists
+            self._existence_cache.pop(cache_key, None)
+        
+        # Concurrent checks for the same key share one request
+        inflight = self._inflight.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_project_exists(project_id, auth_token, cache_key))
+            self._inflight[cache_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return await asyncio.shield(inflight)
+    
+    async def _fetch_project_exists(
+        self,
+        project_id: UUID,
+        auth_token: str,
+        cache_key: Tuple[UUID, str]
+    ) -> bool:
+        try:
+            await self._request(
+                "GET",
+                f"/api/projects/{project_id}",
+                headers={"Authorization": f"Bearer {auth_token}"}
+            )
+            exists = True
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (403, 404):
+                logger.error(f"Error checking project {project_id}: {e}")
+                return False
+            if e.response.status_code == 404:
+                self.invalidate_project(project_id)
+            exists = False
+        except httpx.HTTPError as e:
+            logger.error(f"Error checking project {project_id}: {e}")
+            return False
+        
+        ttl = self.exists_ttl if exists else self.not_found_ttl
+        if ttl > 0:
+            self._existence_cache[cache_key] = (time.monotonic() + ttl, exists)
+            while len(self._existence_cache) > self.EXISTENCE_CACHE_MAX_ENTRIES:
+                self._existence_cache.popitem(last=False)
+        return exists
+    
+    def invalidate_project(self, project_id: Optional[UUID] = None):
+        """
+        Drop cached existence results
+        
+        Called when Project Service answers 404 for a project, from
+        check_project_exists and get_project. Project Service does not notify
+        this service about deletions or access changes, so an entry goes stale
+        until its TTL ends or some caller's check sees the 404; a deletion
+        event handler, if one is added, should call this too.
+        
+        Args:
+            project_id: Project to forget for all callers (None clears the whole cache)
+        """
+        if project_id is None:
+            self._existence_cache.clear()
+            return
+        for cache_key in [key for key in self._existence_cache if key[0] == project_id]:
+            self._existence_cache.pop(cache_key, None)
@@ -1,167 +1,581 @@
 """Repository implementations"""
-from typing import List, Optional
-from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import select, update, delete, func, or_, and_, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
 
-from app.domain.entities import Presentation, PresentationSlide, SlideBlock, SlideBlockValue
+from app.domain.entities import (
+    Presentation,
+    PresentationSlide,
+    SlideBlock,
+    SlideBlockValue,
+    GenerationJob,
+    PresentationVersion
+)
 from app.domain.repositories import (
-    IPresentationRepository, 
-    ISlideRepository, 
+    IPresentationRepository,
+    ISlideRepository,
     IBlockRepository,
-    IBlockValueRepository
+    IBlockValueRepository,
+    IGenerationJobRepository,
+    IPresentationVersionRepository
 )
 
+# Sessions are created with expire_on_commit=False: entities stay usable after
+# commit. Lazy loading is not available with AsyncSession, so each read loads
+# exactly what its callers touch: trees with selectinload (one query per level,
+# no join row explosion), plain rows, counts or id columns otherwise. Reads use
+# populate_existing so a re-read returns fresh state, as expire-on-commit did.
+# Deletes are single DELETE statements; children go through ON DELETE CASCADE.
+
+
+def _number_slides(slides: List[PresentationSlide]) -> List[PresentationSlide]:
+    """Set order_index on slides read in sort_key order"""
+    for index, slide in enumerate(slides):
+        slide.order_index = index
+    return slides
+
 
 class PresentationRepository(IPresentationRepository):
     """PostgreSQL implementation of presentation repository"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         self.db = db
-    
-    def create(self, presentation: Presentation) -> Presentation:
+
+    async def create(self, presentation: Presentation) -> Presentation:
         self.db.add(presentation)
-        self.db.commit()
-        self.db.refresh(presentation)
+        await self.db.commit()
         return presentation
-    
-    def get_by_id(self, presentation_id: UUID) -> Optional[Presentation]:
-        return self.db.query(Presentation).options(
-            joinedload(Presentation.slides).joinedload(PresentationSlide.blocks).joinedload(SlideBlock.values)
-        ).filter(
-            Presentation.id == presentation_id
-        ).first()
-    
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
-        return self.db.query(Presentation).offset(skip).limit(limit).all()
-    
-    def update(self, presentation: Presentation) -> Presentation:
+
+    async def get_by_id(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get the presentation row only (slides are not loaded)"""
+        result = await self.db.execute(
+            select(Presentation).execution_options(populate_existing=True).where(Presentation.id == presentation_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_with_slides(self, presentation_id: UUID) -> Optional[Presentation]:
+        """Get the presentation with slides, blocks and values"""
+        result = await self.db.execute(
+            select(Presentation).execution_options(populate_existing=True).options(
+                selectinload(Presentation.slides).selectinload(PresentationSlide.blocks).selectinload(SlideBlock.values)
+            ).where(Presentation.id == presentation_id)
+        )
+        presentation = result.scalar_one_or_none()
+        if presentation:
+            _number_slides(presentation.slides)
+        return presentation
+
+    async def exists(self, presentation_id: UUID) -> bool:
+        result = await self.db.execute(select(Presentation.id).where(Presentation.id == presentation_id))
+        return result.scalar_one_or_none() is not None
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Presentation]:
+        result = await self.db.execute(
+            select(Presentation).execution_options(populate_existing=True).options(
+                selectinload(Presentation.slides).selectinload(PresentationSlide.blocks).selectinload(SlideBlock.values)
+            ).offset(skip).limit(limit)
+        )
+        presentations = list(result.scalars().all())
+        for presentation in presentations:
+            _number_slides(presentation.slides)
+        return presentations
+
+    async def list_by_project(
+        self,
+        project_id: UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Tuple]:
+        """
+        List presentation summaries of a project, most recently updated first
+
+        Keyset pagination on (updated_at, id) over
+        idx_presentations_project_updated: every page is an index range scan,
+        however deep. Only summary columns are selected; the slide count is a
+        correlated COUNT over idx_slides_presentation_id.
+
+        Args:
+            project_id: UUID of the project
+            limit: Page size
+            after: (updated_at, id) of the last row of the previous page
+
+        Returns:
+            Rows of (id, project_id, name, status, file_url, created_at, updated_at, slide_count)
+        """
+        slide_count = select(func.count(PresentationSlide.id)).where(
+            PresentationSlide.presentation_id == Presentation.id
+        ).correlate(Presentation).scalar_subquery()
+
+        query = select(
+            Presentation.id,
+            Presentation.project_id,
+            Presentation.name,
+            Presentation.status,
+            Presentation.file_url,
+            Presentation.created_at,
+            Presentation.updated_at,
+            slide_count.label("slide_count")
+        ).where(Presentation.project_id == project_id)
+        if after:
+            query = query.where(tuple_(Presentation.updated_at, Presentation.id) < tuple_(*after))
+        query = query.order_by(Presentation.updated_at.desc(), Presentation.id.desc()).limit(limit)
+
+        result = await self.db.execute(query)
+        return list(result.all())
+
+    async def update(self, presentation: Presentation) -> Presentation:
         presentation.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(presentation)
+        await self.db.commit()
         return presentation
-    
-    def delete(self, presentation_id: UUID) -> bool:
-        presentation = self.get_by_id(presentation_id)
-        if presentation:
-            self.db.delete(presentation)
-            self.db.commit()
-            return True
-        return False
+
+    async def delete(self, presentation_id: UUID) -> bool:
+        result = await self.db.execute(delete(Presentation).where(Presentation.id == presentation_id))
+        await self.db.commit()
+        return result.rowcount > 0
 
 
 class SlideRepository(ISlideRepository):
     """PostgreSQL implementation of slide repository"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         self.db = db
-    
-    def create(self, slide: PresentationSlide) -> PresentationSlide:
+
+    async def create(self, slide: PresentationSlide) -> PresentationSlide:
         self.db.add(slide)
-        self.db.commit()
-        self.db.refresh(slide)
+        await self.db.commit()
+        # A new slide has no blocks: mark the collection loaded instead of re-reading it
+        set_committed_value(slide, "blocks", [])
         return slide
-    
-    def get_by_id(self, slide_id: UUID) -> Optional[PresentationSlide]:
-        return self.db.query(PresentationSlide).options(
-            joinedload(PresentationSlide.blocks).joinedload(SlideBlock.values)
-        ).filter(
-            PresentationSlide.id == slide_id
-        ).first()
-    
-    def get_by_presentation(self, presentation_id: UUID) -> List[PresentationSlide]:
-        return self.db.query(PresentationSlide).options(
-            joinedload(PresentationSlide.blocks).joinedload(SlideBlock.values)
-        ).filter(
-            PresentationSlide.presentation_id == presentation_id
-        ).order_by(PresentationSlide.order_index).all()
-    
-    def delete(self, slide_id: UUID) -> bool:
-        slide = self.get_by_id(slide_id)
-        if slide:
-            self.db.delete(slide)
-            self.db.commit()
-            return True
-        return False
+
+    async def get_by_id(self, slide_id: UUID) -> Optional[PresentationSlide]:
+        """Get the slide row only (blocks are not loaded)"""
+        result = await self.db.execute(
+            select(PresentationSlide).execution_options(populate_existing=True).where(PresentationSlide.id == slide_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_with_blocks(self, slide_id: UUID) -> Optional[PresentationSlide]:
+        """Get the slide with blocks and values"""
+        result = await self.db.execute(
+            select(PresentationSlide).execution_options(populate_existing=True).options(
+                selectinload(PresentationSlide.blocks).selectinload(SlideBlock.values)
+            ).where(PresentationSlide.id == slide_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_by_presentation(self, presentation_id: UUID) -> List[PresentationSlide]:
+        result = await self.db.execute(
+            select(PresentationSlide).execution_options(populate_existing=True).options(
+                selectinload(PresentationSlide.blocks).selectinload(SlideBlock.values)
+            ).where(
+                PresentationSlide.presentation_id == presentation_id
+            ).order_by(PresentationSlide.sort_key)
+        )
+        return _number_slides(list(result.scalars().all()))
+
+    async def get_ids_by_presentation(self, presentation_id: UUID) -> List[UUID]:
+        """Get slide ids in slide order"""
+        result = await self.db.execute(
+            select(PresentationSlide.id).where(
+                PresentationSlide.presentation_id == presentation_id
+            ).order_by(PresentationSlide.sort_key)
+        )
+        return list(result.scalars().all())
+
+    async def get_sort_keys(self, presentation_id: UUID) -> List[Tuple[UUID, str]]:
+        """Get (slide id, sort key) pairs in slide order"""
+        result = await self.db.execute(
+            select(PresentationSlide.id, PresentationSlide.sort_key).where(
+                PresentationSlide.presentation_id == presentation_id
+            ).order_by(PresentationSlide.sort_key)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_last_sort_key(self, presentation_id: UUID) -> Tuple[int, Optional[str]]:
+        """Get the slide count and the sort key of the last slide (None if there are no slides)"""
+        result = await self.db.execute(
+            select(func.count(PresentationSlide.id), func.max(PresentationSlide.sort_key)).where(
+                PresentationSlide.presentation_id == presentation_id
+            )
+        )
+        count, last_key = result.one()
+        return count, last_key
+
+    async def count_by_presentation(self, presentation_id: UUID) -> int:
+        result = await self.db.execute(
+            select(func.count(PresentationSlide.id)).where(PresentationSlide.presentation_id == presentation_id)
+        )
+        return result.scalar_one()
+
+    async def update_sort_key(self, slide_id: UUID, sort_key: str) -> bool:
+        """Move a slide by rewriting its sort key (a single-row UPDATE)"""
+        result = await self.db.execute(
+            update(PresentationSlide).where(PresentationSlide.id == slide_id).values(sort_key=sort_key)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def get_origins(self, presentation_id: UUID) -> List[Tuple]:
+        """Get (id, sort_key, base_slide_id, layout_slide_id, layout_index) rows in slide order"""
+        result = await self.db.execute(
+            select(
+                PresentationSlide.id,
+                PresentationSlide.sort_key,
+                PresentationSlide.base_slide_id,
+                PresentationSlide.layout_slide_id,
+                PresentationSlide.layout_index
+            ).where(
+                PresentationSlide.presentation_id == presentation_id
+            ).order_by(PresentationSlide.sort_key)
+        )
+        return list(result.all())
+
+    async def save_origins(self, slides: List[PresentationSlide]) -> None:
+        """Store the origin columns set on loaded slides (flushed as one UPDATE per slide)"""
+        await self.db.commit()
+
+    async def delete(self, slide_id: UUID) -> bool:
+        result = await self.db.execute(delete(PresentationSlide).where(PresentationSlide.id == slide_id))
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def replace_by_presentation(self, presentation_id: UUID, slides: List[PresentationSlide]) -> None:
+        """Delete all slides of a presentation and insert the given trees, in one transaction"""
+        await self.db.execute(
+            delete(PresentationSlide).where(
+                PresentationSlide.presentation_id == presentation_id
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.add_all(slides)
+        await self.db.commit()
 
 
 class BlockRepository(IBlockRepository):
     """PostgreSQL implementation of block repository"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         self.db = db
-    
-    def create(self, block: SlideBlock) -> SlideBlock:
+
+    async def create(self, block: SlideBlock) -> SlideBlock:
         self.db.add(block)
-        self.db.commit()
-        self.db.refresh(block)
+        await self.db.commit()
+        # A new block has no values: mark the collection loaded instead of re-reading it
+        set_committed_value(block, "values", [])
         return block
-    
-    def get_by_id(self, block_id: UUID) -> Optional[SlideBlock]:
-        return self.db.query(SlideBlock).options(
-            joinedload(SlideBlock.values)
-        ).filter(SlideBlock.id == block_id).first()
-    
-    def get_by_slide(self, slide_id: UUID) -> List[SlideBlock]:
-        return self.db.query(SlideBlock).filter(
-            SlideBlock.slide_id == slide_id
-        ).order_by(SlideBlock.position_index).all()
-    
-    def update(self, block: SlideBlock) -> SlideBlock:
-        self.db.commit()
-        self.db.refresh(block)
+
+    async def get_by_id(self, block_id: UUID) -> Optional[SlideBlock]:
+        result = await self.db.execute(
+            select(SlideBlock).execution_options(populate_existing=True).options(
+                selectinload(SlideBlock.values)
+            ).where(SlideBlock.id == block_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_by_slide(self, slide_id: UUID) -> List[SlideBlock]:
+        result = await self.db.execute(
+            select(SlideBlock).execution_options(populate_existing=True).options(
+                selectinload(SlideBlock.values)
+            ).where(
+                SlideBlock.slide_id == slide_id
+            ).order_by(SlideBlock.position_index)
+        )
+        return list(result.scalars().all())
+
+    async def count_by_slide(self, slide_id: UUID) -> int:
+        result = await self.db.execute(
+            select(func.count(SlideBlock.id)).where(SlideBlock.slide_id == slide_id)
+        )
+        return result.scalar_one()
+
+    async def update(self, block: SlideBlock) -> SlideBlock:
+        await self.db.commit()
         return block
-    
-    def delete(self, block_id: UUID) -> bool:
-        block = self.get_by_id(block_id)
-        if block:
-            self.db.delete(block)
-            self.db.commit()
-            return True
-        return False
+
+    async def delete(self, block_id: UUID) -> bool:
+        result = await self.db.execute(delete(SlideBlock).where(SlideBlock.id == block_id))
+        await self.db.commit()
+        return result.rowcount > 0
 
 
 class BlockValueRepository(IBlockValueRepository):
     """PostgreSQL implementation of block value repository"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         self.db = db
-    
-    def create(self, value: SlideBlockValue) -> SlideBlockValue:
+
+    async def create(self, value: SlideBlockValue) -> SlideBlockValue:
         self.db.add(value)
-        self.db.commit()
-        self.db.refresh(value)
+        await self.db.commit()
         return value
-    
-    def get_by_block(self, block_id: UUID) -> List[SlideBlockValue]:
-        return self.db.query(SlideBlockValue).filter(
-            SlideBlockValue.slide_block_id == block_id
-        ).all()
-    
-    def upsert(self, block_id: UUID, field_key: str, value: dict) -> SlideBlockValue:
-        # Try to find existing value
-        existing = self.db.query(SlideBlockValue).filter(
-            SlideBlockValue.slide_block_id == block_id,
-            SlideBlockValue.field_key == field_key
-        ).first()
-        
-        if existing:
-            existing.value = value
-            existing.updated_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        else:
-            new_value = SlideBlockValue(
-                slide_block_id=block_id,
-                field_key=field_key,
-                value=value
+
+    async def get_by_block(self, block_id: UUID) -> List[SlideBlockValue]:
+        result = await self.db.execute(
+            select(SlideBlockValue).where(SlideBlockValue.slide_block_id == block_id)
+        )
+        return list(result.scalars().all())
+
+    async def upsert(self, block_id: UUID, field_key: str, value: dict) -> SlideBlockValue:
+        values = await self.upsert_many(block_id, {field_key: value})
+        return values[0]
+
+    async def upsert_many(self, block_id: UUID, values: Dict[str, dict]) -> List[SlideBlockValue]:
+        """
+        Insert or update values of a block in a single statement
+
+        Uses INSERT ... ON CONFLICT (slide_block_id, field_key) DO UPDATE, so
+        any number of fields costs one round-trip and one commit.
+
+        Args:
+            block_id: UUID of the slide block
+            values: field_key -> value
+
+        Returns:
+            Inserted and updated rows
+        """
+        if not values:
+            return []
+        now = datetime.utcnow()
+        stmt = insert(SlideBlockValue).values([
+            {"id": uuid4(), "slide_block_id": block_id, "field_key": field_key, "value": value, "updated_at": now}
+            for field_key, value in values.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_block_value_field",
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+        ).returning(SlideBlockValue)
+        # populate_existing: values already in the session get the new state
+        result = await self.db.scalars(stmt, execution_options={"populate_existing": True})
+        rows = list(result.all())
+        await self.db.commit()
+        return rows
+
+    async def delete_by_block(self, block_id: UUID) -> bool:
+        result = await self.db.execute(
+            delete(SlideBlockValue).where(SlideBlockValue.slide_block_id == block_id)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
+
+
+class GenerationJobRepository(IGenerationJobRepository):
+    """PostgreSQL job queue for deck generation"""
+
+    ACTIVE_STATUSES = ("Queued", "Running")
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, job: GenerationJob) -> GenerationJob:
+        self.db.add(job)
+        await self.db.commit()
+        return job
+
+    async def get_by_id(self, job_id: UUID) -> Optional[GenerationJob]:
+        result = await self.db.execute(select(GenerationJob).where(GenerationJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def get_active_by_presentation(self, presentation_id: UUID) -> Optional[GenerationJob]:
+        result = await self.db.execute(
+            select(GenerationJob).where(
+                GenerationJob.presentation_id == presentation_id,
+                GenerationJob.status.in_(self.ACTIVE_STATUSES)
+            ).order_by(GenerationJob.created_at.desc()).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_next(self, worker_id: str, max_running_per_tenant: int, stale_before: datetime) -> Optional[GenerationJob]:
+        """
+        Claim the oldest runnable job
+
+        A job is runnable if it is queued, or running with a heartbeat older than
+        stale_before (its worker died). Tenants that already have
+        max_running_per_tenant live jobs are skipped. Rows are locked with
+        FOR UPDATE SKIP LOCKED, so concurrent workers never claim the same job;
+        two workers claiming jobs of one tenant at the same moment may exceed
+        the tenant limit by one.
+        """
+        running = aliased(GenerationJob)
+        tenant_running = select(func.count(running.id)).where(
+            running.tenant_id == GenerationJob.tenant_id,
+            running.status == "Running",
+            running.heartbeat_at >= stale_before
+        ).correlate(GenerationJob).scalar_subquery()
+
+        result = await self.db.execute(
+            select(GenerationJob).where(
+                or_(
+                    GenerationJob.status == "Queued",
+                    and_(GenerationJob.status == "Running", GenerationJob.heartbeat_at < stale_before)
+                ),
+                tenant_running < max_running_per_tenant
+            ).order_by(GenerationJob.created_at).limit(1).with_for_update(skip_locked=True, of=GenerationJob)
+        )
+        job = result.scalar_one_or_none()
+
+        if not job:
+            await self.db.rollback()
+            return None
+
+        now = datetime.utcnow()
+        job.status = "Running"
+        job.worker_id = worker_id
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        await self.db.commit()
+        return job
+
+    async def update_progress(self, job_id: UUID, current: int, total: int) -> None:
+        await self.db.execute(
+            update(GenerationJob).where(GenerationJob.id == job_id).values(
+                progress_current=current, progress_total=total, heartbeat_at=datetime.utcnow()
+            )
+        )
+        await self.db.commit()
+
+    async def heartbeat(self, job_id: UUID) -> bool:
+        result = await self.db.execute(
+            update(GenerationJob).where(GenerationJob.id == job_id).values(
+                heartbeat_at=datetime.utcnow()
+            ).returning(GenerationJob.cancel_requested)
+        )
+        cancel_requested = result.scalar_one_or_none()
+        await self.db.commit()
+        return bool(cancel_requested)
+
+    async def finish(self, job_id: UUID, status: str, error: Optional[str] = None) -> None:
+        await self.db.execute(
+            update(GenerationJob).where(GenerationJob.id == job_id).values(
+                status=status, error=error, finished_at=datetime.utcnow()
             )
-            return self.create(new_value)
-    
-    def delete_by_block(self, block_id: UUID) -> bool:
-        deleted = self.db.query(SlideBlockValue).filter(
-            SlideBlockValue.slide_block_id == block_id
-        ).delete()
-        self.db.commit()
-        return deleted > 0
+        )
+        await self.db.commit()
+
+    async def request_cancel(self, job_id: UUID) -> Optional[GenerationJob]:
+        result = await self.db.execute(
+            select(GenerationJob).where(GenerationJob.id == job_id).with_for_update()
+        )
+        job = result.scalar_one_or_none()
+        if not job:
+            await self.db.rollback()
+            return None
+        if job.status == "Queued":
+            # Not picked up yet: cancel right away
+            job.status = "Cancelled"
+            job.finished_at = datetime.utcnow()
+        elif job.status == "Running":
+            job.cancel_requested = True
+        await self.db.commit()
+        return job
+
+
+class VersionConflict(Exception):
+    """Raised when a version cannot be created because of a concurrent change"""
+    pass
+
+
+class PresentationVersionRepository(IPresentationVersionRepository):
+    """PostgreSQL implementation of presentation version repository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, version: PresentationVersion) -> PresentationVersion:
+        """
+        Create a version
+
+        Raises:
+            VersionConflict: If the number is taken (uq_presentation_version_number)
+                or the presentation is gone
+        """
+        self.db.add(version)
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            raise VersionConflict(
+                f"Version {version.number} of presentation {version.presentation_id} could not be created"
+            ) from e
+        return version
+
+    async def get_by_number(self, presentation_id: UUID, number: int) -> Optional[PresentationVersion]:
+        result = await self.db.execute(
+            select(PresentationVersion).where(
+                PresentationVersion.presentation_id == presentation_id,
+                PresentationVersion.number == number
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def list_by_presentation(self, presentation_id: UUID) -> List[Tuple]:
+        """
+        List version summaries of a presentation, newest first
+
+        Manifests are not loaded: the part count is computed in the database.
+
+        Returns:
+            Rows of (id, presentation_id, number, label, size, part_count, created_at)
+        """
+        result = await self.db.execute(
+            select(
+                PresentationVersion.id,
+                PresentationVersion.presentation_id,
+                PresentationVersion.number,
+                PresentationVersion.label,
+                PresentationVersion.size,
+                func.jsonb_array_length(PresentationVersion.parts).label("part_count"),
+                PresentationVersion.created_at
+            ).where(
+                PresentationVersion.presentation_id == presentation_id
+            ).order_by(PresentationVersion.number.desc())
+        )
+        return list(result.all())
+
+    async def get_last_number(self, presentation_id: UUID) -> int:
+        result = await self.db.execute(
+            select(func.coalesce(func.max(PresentationVersion.number), 0)).where(
+                PresentationVersion.presentation_id == presentation_id
+            )
+        )
+        return result.scalar_one()
+
+    async def get_part_hashes(self, presentation_id: UUID) -> Set[str]:
+        """Hashes of all parts referenced by versions of a presentation (unnested in the database)"""
+        part = func.jsonb_array_elements(PresentationVersion.parts, type_=JSONB)
+        result = await self.db.execute(
+            select(part["sha256"].astext).distinct().where(
+                PresentationVersion.presentation_id == presentation_id
+            )
+        )
+        return set(result.scalars().all())
+
+    async def delete_oldest(self, presentation_id: UUID, keep: int) -> Set[str]:
+        """Delete all but the newest keep versions and return hashes of parts they referenced"""
+        stale = select(PresentationVersion.id).where(
+            PresentationVersion.presentation_id == presentation_id
+        ).order_by(PresentationVersion.number.desc()).offset(keep)
+        result = await self.db.execute(
+            delete(PresentationVersion).where(
+                PresentationVersion.id.in_(stale)
+            ).returning(PresentationVersion.parts).execution_options(synchronize_session=False)
+        )
+        return {part["sha256"] for parts in result.scalars().all() for part in parts}
+
+    async def lock_presentation(self, presentation_id: UUID) -> None:
+        """
+        Take a transaction-level advisory lock on a presentation
+
+        Snapshots and pruning both hold it from reading part hashes until
+        their commit, so a prune never deletes a part a new version relies on.
+        """
+        # Advisory lock keys are bigint: the top 63 bits of the id
+        await self.db.execute(select(func.pg_advisory_xact_lock(presentation_id.int >> 65)))
+
+    async def commit(self) -> None:
+        await self.db.commit()
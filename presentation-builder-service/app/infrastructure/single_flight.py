@@ -0,0 +1,47 @@
+"""Collapsing of concurrent identical calls"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time
+
+    Callers asking for a key that is already in flight wait for the running
+    call and get its result (or exception) instead of starting their own.
+    The call runs as a task of its own: a caller that is cancelled (client
+    disconnected) does not cancel it for the others, and its result still
+    ends up wherever the call stores it. Keys are forgotten once the call
+    completes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func() unless a call with the same key is in flight, and return its result
+
+        Args:
+            key: Identity of the call
+            func: Coroutine function started if the key is not in flight
+
+        Returns:
+            Result of the (shared) call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved: all waiters may have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
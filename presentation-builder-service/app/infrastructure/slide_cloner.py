@@ -0,0 +1,264 @@
+"""XML-level slide content cloning"""
+import copy
+import hashlib
+import logging
+import re
+from typing import Dict, Optional, Tuple
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part, PartFactory, XmlPart
+from pptx.oxml.ns import qn
+
+logger = logging.getLogger(__name__)
+
+R_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# spTree children that describe the tree itself rather than a shape
+SHAPE_TREE_PROPERTIES = {qn("p:nvGrpSpPr"), qn("p:grpSpPr"), qn("p:extLst")}
+
+# Binary parts that may be shared between owners; anything else (e.g. chart
+# workbooks) is copied so that editing one owner never changes another
+SHAREABLE_CONTENT_TYPE_PREFIXES = ("image/", "video/", "audio/")
+
+# Relationships to presentation structure: never copied, only re-linked within the same package
+STRUCTURAL_RELTYPES = {
+    RT.SLIDE,
+    RT.SLIDE_LAYOUT,
+    RT.SLIDE_MASTER,
+    RT.NOTES_SLIDE,
+    RT.NOTES_MASTER,
+    RT.HANDOUT_MASTER,
+    RT.THEME,
+}
+
+
+class _CloneContext:
+    """Per-operation state: copied parts and the target's binary parts by content hash"""
+
+    def __init__(self, target_package):
+        self.target_package = target_package
+        self.copied_parts: Dict[int, Part] = {}
+        self._blob_index: Optional[Dict[Tuple[str, str], Part]] = None
+
+    @property
+    def blob_index(self) -> Dict[Tuple[str, str], Part]:
+        if self._blob_index is None:
+            self._blob_index = {}
+            for part in self.target_package.iter_parts():
+                if SlideCloner._is_shareable(part):
+                    key = (part.content_type, hashlib.sha1(part.blob).hexdigest())
+                    self._blob_index.setdefault(key, part)
+        return self._blob_index
+
+
+class SlideCloner:
+    """
+    Deep-copies slide content on the spTree XML
+
+    Every shape element (groups, charts, connectors, media, SmartArt and
+    anything else PowerPoint stores in the shape tree) is copied verbatim.
+    Relationships referenced from the copied XML are carried over: binary
+    parts such as images and media are de-duplicated by SHA1 in the target
+    package, XML parts such as charts are copied with their own
+    relationships (and embedded workbooks), and r:id references are rewritten to the new rIds.
+    """
+
+    @staticmethod
+    def copy_shapes(source_slide, target_slide, keep_placeholders: bool = False) -> int:
+        """
+        Copy all shapes from one slide to another
+
+        Args:
+            source_slide: Slide to copy from (may belong to another presentation)
+            target_slide: Slide to append shapes to
+            keep_placeholders: Keep placeholder shapes as placeholders (only valid when
+                both slides use the same layout); otherwise they become plain shapes
+                with their inherited position
+
+        Returns:
+            Number of copied shape elements
+        """
+        ctx = _CloneContext(target_slide.part.package)
+        source_tree = source_slide.shapes._spTree
+        target_tree = target_slide.shapes._spTree
+
+        placeholders = {} if keep_placeholders else {
+            shape._element: shape for shape in source_slide.placeholders
+        }
+
+        # Insert before the tree's own extLst, if any
+        ext_lst = target_tree.find(qn("p:extLst"))
+
+        copied = []
+        for element in source_tree:
+            if element.tag in SHAPE_TREE_PROPERTIES or not isinstance(element.tag, str):
+                continue
+            new_element = copy.deepcopy(element)
+            if element in placeholders:
+                SlideCloner._materialize_placeholder(new_element, placeholders[element])
+            SlideCloner._copy_relationships(new_element, source_slide.part, target_slide.part, ctx)
+            if ext_lst is not None:
+                ext_lst.addprevious(new_element)
+            else:
+                target_tree.append(new_element)
+            copied.append(new_element)
+
+        SlideCloner._renumber_shape_ids(target_tree, copied)
+        return len(copied)
+
+    @staticmethod
+    def copy_background(source_slide, target_slide):
+        """
+        Copy the slide background (p:bg) if the source slide defines one
+
+        Args:
+            source_slide: Slide to copy from
+            target_slide: Slide to copy to
+        """
+        source_bg = source_slide._element.cSld.find(qn("p:bg"))
+        if source_bg is None:
+            return
+        ctx = _CloneContext(target_slide.part.package)
+        target_cSld = target_slide._element.cSld
+        existing_bg = target_cSld.find(qn("p:bg"))
+        if existing_bg is not None:
+            target_cSld.remove(existing_bg)
+        new_bg = copy.deepcopy(source_bg)
+        SlideCloner._copy_relationships(new_bg, source_slide.part, target_slide.part, ctx)
+        target_cSld.insert(0, new_bg)
+
+    @staticmethod
+    def clear_shapes(slide):
+        """Remove all shape elements from a slide"""
+        tree = slide.shapes._spTree
+        for element in list(tree):
+            if element.tag not in SHAPE_TREE_PROPERTIES:
+                tree.remove(element)
+
+    @staticmethod
+    def _materialize_placeholder(element, shape):
+        """Turn a copied placeholder into a regular shape at its inherited position"""
+        ph = element.find(".//" + qn("p:ph"))
+        if ph is None:
+            return
+        try:
+            left, top, width, height = shape.left, shape.top, shape.width, shape.height
+            if None not in (left, top, width, height):
+                element.x, element.y, element.cx, element.cy = left, top, width, height
+        except Exception as e:
+            logger.debug(f"Could not materialize placeholder position: {e}")
+        ph.getparent().remove(ph)
+
+        # Geometry was inherited from the layout as well: make it an explicit rectangle
+        spPr = element.find(qn("p:spPr"))
+        if element.tag == qn("p:sp") and spPr is not None:
+            if spPr.find(qn("a:prstGeom")) is None and spPr.find(qn("a:custGeom")) is None:
+                spPr._add_prstGeom().set("prst", "rect")
+
+    @staticmethod
+    def _copy_relationships(element, source_part, target_part, ctx: _CloneContext):
+        """Carry over every relationship referenced by r:* attributes in element"""
+        same_package = source_part.package is target_part.package
+        rid_map: Dict[str, Optional[str]] = {}
+
+        for node in element.iter():
+            if not isinstance(node.tag, str):
+                continue
+            for attr_name, rId in list(node.attrib.items()):
+                if not attr_name.startswith("{%s}" % R_NAMESPACE):
+                    continue
+                if rId not in rid_map:
+                    rid_map[rId] = SlideCloner._copy_relationship(rId, source_part, target_part, ctx, same_package)
+                new_rId = rid_map[rId]
+                if new_rId is None:
+                    del node.attrib[attr_name]
+                else:
+                    node.set(attr_name, new_rId)
+
+    @staticmethod
+    def _copy_relationship(rId, source_part, target_part, ctx: _CloneContext, same_package: bool) -> Optional[str]:
+        if rId not in source_part.rels:
+            logger.warning(f"Dangling relationship {rId} in {source_part.partname}, dropped")
+            return None
+
+        rel = source_part.rels[rId]
+        if rel.is_external:
+            return target_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+
+        if rel.reltype in STRUCTURAL_RELTYPES:
+            if same_package:
+                return target_part.relate_to(rel.target_part, rel.reltype)
+            logger.info(f"Dropped {rel.reltype.rsplit('/', 1)[-1]} link while copying across presentations")
+            return None
+
+        new_part = SlideCloner._copy_part(rel.target_part, ctx, same_package)
+        return target_part.relate_to(new_part, rel.reltype)
+
+    @staticmethod
+    def _copy_part(source_part, ctx: _CloneContext, same_package: bool) -> Part:
+        """Copy a part (and its relationships) into the target package"""
+        copied = ctx.copied_parts.get(id(source_part))
+        if copied is not None:
+            return copied
+
+        if SlideCloner._is_shareable(source_part):
+            # Images and media are shared by content hash
+            if same_package:
+                return source_part
+            key = (source_part.content_type, hashlib.sha1(source_part.blob).hexdigest())
+            existing = ctx.blob_index.get(key)
+            if existing is not None:
+                ctx.copied_parts[id(source_part)] = existing
+                return existing
+
+        partname = ctx.target_package.next_partname(SlideCloner._partname_template(source_part.partname))
+        new_part = PartFactory(partname, source_part.content_type, ctx.target_package, source_part.blob)
+        ctx.copied_parts[id(source_part)] = new_part
+
+        if isinstance(new_part, XmlPart):
+            SlideCloner._copy_relationships(new_part._element, source_part, new_part, ctx)
+        else:
+            for rel in source_part.rels.values():
+                if rel.is_external:
+                    new_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        if SlideCloner._is_shareable(new_part):
+            ctx.blob_index[(source_part.content_type, hashlib.sha1(source_part.blob).hexdigest())] = new_part
+        return new_part
+
+    @staticmethod
+    def _is_shareable(part) -> bool:
+        return not isinstance(part, XmlPart) and part.content_type.startswith(SHAREABLE_CONTENT_TYPE_PREFIXES)
+
+    @staticmethod
+    def _partname_template(partname: str) -> str:
+        """'/ppt/charts/chart3.xml' -> '/ppt/charts/chart%d.xml'"""
+        return re.sub(r"\d*(\.[^./]+)$", r"%d\1", str(partname))
+
+    @staticmethod
+    def _renumber_shape_ids(tree, copied_elements):
+        """Give copied shapes unique ids and keep connector references consistent"""
+        copied_nodes = set()
+        for element in copied_elements:
+            copied_nodes.update(element.iter())
+
+        max_id = 0
+        for cNvPr in tree.iter(qn("p:cNvPr")):
+            if cNvPr in copied_nodes:
+                continue
+            try:
+                max_id = max(max_id, int(cNvPr.get("id", 0)))
+            except ValueError:
+                pass
+
+        id_map = {}
+        for element in copied_elements:
+            for cNvPr in element.iter(qn("p:cNvPr")):
+                max_id += 1
+                id_map[cNvPr.get("id")] = str(max_id)
+                cNvPr.set("id", str(max_id))
+
+        for element in copied_elements:
+            for tag in (qn("a:stCxn"), qn("a:endCxn")):
+                for cxn in element.iter(tag):
+                    if cxn.get("id") in id_map:
+                        cxn.set("id", id_map[cxn.get("id")])
@@ -1,9 +1,16 @@
 """MinIO storage service for PPTX files"""
+import asyncio
 import io
 import logging
-from typing import BinaryIO, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, Iterator, Optional
 from uuid import UUID
+import urllib3
 from minio import Minio
+from minio.commonconfig import CopySource
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 
 from app.config.settings import settings
@@ -14,13 +21,19 @@ logger = logging.getLogger(__name__)
 class MinIOStorageService:
     """Service for managing PPTX files in MinIO"""
     
-    def __init__(self):
-        """Initialize MinIO client"""
+    def __init__(self, http_client: Optional[urllib3.PoolManager] = None):
+        """
+        Initialize MinIO client
+        
+        Args:
+            http_client: Connection pool to use (minio creates one with 10 connections if not given)
+        """
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_USE_SSL
+            secure=settings.MINIO_USE_SSL,
+            http_client=http_client
         )
         self.bucket_name = settings.MINIO_BUCKET_NAME
         self._ensure_bucket_exists()
@@ -41,6 +54,9 @@ class MinIOStorageService:
         """
         Upload a file to MinIO
         
+        Files larger than STORAGE_MULTIPART_PART_SIZE are uploaded as
+        multipart, with up to STORAGE_MULTIPART_CONCURRENCY parts in flight.
+        
         Args:
             file_data: File data as BinaryIO
             object_name: Name of the object in MinIO
@@ -60,7 +76,9 @@ class MinIOStorageService:
                 object_name,
                 file_data,
                 file_size,
-                content_type=content_type
+                content_type=content_type,
+                part_size=settings.STORAGE_MULTIPART_PART_SIZE,
+                num_parallel_uploads=settings.STORAGE_MULTIPART_CONCURRENCY
             )
             
             logger.info(f"Uploaded file to bucket {self.bucket_name}: {object_name}")
@@ -109,6 +127,54 @@ class MinIOStorageService:
             logger.error(f"Error deleting file: {e}")
             return False
     
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        Delete all files under a prefix
+        
+        Args:
+            prefix: Object name prefix, e.g. "exports/<presentation id>/"
+            
+        Returns:
+            Number of deleted files
+        """
+        try:
+            objects = [
+                DeleteObject(obj.object_name)
+                for obj in self.client.list_objects(self.bucket_name, prefix=prefix, recursive=True)
+            ]
+            # remove_objects is lazy: errors are reported while iterating
+            errors = list(self.client.remove_objects(self.bucket_name, objects))
+            for error in errors:
+                logger.error(f"Error deleting file {error.name}: {error.message}")
+            logger.info(f"Deleted {len(objects) - len(errors)} files under {prefix}")
+            return len(objects) - len(errors)
+        except S3Error as e:
+            logger.error(f"Error deleting files under {prefix}: {e}")
+            return 0
+    
+    def delete_files(self, object_names: Iterable[str]) -> int:
+        """
+        Delete several files in batched requests
+        
+        Args:
+            object_names: Names of the objects in MinIO
+            
+        Returns:
+            Number of deleted files
+        """
+        objects = [DeleteObject(object_name) for object_name in object_names]
+        if not objects:
+            return 0
+        try:
+            errors = list(self.client.remove_objects(self.bucket_name, objects))
+            for error in errors:
+                logger.error(f"Error deleting file {error.name}: {error.message}")
+            logger.info(f"Deleted {len(objects) - len(errors)} files")
+            return len(objects) - len(errors)
+        except S3Error as e:
+            logger.error(f"Error deleting files: {e}")
+            return 0
+    
     def file_exists(self, object_name: str) -> bool:
         """
         Check if a file exists in MinIO
@@ -125,6 +191,137 @@ class MinIOStorageService:
         except S3Error:
             return False
     
+    def get_file_etag(self, object_name: str) -> str:
+        """
+        Get the ETag of a file without downloading it
+        
+        Args:
+            object_name: Name of the object in MinIO
+            
+        Returns:
+            ETag string
+        """
+        try:
+            return self.client.stat_object(self.bucket_name, object_name).etag
+        except S3Error as e:
+            logger.error(f"Error getting file metadata: {e}")
+            raise
+    
+    def copy_file(self, source_object_name: str, object_name: str, match_etag: Optional[str] = None) -> str:
+        """
+        Copy a file server-side within the bucket
+        
+        Args:
+            source_object_name: Name of the source object
+            object_name: Name of the destination object
+            match_etag: Only copy if the source still has this ETag
+            
+        Returns:
+            Name of the destination object
+        """
+        try:
+            self.client.copy_object(
+                self.bucket_name,
+                object_name,
+                CopySource(self.bucket_name, source_object_name, match_etag=match_etag)
+            )
+            logger.info(f"Copied file {source_object_name} -> {object_name}")
+            return object_name
+        except S3Error as e:
+            logger.error(f"Error copying file: {e}")
+            raise
+    
+    def stat_file(self, object_name: str):
+        """
+        Get object metadata without downloading it
+        
+        Args:
+            object_name: Name of the object in MinIO
+            
+        Returns:
+            minio Object with size, etag and last_modified
+        """
+        try:
+            return self.client.stat_object(self.bucket_name, object_name)
+        except S3Error as e:
+            logger.error(f"Error getting file metadata: {e}")
+            raise
+    
+    def open_file_stream(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+        match_etag: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Open a file for streaming
+        
+        The request to MinIO is made here, so missing objects fail before the
+        first chunk is consumed; the connection is released when the returned
+        iterator is exhausted or closed.
+        
+        Args:
+            object_name: Name of the object in MinIO
+            offset: First byte to read
+            length: Number of bytes to read (0 = to the end)
+            match_etag: Fail with 412 if the object no longer has this ETag
+            
+        Returns:
+            Iterator over file chunks
+        """
+        request_headers = {"If-Match": f'"{match_etag}"'} if match_etag else None
+        try:
+            response = self.client.get_object(
+                self.bucket_name, object_name, offset=offset, length=length, request_headers=request_headers
+            )
+        except S3Error as e:
+            logger.error(f"Error opening file stream: {e}")
+            raise
+        return self._iter_response(response)
+    
+    @staticmethod
+    def _iter_response(response) -> Iterator[bytes]:
+        try:
+            yield from response.stream(settings.DOWNLOAD_CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+    
+    def get_presigned_download_url(
+        self,
+        object_name: str,
+        expires: timedelta,
+        response_headers: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Get a presigned GET URL for direct download from MinIO
+        
+        URLs are signed for MINIO_PUBLIC_ENDPOINT when it is set, since the
+        internal endpoint is usually not reachable from browsers.
+        
+        Args:
+            object_name: Name of the object in MinIO
+            expires: URL lifetime
+            response_headers: Response header overrides (e.g. response-content-disposition)
+            
+        Returns:
+            Presigned URL
+        """
+        client = self.client
+        if settings.MINIO_PUBLIC_ENDPOINT:
+            # Region is fixed, so signing needs no request to the public endpoint
+            client = Minio(
+                settings.MINIO_PUBLIC_ENDPOINT,
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=settings.MINIO_PUBLIC_USE_SSL,
+                region=settings.MINIO_REGION
+            )
+        return client.presigned_get_object(
+            self.bucket_name, object_name, expires=expires, response_headers=response_headers
+        )
+    
     def get_file_url(self, object_name: str) -> str:
         """
         Get the URL for accessing a file
@@ -136,3 +333,113 @@ class MinIOStorageService:
             URL string
         """
         return f"{self.bucket_name}/{object_name}"
+
+
+class AsyncMinIOStorageService:
+    """
+    Async facade over MinIOStorageService
+    
+    The minio client is blocking, so every call runs in a dedicated, bounded
+    thread pool: slow transfers of large decks neither block the event loop
+    nor exhaust the default executor that python-pptx work runs in. The
+    connection pool is sized for the pool plus parallel multipart parts.
+    Methods mirror MinIOStorageService.
+    """
+    
+    def __init__(self, max_workers: int = 8):
+        """
+        Initialize storage and its thread pool (creates the bucket if needed, blocking)
+        
+        Args:
+            max_workers: Storage calls running at the same time
+        """
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=10, read=300),
+            maxsize=max_workers + settings.STORAGE_MULTIPART_CONCURRENCY,
+            retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
+        self.storage = MinIOStorageService(http_client)
+        self.bucket_name = self.storage.bucket_name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="minio")
+    
+    async def _run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+    
+    async def upload_file(self, file_data: BinaryIO, object_name: str, content_type: str = "application/vnd.openxmlformats-officedocument.presentationml.presentation") -> str:
+        """Upload a file (multipart for large files), see MinIOStorageService.upload_file"""
+        return await self._run(self.storage.upload_file, file_data, object_name, content_type)
+    
+    async def download_file(self, object_name: str) -> bytes:
+        """Download a file, see MinIOStorageService.download_file"""
+        return await self._run(self.storage.download_file, object_name)
+    
+    async def delete_file(self, object_name: str) -> bool:
+        """Delete a file, see MinIOStorageService.delete_file"""
+        return await self._run(self.storage.delete_file, object_name)
+    
+    async def delete_prefix(self, prefix: str) -> int:
+        """Delete all files under a prefix, see MinIOStorageService.delete_prefix"""
+        return await self._run(self.storage.delete_prefix, prefix)
+    
+    async def delete_files(self, object_names: Iterable[str]) -> int:
+        """Delete several files, see MinIOStorageService.delete_files"""
+        return await self._run(self.storage.delete_files, list(object_names))
+    
+    async def file_exists(self, object_name: str) -> bool:
+        """Check if a file exists, see MinIOStorageService.file_exists"""
+        return await self._run(self.storage.file_exists, object_name)
+    
+    async def get_file_etag(self, object_name: str) -> str:
+        """Get the ETag of a file, see MinIOStorageService.get_file_etag"""
+        return await self._run(self.storage.get_file_etag, object_name)
+    
+    async def copy_file(self, source_object_name: str, object_name: str, match_etag: Optional[str] = None) -> str:
+        """Copy a file server-side, see MinIOStorageService.copy_file"""
+        return await self._run(self.storage.copy_file, source_object_name, object_name, match_etag)
+    
+    async def stat_file(self, object_name: str):
+        """Get object metadata, see MinIOStorageService.stat_file"""
+        return await self._run(self.storage.stat_file, object_name)
+    
+    async def open_file_stream(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+        match_etag: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Open a file for streaming, see MinIOStorageService.open_file_stream
+        
+        Chunks are read in the storage pool; the connection is released when
+        the iterator is exhausted or the client disconnects.
+        """
+        chunks = await self._run(self.storage.open_file_stream, object_name, offset, length, match_etag)
+        return self._iter_chunks(chunks)
+    
+    async def _iter_chunks(self, chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await self._run(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            await self._run(chunks.close)
+    
+    async def get_presigned_download_url(
+        self,
+        object_name: str,
+        expires: timedelta,
+        response_headers: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Get a presigned GET URL, see MinIOStorageService.get_presigned_download_url"""
+        return await self._run(self.storage.get_presigned_download_url, object_name, expires, response_headers)
+    
+    def get_file_url(self, object_name: str) -> str:
+        """Get the URL for accessing a file"""
+        return self.storage.get_file_url(object_name)
+    
+    def close(self):
+        """Stop the thread pool after running calls finish"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -5,48 +5,16 @@ from uuid import UUID
 import httpx
 
 from app.config.settings import settings
+from app.infrastructure.http_client import ServiceHttpClient
 
 logger = logging.getLogger(__name__)
 
 
-class TemplateServiceClient:
+class TemplateServiceClient(ServiceHttpClient):
     """Client for communicating with Template Service"""
     
-    def __init__(self, base_url: Optional[str] = None):
-        """
-        Initialize Template Service client
-        
-        Args:
-            base_url: Base URL of template service (optional, uses service discovery if not provided)
-        """
-        self.base_url = base_url or self._discover_service()
-        self.timeout = 30.0
-    
-    def _discover_service(self) -> str:
-        """
-        Discover template service URL via Consul
-        
-        Returns:
-            Service URL
-        """
-        try:
-            import consul
-            c = consul.Consul(host=settings.CONSUL_HOST, port=settings.CONSUL_PORT)
-            _, services = c.health.service(settings.TEMPLATE_SERVICE_NAME, passing=True)
-            
-            if services:
-                service = services[0]
-                address = service['Service']['Address']
-                port = service['Service']['Port']
-                url = f"http://{address}:{port}"
-                logger.info(f"Discovered template service at: {url}")
-                return url
-            else:
-                logger.warning("Template service not found in Consul, using default")
-                return "http://template-service:8003"
-        except Exception as e:
-            logger.error(f"Error discovering template service: {e}")
-            return "http://template-service:8003"
+    SERVICE_NAME = settings.TEMPLATE_SERVICE_NAME
+    DEFAULT_URL = "http://template-service:8003"
     
     async def get_template_block(self, block_id: UUID) -> Optional[Dict[str, Any]]:
         """
@@ -59,11 +27,9 @@ class TemplateServiceClient:
             Block metadata dictionary or None
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # TemplateService uses /api/Templates with capital T
-                response = await client.get(f"{self.base_url}/api/Templates/{block_id}")
-                response.raise_for_status()
-                return response.json()
+            # TemplateService uses /api/Templates with capital T
+            response = await self._request("GET", f"/api/Templates/{block_id}")
+            return response.json()
         except httpx.HTTPError as e:
             logger.error(f"Error fetching template block {block_id}: {e}")
             return None
@@ -80,12 +46,10 @@ class TemplateServiceClient:
         """
         try:
             # Download from MinIO via template service download endpoint
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # TemplateService uses /api/Templates with capital T
-                response = await client.get(f"{self.base_url}/api/Templates/{block_id}/download")
-                response.raise_for_status()
-                logger.info(f"Successfully downloaded template block {block_id}, size: {len(response.content)} bytes")
-                return response.content
+            # TemplateService uses /api/Templates with capital T
+            response = await self._request("GET", f"/api/Templates/{block_id}/download")
+            logger.info(f"Successfully downloaded template block {block_id}, size: {len(response.content)} bytes")
+            return response.content
                 
         except httpx.HTTPError as e:
             logger.error(f"Error downloading block PPTX {block_id}: {e}")
@@ -2,10 +2,13 @@
 Text layout service for auto-sizing and positioning text fields
 """
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 from pptx import Presentation as PPTXPresentation
 from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
+from pptx.enum.text import PP_ALIGN, MSO_AUTO_SIZE
+from pptx.dml.color import RGBColor
+
+from app.infrastructure.font_metrics import get_font_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +23,55 @@ class TextLayoutService:
     FIELD_VERTICAL_SPACING = 0.3  # Отступ между полями (в дюймах)
     LINE_SPACING_MULTIPLIER = 1.0  # Одинарный межстрочный интервал
     
+    # Внутренние отступы текстового поля (значения PowerPoint по умолчанию, в дюймах)
+    TEXT_INSET_LEFT = 0.1
+    TEXT_INSET_RIGHT = 0.1
+    TEXT_INSET_TOP = 0.05
+    TEXT_INSET_BOTTOM = 0.05
+    
     # Минимальный размер шрифта при уменьшении
     MIN_FONT_SIZE = 8
     
+    # Префикс имени shape, которым помечаются сгенерированные поля
+    FIELD_SHAPE_PREFIX = "pb-field"
+    
+    # Допуск при сравнении позиций и размеров (EMU, ~0.001 дюйма)
+    GEOMETRY_TOLERANCE_EMU = 914
+    
+    @staticmethod
+    def field_shape_name(block_id, field_key: str) -> str:
+        """
+        Имя shape для поля блока (используется для инкрементального обновления)
+        
+        Args:
+            block_id: ID SlideBlock
+            field_key: Ключ поля
+            
+        Returns:
+            Имя shape
+        """
+        return f"{TextLayoutService.FIELD_SHAPE_PREFIX}:{block_id}:{field_key}"
+    
+    @staticmethod
+    def field_shape_name_for(field_data: Dict) -> Optional[str]:
+        """Имя shape для данных поля или None, если поле не привязано к блоку"""
+        if field_data.get("block_id") is None or field_data.get("field_key") is None:
+            return None
+        return TextLayoutService.field_shape_name(field_data["block_id"], field_data["field_key"])
+    
+    @staticmethod
+    def parse_field_shape_name(name: str) -> Optional[Tuple[str, str]]:
+        """
+        Разобрать имя shape поля
+        
+        Returns:
+            (block_id, field_key) или None, если shape не является полем
+        """
+        parts = (name or "").split(":", 2)
+        if len(parts) != 3 or parts[0] != TextLayoutService.FIELD_SHAPE_PREFIX:
+            return None
+        return parts[1], parts[2]
+    
     @staticmethod
     def get_slide_dimensions(prs: PPTXPresentation) -> Tuple[float, float]:
         """
@@ -48,47 +97,102 @@ class TextLayoutService:
         """
         return slide_width - TextLayoutService.MARGIN_LEFT - TextLayoutService.MARGIN_RIGHT
     
+    @staticmethod
+    def wrap_text(
+        text: str,
+        font_size: float,
+        box_width: float,
+        font_name: str = "Arial",
+        bold: bool = False,
+        italic: bool = False
+    ) -> List[str]:
+        """
+        Разбить текст на строки по словам с учетом реальной ширины глифов
+        
+        Args:
+            text: Текст (переводы строк сохраняются)
+            font_size: Размер шрифта в пунктах
+            box_width: Ширина области текста в дюймах (без внутренних отступов)
+            font_name: Название шрифта
+            bold: Полужирный
+            italic: Курсив
+            
+        Returns:
+            Список строк
+        """
+        metrics = get_font_metrics(font_name, bold, italic)
+        max_width = box_width * 72
+        space_width = metrics.text_width(" ", font_size)
+        lines = []
+        
+        for paragraph in text.split("\n"):
+            words = paragraph.split()
+            if not words:
+                lines.append("")
+                continue
+            
+            current = ""
+            current_width = 0.0
+            for word in words:
+                word_width = metrics.text_width(word, font_size)
+                
+                # Слово длиннее строки - переносим по символам
+                if word_width > max_width:
+                    if current:
+                        lines.append(current)
+                    current, current_width = "", 0.0
+                    for ch in word:
+                        ch_width = metrics.text_width(ch, font_size)
+                        if current and current_width + ch_width > max_width:
+                            lines.append(current)
+                            current, current_width = "", 0.0
+                        current += ch
+                        current_width += ch_width
+                    continue
+                
+                if not current:
+                    current, current_width = word, word_width
+                elif current_width + space_width + word_width <= max_width:
+                    current += " " + word
+                    current_width += space_width + word_width
+                else:
+                    lines.append(current)
+                    current, current_width = word, word_width
+            
+            lines.append(current)
+        
+        return lines
+    
     @staticmethod
     def estimate_text_height(
         text: str,
         font_size: float,
         box_width: float,
-        font_name: str = "Arial"
+        font_name: str = "Arial",
+        bold: bool = False,
+        italic: bool = False
     ) -> float:
         """
-        Оценить высоту текстового поля для заданного текста
+        Рассчитать высоту текстового поля для заданного текста
         
         Args:
             text: Текст для размещения
             font_size: Размер шрифта в пунктах
             box_width: Ширина текстового поля в дюймах
             font_name: Название шрифта
+            bold: Полужирный
+            italic: Курсив
             
         Returns:
-            Примерная высота в дюймах
+            Высота поля в дюймах (с учетом внутренних отступов)
         """
-        # Примерная формула для расчета высоты
-        # Используем среднюю ширину символа относительно размера шрифта
-        
-        # Средняя ширина символа (в дюймах) для данного размера шрифта
-        avg_char_width = (font_size / 72) * 0.6  # 72 points per inch, 0.6 - коэффициент
-        
-        # Количество символов, которые помещаются в строку
-        chars_per_line = int(box_width / avg_char_width)
-        
-        if chars_per_line <= 0:
-            chars_per_line = 1
-        
-        # Количество строк
-        num_lines = max(1, len(text) / chars_per_line)
+        inner_width = box_width - TextLayoutService.TEXT_INSET_LEFT - TextLayoutService.TEXT_INSET_RIGHT
+        num_lines = len(TextLayoutService.wrap_text(text, font_size, inner_width, font_name, bold, italic))
         
         # Высота одной строки (размер шрифта + межстрочный интервал)
         line_height = (font_size / 72) * TextLayoutService.LINE_SPACING_MULTIPLIER * 1.2
         
-        # Общая высота
-        total_height = num_lines * line_height
-        
-        return total_height
+        return num_lines * line_height + TextLayoutService.TEXT_INSET_TOP + TextLayoutService.TEXT_INSET_BOTTOM
     
     @staticmethod
     def create_text_field(
@@ -98,7 +202,8 @@ class TextLayoutService:
         top: float,
         width: float,
         font_metadata: Dict,
-        auto_height: bool = True
+        auto_height: bool = True,
+        name: Optional[str] = None
     ):
         """
         Создать текстовое поле с заданными параметрами
@@ -111,27 +216,17 @@ class TextLayoutService:
             width: Ширина поля в дюймах
             font_metadata: Метаданные шрифта (name, size, color, bold, italic, alignment)
             auto_height: Автоматически рассчитать высоту
+            name: Имя shape (метка поля, см. field_shape_name)
             
         Returns:
             Созданный text box shape
         """
-        # Извлекаем метаданные шрифта
-        font_name = font_metadata.get("name", "Arial") or "Arial"
-        font_size = font_metadata.get("size", 18) or 18  # Защита от None
-        font_color = font_metadata.get("color", "#000000") or "#000000"
-        bold = font_metadata.get("bold", False) or False
-        italic = font_metadata.get("italic", False) or False
-        alignment = font_metadata.get("alignment", "LEFT") or "LEFT"
-        
-        # Проверяем, что font_size это число
-        if not isinstance(font_size, (int, float)):
-            logger.warning(f"Invalid font_size: {font_size}, using default 18")
-            font_size = 18
+        font_name, font_size, bold, italic = TextLayoutService._field_font({"font_metadata": font_metadata})
         
         # Рассчитываем высоту, если нужно
         if auto_height:
             height = TextLayoutService.estimate_text_height(
-                text, font_size, width, font_name
+                text, font_size, width, font_name, bold, italic
             )
         else:
             height = 1.0  # Дюйм по умолчанию
@@ -144,15 +239,34 @@ class TextLayoutService:
             Inches(height)
         )
         
-        # Настраиваем текст
-        text_frame = textbox.text_frame
+        if name:
+            textbox.name = name
+        
+        TextLayoutService.apply_text(textbox.text_frame, text, font_metadata)
+        
+        logger.info(f"Created text field: {len(text)} chars, {height:.2f}\" height")
+        return textbox
+    
+    @staticmethod
+    def apply_text(text_frame, text: str, font_metadata: Dict):
+        """
+        Записать текст в text frame и применить форматирование
+        
+        Args:
+            text_frame: Text frame shape
+            text: Текст
+            font_metadata: Метаданные шрифта (name, size, color, bold, italic, alignment)
+        """
+        font_name, font_size, bold, italic = TextLayoutService._field_font({"font_metadata": font_metadata})
+        font_color = font_metadata.get("color", "#000000") or "#000000"
+        alignment = font_metadata.get("alignment", "LEFT") or "LEFT"
+        
         text_frame.text = text
         text_frame.word_wrap = True
+        text_frame.auto_size = MSO_AUTO_SIZE.NONE
         
-        # Настраиваем форматирование
-        if text_frame.paragraphs:
-            paragraph = text_frame.paragraphs[0]
-            
+        # Настраиваем форматирование (каждый перевод строки - отдельный абзац)
+        for paragraph in text_frame.paragraphs:
             # Выравнивание
             if alignment.upper() == "CENTER":
                 paragraph.alignment = PP_ALIGN.CENTER
@@ -162,8 +276,7 @@ class TextLayoutService:
                 paragraph.alignment = PP_ALIGN.LEFT
             
             # Форматирование шрифта
-            if paragraph.runs:
-                run = paragraph.runs[0]
+            for run in paragraph.runs:
                 run.font.name = font_name
                 run.font.size = Pt(font_size)
                 run.font.bold = bold
@@ -174,7 +287,6 @@ class TextLayoutService:
                     try:
                         # Конвертируем hex в RGB
                         rgb_int = int(font_color[1:], 16)
-                        from pptx.util import RGBColor
                         run.font.color.rgb = RGBColor(
                             (rgb_int >> 16) & 0xFF,
                             (rgb_int >> 8) & 0xFF,
@@ -182,9 +294,6 @@ class TextLayoutService:
                         )
                     except:
                         pass
-        
-        logger.info(f"Created text field: {len(text)} chars, {height:.2f}\" height")
-        return textbox
     
     @staticmethod
     def layout_fields_vertically(
@@ -224,7 +333,8 @@ class TextLayoutService:
                 top=current_top,
                 width=box_width,
                 font_metadata=font_metadata,
-                auto_height=True
+                auto_height=True,
+                name=TextLayoutService.field_shape_name_for(field_data)
             )
             
             shapes.append(shape)
@@ -238,45 +348,208 @@ class TextLayoutService:
         return shapes, total_height
     
     @staticmethod
-    def shrink_fonts_if_needed(
-        shapes: List,
-        slide_height: float,
-        total_height: float
-    ) -> bool:
+    def _field_font(field_data: Dict) -> Tuple[str, float, bool, bool]:
+        font_metadata = field_data.get("font_metadata", {})
+        font_size = font_metadata.get("size", 18) or 18  # Защита от None
+        if not isinstance(font_size, (int, float)):
+            logger.warning(f"Invalid font_size: {font_size}, using default 18")
+            font_size = 18
+        return (
+            font_metadata.get("name", "Arial") or "Arial",
+            font_size,
+            font_metadata.get("bold", False) or False,
+            font_metadata.get("italic", False) or False
+        )
+    
+    @staticmethod
+    def measure_fields_height(
+        fields_data: List[Dict],
+        box_width: float,
+        scale: float = 1.0
+    ) -> float:
         """
-        Уменьшить шрифты всех полей, если содержимое не помещается на слайде
+        Рассчитать суммарную высоту полей при заданном масштабе шрифтов
         
         Args:
-            shapes: Список text box shapes
-            slide_height: Высота слайда в дюймах
-            total_height: Общая высота содержимого в дюймах
+            fields_data: Список данных полей
+            box_width: Ширина текстовых полей в дюймах
+            scale: Коэффициент масштабирования размеров шрифтов
+            
+        Returns:
+            Высота в дюймах (поля + отступы между ними)
+        """
+        total = 0.0
+        for field_data in fields_data:
+            font_name, font_size, bold, italic = TextLayoutService._field_font(field_data)
+            total += TextLayoutService.estimate_text_height(
+                field_data.get("text", ""),
+                TextLayoutService._scaled_size(font_size, scale),
+                box_width,
+                font_name,
+                bold,
+                italic
+            )
+        total += TextLayoutService.FIELD_VERTICAL_SPACING * max(0, len(fields_data) - 1)
+        return total
+    
+    @staticmethod
+    def _scaled_size(font_size: float, scale: float) -> float:
+        if scale >= 1.0:
+            return font_size
+        # Шаг 0.5pt, не меньше минимального размера (и не больше исходного)
+        return min(font_size, max(TextLayoutService.MIN_FONT_SIZE, round(font_size * scale * 2) / 2))
+    
+    @staticmethod
+    def fit_font_sizes(
+        fields_data: List[Dict],
+        box_width: float,
+        available_height: float
+    ) -> List[Dict]:
+        """
+        Подобрать наибольшие размеры шрифтов, при которых поля помещаются на слайд
+        
+        Все шрифты масштабируются одним коэффициентом (сохраняется иерархия
+        заголовков); коэффициент ищется бинарным поиском по размеру самого
+        крупного шрифта с шагом 0.5pt.
+        
+        Args:
+            fields_data: Список данных полей
+            box_width: Ширина текстовых полей в дюймах
+            available_height: Доступная высота в дюймах
             
         Returns:
-            True если шрифты были уменьшены
+            Копия fields_data с подобранными размерами шрифтов
         """
-        # Проверяем, помещается ли содержимое
-        if total_height <= slide_height:
+        if not fields_data:
+            return fields_data
+        
+        if TextLayoutService.measure_fields_height(fields_data, box_width) <= available_height:
             logger.info("Content fits on slide, no font shrinking needed")
-            return False
+            return fields_data
+        
+        max_size = max(TextLayoutService._field_font(f)[1] for f in fields_data)
+        
+        # Бинарный поиск по шагам 0.5pt: lo всегда помещается (или минимален), hi - нет
+        lo = int(TextLayoutService.MIN_FONT_SIZE * 2)
+        hi = int(max_size * 2)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            height = TextLayoutService.measure_fields_height(fields_data, box_width, (mid / 2) / max_size)
+            if height <= available_height:
+                lo = mid
+            else:
+                hi = mid
+        
+        scale = (lo / 2) / max_size
+        logger.warning(f"Content overflow, fonts scaled by {scale:.2f} (largest font {lo / 2}pt)")
+        
+        fitted = []
+        for field_data in fields_data:
+            font_size = TextLayoutService._field_font(field_data)[1]
+            font_metadata = dict(field_data.get("font_metadata", {}))
+            font_metadata["size"] = TextLayoutService._scaled_size(font_size, scale)
+            fitted.append({**field_data, "font_metadata": font_metadata})
+        return fitted
+    
+    @staticmethod
+    def plan_layout(
+        fields_data: List[Dict],
+        slide_width: float,
+        slide_height: float
+    ) -> List[Dict]:
+        """
+        Рассчитать размещение полей без изменения слайда
+        
+        Args:
+            fields_data: Список данных полей
+            slide_width: Ширина слайда в дюймах
+            slide_height: Высота слайда в дюймах
+            
+        Returns:
+            Список {"field": данные поля с подобранным шрифтом, "left", "top", "width", "height"} в дюймах
+        """
+        box_width = TextLayoutService.calculate_text_box_width(slide_width)
+        fitted = TextLayoutService.fit_font_sizes(
+            fields_data, box_width, slide_height - TextLayoutService.MARGIN_TOP
+        )
+        
+        plan = []
+        current_top = TextLayoutService.MARGIN_TOP
+        for field_data in fitted:
+            font_name, font_size, bold, italic = TextLayoutService._field_font(field_data)
+            height = TextLayoutService.estimate_text_height(
+                field_data.get("text", ""), font_size, box_width, font_name, bold, italic
+            )
+            plan.append({
+                "field": field_data,
+                "left": TextLayoutService.MARGIN_LEFT,
+                "top": current_top,
+                "width": box_width,
+                "height": height
+            })
+            current_top += height + TextLayoutService.FIELD_VERTICAL_SPACING
+        return plan
+    
+    @staticmethod
+    def update_fields_in_place(
+        slide,
+        prs: PPTXPresentation,
+        fields_data: List[Dict],
+        changed_fields: Set[Tuple[str, str]]
+    ) -> bool:
+        """
+        Обновить ранее созданные поля на месте
+        
+        Текст переписывается только у изменившихся полей; у остальных
+        меняются позиция, высота или размер шрифта, только если они
+        действительно изменились после перерасчета layout.
+        
+        Args:
+            slide: Слайд
+            prs: Презентация (для получения размеров)
+            fields_data: Все поля слайда (с block_id и field_key)
+            changed_fields: Множество (block_id, field_key) с новым текстом
+            
+        Returns:
+            False, если набор полей на слайде не совпадает и нужна полная перерисовка
+        """
+        tagged = {}
+        for shape in slide.shapes:
+            key = TextLayoutService.parse_field_shape_name(shape.name)
+            if key:
+                tagged[key] = shape
         
-        logger.warning(f"Content overflow: {total_height:.2f}\" > {slide_height:.2f}\"")
+        expected = [(str(f.get("block_id")), str(f.get("field_key"))) for f in fields_data]
+        if len(expected) != len(tagged) or set(expected) != set(tagged):
+            logger.info("Slide fields changed shape set, full re-render required")
+            return False
         
-        # Вычисляем коэффициент уменьшения
-        shrink_factor = slide_height / total_height
+        slide_width, slide_height = TextLayoutService.get_slide_dimensions(prs)
+        plan = TextLayoutService.plan_layout(fields_data, slide_width, slide_height)
         
-        # Уменьшаем шрифты всех полей
-        for shape in shapes:
-            if hasattr(shape, 'text_frame'):
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        if run.font.size:
-                            new_size = int(run.font.size.pt * shrink_factor)
-                            # Не уменьшаем меньше минимального размера
-                            new_size = max(new_size, TextLayoutService.MIN_FONT_SIZE)
-                            run.font.size = Pt(new_size)
-                            logger.info(f"Shrunk font: {run.font.size.pt}pt -> {new_size}pt")
+        rewritten = moved = 0
+        for key, item in zip(expected, plan):
+            shape = tagged[key]
+            field_data = item["field"]
+            font_size = TextLayoutService._field_font(field_data)[1]
+            
+            current_size = None
+            runs = [r for p in shape.text_frame.paragraphs for r in p.runs]
+            if runs and runs[0].font.size is not None:
+                current_size = runs[0].font.size.pt
+            
+            if key in changed_fields or current_size != font_size:
+                TextLayoutService.apply_text(shape.text_frame, field_data.get("text", ""), field_data.get("font_metadata", {}))
+                rewritten += 1
+            
+            top, height = Inches(item["top"]), Inches(item["height"])
+            if (abs(shape.top - top) > TextLayoutService.GEOMETRY_TOLERANCE_EMU
+                    or abs(shape.height - height) > TextLayoutService.GEOMETRY_TOLERANCE_EMU):
+                shape.top = top
+                shape.height = height
+                moved += 1
         
-        logger.info(f"All fonts shrunk by factor {shrink_factor:.2f}")
+        logger.info(f"Incremental update: {rewritten} field(s) rewritten, {moved} moved/resized of {len(plan)}")
         return True
     
     @staticmethod
@@ -302,14 +575,14 @@ class TextLayoutService:
             
             logger.info(f"Adding {len(fields_data)} fields to slide ({slide_width}\" x {slide_height}\")")
             
+            # Подбираем размеры шрифтов до создания shapes, чтобы всё поместилось
+            plan = TextLayoutService.plan_layout(fields_data, slide_width, slide_height)
+            
             # Размещаем поля вертикально
-            shapes, total_height = TextLayoutService.layout_fields_vertically(
-                slide, fields_data, slide_width, slide_height
+            TextLayoutService.layout_fields_vertically(
+                slide, [item["field"] for item in plan], slide_width, slide_height
             )
             
-            # Уменьшаем шрифты, если не помещается
-            TextLayoutService.shrink_fonts_if_needed(shapes, slide_height, total_height)
-            
             logger.info("Fields added successfully with auto-layout")
             return True
             
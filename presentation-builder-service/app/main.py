@@ -1,4 +1,5 @@
 """Main application entry point"""
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -6,9 +7,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 
 from app.config.settings import settings
-from app.config.database import engine, Base
+from app.config.database import engine, Base, count_queries
 from app.api.routes import router
+from app.api.auth import TokenVerifier
 from app.application.dtos import HealthResponse
+from app.infrastructure.consul import ConsulClient, ServiceResolver
+from app.infrastructure.http_client import create_http_client
+from app.infrastructure.template_client import TemplateServiceClient
+from app.infrastructure.project_client import ProjectServiceClient
+from app.infrastructure.master_template import MasterTemplateCache
+from app.infrastructure.block_cache import BlockCache
+from app.infrastructure.office_renderer import OfficeRenderer
+from app.infrastructure.single_flight import SingleFlight
+from app.application.generation_worker import GenerationWorker
+from app.infrastructure.storage import AsyncMinIOStorageService
 
 # Configure logging
 logging.basicConfig(
@@ -26,17 +38,93 @@ async def lifespan(app: FastAPI):
     
     # Create tables (in production, use Alembic migrations)
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created/verified")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
     
+    # JWT public keys are parsed once; rotate via app.state.token_verifier.load_keys
+    app.state.token_verifier = TokenVerifier.from_settings()
+    
+    # Shared HTTP clients and cached service discovery
+    resolver = ServiceResolver(ConsulClient(), settings.SERVICE_DISCOVERY_REFRESH_INTERVAL)
+    resolver.register(TemplateServiceClient.SERVICE_NAME, TemplateServiceClient.DEFAULT_URL)
+    resolver.register(ProjectServiceClient.SERVICE_NAME, ProjectServiceClient.DEFAULT_URL)
+    await resolver.start()
+    
+    http_client = create_http_client()
+    app.state.http_client = http_client
+    app.state.template_client = TemplateServiceClient(http_client, resolver)
+    app.state.project_client = ProjectServiceClient(http_client, resolver)
+    
+    # One storage client per app; blocking MinIO calls run in its bounded thread pool
+    storage_service = await asyncio.to_thread(AsyncMinIOStorageService, settings.STORAGE_THREAD_POOL_SIZE)
+    app.state.storage_service = storage_service
+    
+    # Master template is kept in memory and revalidated by ETag
+    app.state.master_template_cache = MasterTemplateCache(
+        settings.MASTER_TEMPLATE_REVALIDATE_INTERVAL,
+        settings.MASTER_TEMPLATE_CACHE_SIZE
+    )
+    if settings.MASTER_TEMPLATE_URL:
+        try:
+            await app.state.master_template_cache.get(storage_service, settings.MASTER_TEMPLATE_URL)
+        except Exception as e:
+            logger.warning(f"Failed to preload master template {settings.MASTER_TEMPLATE_URL}: {e}")
+    
+    # Template blocks are parsed once per version; evicted blocks spill to disk
+    app.state.block_cache = BlockCache(
+        memory_budget=settings.BLOCK_CACHE_MEMORY_BYTES,
+        disk_dir=settings.BLOCK_CACHE_DIR,
+        disk_budget=settings.BLOCK_CACHE_DISK_BYTES,
+        revalidate_interval=settings.BLOCK_CACHE_REVALIDATE_INTERVAL
+    )
+    
+    # Pool of headless LibreOffice profiles for thumbnails and PDF export;
+    # identical conversions requested at the same time run once
+    app.state.office_renderer = OfficeRenderer(
+        soffice_path=settings.OFFICE_SOFFICE_PATH,
+        pool_size=settings.OFFICE_POOL_SIZE,
+        timeout=settings.OFFICE_CONVERT_TIMEOUT,
+        work_dir=settings.OFFICE_WORK_DIR
+    )
+    app.state.render_flights = SingleFlight()
+    renderer_warm_up = None
+    if settings.OFFICE_WARM_UP:
+        renderer_warm_up = asyncio.create_task(app.state.office_renderer.warm_up())
+    
+    # Local worker for queued generation jobs (Postgres queue table, process pool for python-pptx)
+    generation_worker = None
+    if settings.DEFERRED_ASSEMBLY and settings.GENERATION_JOBS_ENABLED and settings.GENERATION_WORKER_ENABLED:
+        generation_worker = GenerationWorker(
+            app.state.template_client,
+            storage_service,
+            app.state.block_cache,
+            concurrency=settings.GENERATION_WORKER_CONCURRENCY,
+            process_pool_size=settings.GENERATION_PROCESS_POOL_SIZE,
+            max_running_per_tenant=settings.GENERATION_MAX_JOBS_PER_TENANT,
+            poll_interval=settings.GENERATION_POLL_INTERVAL,
+            heartbeat_interval=settings.GENERATION_HEARTBEAT_INTERVAL,
+            stale_after=settings.GENERATION_JOB_STALE_AFTER
+        )
+        await generation_worker.start()
+    
     logger.info(f"{settings.SERVICE_NAME} started successfully on port {settings.SERVICE_PORT}")
     
     yield
     
     # Shutdown
     logger.info(f"Shutting down {settings.SERVICE_NAME}...")
+    if generation_worker:
+        await generation_worker.stop()
+    if renderer_warm_up:
+        renderer_warm_up.cancel()
+    await resolver.stop()
+    await http_client.aclose()
+    storage_service.close()
+    app.state.office_renderer.close()
+    await engine.dispose()
 
 
 # Create FastAPI application
@@ -56,6 +144,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.DB_QUERY_COUNT_HEADER:
+    @app.middleware("http")
+    async def query_count_header(request, call_next):
+        """Report the number of SQL statements a request executed"""
+        with count_queries() as counter:
+            response = await call_next(request)
+        response.headers["X-DB-Query-Count"] = str(counter[0])
+        return response
+
 # Include routers
 app.include_router(router)
 
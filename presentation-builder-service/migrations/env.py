@@ -10,7 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.config.database import Base
 from app.config.settings import settings
-from app.domain.entities import Presentation, PresentationSlide, SlideBlock, SlideBlockValue
+from app.domain.entities import Presentation, PresentationSlide, SlideBlock, SlideBlockValue, GenerationJob
 
 # this is the Alembic Config object
 config = context.config
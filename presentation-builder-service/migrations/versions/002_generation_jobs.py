@@ -0,0 +1,45 @@
+"""Add generation_jobs queue table
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create generation_jobs table (local job queue, claimed with FOR UPDATE SKIP LOCKED)
+    op.create_table(
+        'generation_jobs',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('presentation_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False, server_default='Queued'),
+        sa.Column('progress_current', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('worker_id', sa.String(255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['presentation_id'], ['presentations.id'], ondelete='CASCADE')
+    )
+    op.create_index('idx_generation_jobs_status_created', 'generation_jobs', ['status', 'created_at'])
+    op.create_index('idx_generation_jobs_tenant_status', 'generation_jobs', ['tenant_id', 'status'])
+    op.create_index('idx_generation_jobs_presentation_id', 'generation_jobs', ['presentation_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('generation_jobs')
@@ -0,0 +1,28 @@
+"""Add keyset index for project presentation listing
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves WHERE project_id = ? AND (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC
+    op.create_index(
+        'idx_presentations_project_updated',
+        'presentations',
+        ['project_id', sa.text('updated_at DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_presentations_project_updated', table_name='presentations')
@@ -0,0 +1,64 @@
+"""Replace dense slide order_index with fractional sort keys
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 18:00:00
+
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.domain.order_keys import keys_between
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('presentation_slides', sa.Column('sort_key', sa.Text(collation='C'), nullable=True))
+
+    # Existing slides keep their relative order (order_index may have gaps after deletes)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT presentation_id, id FROM presentation_slides ORDER BY presentation_id, order_index"
+    )).all()
+    updates = []
+    for _, slides in groupby(rows, key=lambda row: row.presentation_id):
+        slide_ids = [row.id for row in slides]
+        updates.extend(
+            {"id": slide_id, "sort_key": key}
+            for slide_id, key in zip(slide_ids, keys_between(None, None, len(slide_ids)))
+        )
+    if updates:
+        bind.execute(sa.text("UPDATE presentation_slides SET sort_key = :sort_key WHERE id = :id"), updates)
+
+    op.alter_column('presentation_slides', 'sort_key', nullable=False)
+    op.create_unique_constraint(
+        'uq_presentation_slide_sort_key', 'presentation_slides', ['presentation_id', 'sort_key']
+    )
+    op.drop_constraint('uq_presentation_slide_order', 'presentation_slides', type_='unique')
+    op.drop_column('presentation_slides', 'order_index')
+
+
+def downgrade() -> None:
+    op.add_column('presentation_slides', sa.Column('order_index', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE presentation_slides AS s
+        SET order_index = ordered.position
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY presentation_id ORDER BY sort_key) - 1 AS position
+            FROM presentation_slides
+        ) AS ordered
+        WHERE s.id = ordered.id
+    """)
+    op.alter_column('presentation_slides', 'order_index', nullable=False)
+    op.create_unique_constraint(
+        'uq_presentation_slide_order', 'presentation_slides', ['presentation_id', 'order_index']
+    )
+    op.drop_constraint('uq_presentation_slide_sort_key', 'presentation_slides', type_='unique')
+    op.drop_column('presentation_slides', 'sort_key')
@@ -0,0 +1,38 @@
+"""Add presentation_versions table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Version snapshots; part data is stored in MinIO by content hash
+    op.create_table(
+        'presentation_versions',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('presentation_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('label', sa.Text(), nullable=True),
+        sa.Column('parts', JSONB(), nullable=False),
+        sa.Column('slides', JSONB(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+        sa.ForeignKeyConstraint(['presentation_id'], ['presentations.id'], ondelete='CASCADE'),
+        # Also serves lookups and listing by presentation
+        sa.UniqueConstraint('presentation_id', 'number', name='uq_presentation_version_number')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('presentation_versions')
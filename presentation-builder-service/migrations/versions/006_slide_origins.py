@@ -0,0 +1,29 @@
+"""Track which base deck slide each slide starts from (deferred assembly)
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-20 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing slides stay NULL: deferred assembly maps them to base slides by
+    # position once (as before) and stores the result
+    op.add_column('presentation_slides', sa.Column('base_slide_id', sa.Integer(), nullable=True))
+    op.add_column('presentation_slides', sa.Column('layout_slide_id', sa.Integer(), nullable=True))
+    op.add_column('presentation_slides', sa.Column('layout_index', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('presentation_slides', 'layout_index')
+    op.drop_column('presentation_slides', 'layout_slide_id')
+    op.drop_column('presentation_slides', 'base_slide_id')
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк проверки JWT в presentation-builder-service
+
+Сравнивает исходный путь (декодирование ключа и полная RS256-проверка на
+каждый запрос) с TokenVerifier (ключ разобран один раз, кэш проверенных
+токенов).
+
+Использование:
+    python scripts/benchmark_jwt.py
+    python scripts/benchmark_jwt.py --iterations 20000 --tokens 50
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.auth import TokenVerifier  # noqa: E402
+
+ISSUER = "AuthService"
+AUDIENCE = "ApiClients"
+
+
+def generate_keys():
+    """Сгенерировать RSA-ключ и вернуть (private_key, base64 DER public key)"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_der = private_key.public_key().public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_key, base64.b64encode(public_der).decode("ascii")
+
+
+def issue_token(private_key, user_id: int) -> str:
+    """Выпустить токен в формате AuthService"""
+    return jwt.encode(
+        {
+            "http://schemas.xmlsoap.org/ws/2005/05/identity/claims/nameidentifier": str(user_id),
+            "iss": ISSUER,
+            "aud": AUDIENCE,
+            "exp": datetime.now(timezone.utc) + timedelta(minutes=15)
+        },
+        private_key,
+        algorithm="RS256"
+    )
+
+
+def verify_uncached(token: str, encoded_public_key: str) -> dict:
+    """Исходная реализация verify_jwt_token (до кэширования)"""
+    public_key = serialization.load_der_public_key(
+        base64.b64decode(encoded_public_key),
+        backend=default_backend()
+    )
+    return jwt.decode(
+        token,
+        public_key,
+        algorithms=["RS256"],
+        audience=AUDIENCE,
+        issuer=ISSUER
+    )
+
+
+def run(label: str, func, tokens, iterations: int) -> float:
+    """Выполнить func для токенов по кругу и вывести время на вызов"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / iterations * 1_000_000
+    print(f"{label:<40} {per_call_us:>10.2f} µs/call  ({iterations} calls)")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк проверки JWT')
+    parser.add_argument('--iterations', type=int, default=5000, help='Количество проверок')
+    parser.add_argument('--tokens', type=int, default=20, help='Количество разных токенов (пользователей)')
+    args = parser.parse_args()
+
+    private_key, encoded_public_key = generate_keys()
+    tokens = [issue_token(private_key, i) for i in range(args.tokens)]
+
+    verifier_no_cache = TokenVerifier(
+        encoded_public_key, algorithm="RS256", audience=AUDIENCE, issuer=ISSUER, cache_size=0
+    )
+    verifier = TokenVerifier(
+        encoded_public_key, algorithm="RS256", audience=AUDIENCE, issuer=ISSUER
+    )
+
+    print(f"Токенов: {len(tokens)}, итераций: {args.iterations}\n")
+    baseline = run("load key + decode (исходный путь)", lambda t: verify_uncached(t, encoded_public_key), tokens, args.iterations)
+    parsed = run("parsed key, без кэша", verifier_no_cache.verify, tokens, args.iterations)
+    cached = run("parsed key + кэш проверенных токенов", verifier.verify, tokens, args.iterations)
+
+    print()
+    print(f"Ускорение за счёт разбора ключа один раз: x{baseline / parsed:.1f}")
+    print(f"Ускорение для повторных вызовов:          x{baseline / cached:.1f}")
+
+
+if __name__ == "__main__":
+    main()
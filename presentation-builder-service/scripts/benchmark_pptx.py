@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк операций с PPTX в presentation-builder-service
+
+Замеряет время и пиковую память операций горячего пути сборки презентаций:
+PPTXService.load_presentation, save_presentation, clone_slide,
+copy_shapes_from_block (блоки text/table/image), fill_template_with_data и
+TextLayoutService.add_fields_with_auto_layout на синтетических колодах из
+1, 10, 100 и 500 слайдов (synthetic_decks.py).
+
+Время — медиана и минимум по --repeat запускам после одного прогрева; память —
+пик tracemalloc за один отдельный запуск (tracemalloc замедляет код, поэтому
+время с ним не меряется). Подготовка (загрузка колоды, новый пустой слайд) в
+замер не входит; каждый запуск получает колоду, заново загруженную из байтов,
+поэтому клонирование и новые слайды не копятся между запусками.
+
+Результаты сохраняются как базовая линия (--save) и сравниваются с ней
+(--baseline): операция считается регрессией, если медиана времени или пик
+памяти выросли больше допуска. Код выхода 1 при регрессии. Базовую линию
+снимайте на той же машине, на которой сравниваете.
+
+Использование:
+    python scripts/benchmark_pptx.py --save baseline.json
+    python scripts/benchmark_pptx.py --baseline baseline.json
+    python scripts/benchmark_pptx.py --sizes 1 10 --only copy_shapes --repeat 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pptx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.infrastructure.pptx_service import PPTXService  # noqa: E402
+from app.infrastructure.text_layout import TextLayoutService  # noqa: E402
+from synthetic_decks import BLOCK_KINDS, DEFAULT_SIZES, make_block, make_deck, make_fields  # noqa: E402
+
+FIELDS_PER_SLIDE = 8
+
+
+def measure(op, setup, repeat: int):
+    """
+    Замерить операцию
+
+    Args:
+        op: Функция от результата setup
+        setup: Подготовка перед каждым запуском (не входит в замер)
+        repeat: Количество замеряемых запусков
+
+    Returns:
+        (медиана, мс; минимум, мс; пик памяти, байт)
+    """
+    op(setup())  # прогрев
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        op(state)
+        times.append((time.perf_counter() - start) * 1000)
+
+    state = setup()
+    tracemalloc.start()
+    try:
+        op(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), min(times), peak
+
+
+def add_blank_slide(deck: bytes):
+    """Загрузить колоду, добавить пустой слайд в конец и вернуть (prs, индекс)"""
+    prs = PPTXService.load_presentation(deck)
+    return prs, PPTXService.add_slide(prs)
+
+
+def build_cases(size: int):
+    """Операции для колоды из size слайдов: [(имя, op, setup)]"""
+    deck = make_deck(size)
+    # Операции меняют колоду: каждому запуску — своя копия
+    fresh = lambda: PPTXService.load_presentation(deck)
+    blocks = {kind: make_block(kind) for kind in BLOCK_KINDS}
+    fields = make_fields(FIELDS_PER_SLIDE)
+    # Слайд с изображениями, если он есть: клонирование копирует и медиа
+    clone_index = min(BLOCK_KINDS.index("image"), size - 1)
+
+    cases = [
+        ("load_presentation", PPTXService.load_presentation, lambda: deck),
+        ("save_presentation", PPTXService.save_presentation, fresh),
+        ("clone_slide", lambda p: PPTXService.clone_slide(p, clone_index), fresh),
+    ]
+    for kind, block in blocks.items():
+        cases.append((
+            f"copy_shapes_from_block/{kind}",
+            lambda state, block=block: PPTXService.copy_shapes_from_block(state[0], block, state[1]),
+            lambda: add_blank_slide(deck)
+        ))
+    cases.append((
+        "fill_template_with_data",
+        lambda state: PPTXService.fill_template_with_data(state[0], state[1], fields),
+        lambda: add_blank_slide(deck)
+    ))
+    cases.append((
+        "add_fields_with_auto_layout",
+        lambda state: TextLayoutService.add_fields_with_auto_layout(state[0].slides[state[1]], state[0], fields),
+        lambda: add_blank_slide(deck)
+    ))
+    return len(deck), cases
+
+
+def compare(results, baseline, time_tolerance: float, memory_tolerance: float) -> int:
+    """Сравнить с базовой линией, вывести регрессии и вернуть их количество"""
+    regressions = 0
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        time_ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        memory_ratio = result["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 1.0
+        problems = []
+        if time_ratio > 1 + time_tolerance:
+            problems.append(f"время x{time_ratio:.2f}")
+        if memory_ratio > 1 + memory_tolerance:
+            problems.append(f"память x{memory_ratio:.2f}")
+        if problems:
+            regressions += 1
+            print(f"РЕГРЕССИЯ {name}: {', '.join(problems)}")
+    missing = len(set(baseline) - set(results))
+    if missing:
+        print(f"Операций базовой линии не было в этом прогоне: {missing}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк операций с PPTX')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Размеры колод, слайдов')
+    parser.add_argument('--repeat', type=int, default=7, help='Замеряемых запусков на операцию')
+    parser.add_argument('--only', default='', help='Только операции, имя которых содержит подстроку')
+    parser.add_argument('--save', help='Сохранить результаты как базовую линию (JSON)')
+    parser.add_argument('--baseline', help='Сравнить с базовой линией (JSON)')
+    parser.add_argument('--time-tolerance', type=float, default=0.25, help='Допустимый рост медианы времени (0.25 = +25%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10, help='Допустимый рост пика памяти')
+    args = parser.parse_args()
+
+    # Сервисы пишут INFO на каждую операцию, text_layout — WARNING при переполнении слайда
+    logging.basicConfig(level=logging.ERROR)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(f"{'Операция':<48} {'медиана, мс':>12} {'мин, мс':>10} {'пик, МБ':>9} {'база':>8}")
+    for size in args.sizes:
+        deck_size, cases = build_cases(size)
+        print(f"\n{size} слайд(ов), {deck_size / 1024:.0f} KB")
+        for name, op, setup in cases:
+            if args.only not in name:
+                continue
+            key = f"{name}[{size}]"
+            median_ms, min_ms, peak = measure(op, setup, args.repeat)
+            results[key] = {"median_ms": round(median_ms, 3), "min_ms": round(min_ms, 3), "peak_bytes": peak}
+            base = baseline.get(key) if baseline else None
+            vs_base = f"x{median_ms / base['median_ms']:.2f}" if base and base["median_ms"] else ""
+            print(f"{key:<48} {median_ms:>12.2f} {min_ms:>10.2f} {peak / 1024 / 1024:>9.2f} {vs_base:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "python_pptx": pptx.__version__,
+                    "machine": platform.platform(),
+                    "repeat": args.repeat
+                },
+                "results": results
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nБазовая линия сохранена: {args.save}")
+
+    if baseline is not None:
+        print()
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        print(f"Регрессий: {regressions}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Проверка количества SQL-запросов на эндпоинт presentation-builder-service
+
+Проходит сценарий (создание презентации, скачивание, слайды, блоки, значения, удаление)
+против запущенного сервиса с DB_QUERY_COUNT_HEADER=true и сравнивает
+заголовок X-DB-Query-Count с бюджетом каждого эндпоинта. Бюджеты — верхние
+границы для обоих режимов сборки (DEFERRED_ASSEMBLY вкл./выкл.); превышение
+означает N+1 или лишнюю загрузку дерева слайдов. Код выхода 1 при превышении.
+
+Использование:
+    python scripts/check_query_counts.py --token $JWT \\
+        --project-id <uuid> --template-block-id <uuid> --field-key title
+"""
+
+import argparse
+import sys
+
+import httpx
+
+# Эндпоинт -> максимум SQL-запросов
+BUDGETS = {
+    "POST /presentations": 5,
+    "GET /presentations/{id}": 4,
+    "GET /presentations/{id}/download": 1,
+    "GET /presentations/{id}/download (If-None-Match)": 1,
+    "GET /presentations": 4,
+    "GET /projects/{project_id}/presentations": 1,
+    "POST /presentations/{id}/slides": 4,
+    "GET /presentations/{id}/slides": 3,
+    "POST /presentations/{id}/slides/{index}/blocks": 5,
+    "PATCH /presentations/{id}/slides/{slide_id}": 6,
+    "PATCH /presentations/{id}/blocks/{block_id}": 9,
+    "PATCH /presentations/{id}/blocks/{block_id} (без изменений)": 3,
+    "POST /presentations/{id}/slides/{slide_id}/move": 7,
+    "DELETE /presentations/{id}/slides/{slide_id}/blocks/{block_id}": 5,
+    "DELETE /presentations/{id}/slides/{slide_id}": 4,
+    "DELETE /presentations/{id}": 2,
+}
+
+
+class Checker:
+    """Выполняет запросы и сверяет X-DB-Query-Count с бюджетом"""
+
+    def __init__(self, client: httpx.Client):
+        self.client = client
+        self.failures = 0
+
+    def request(self, label: str, method: str, path: str, accept=(), **kwargs) -> httpx.Response:
+        response = self.client.request(method, path, **kwargs)
+        if response.status_code not in accept:
+            response.raise_for_status()
+        header = response.headers.get("X-DB-Query-Count")
+        if header is None:
+            sys.exit("Нет заголовка X-DB-Query-Count: запустите сервис с DB_QUERY_COUNT_HEADER=true")
+        count, budget = int(header), BUDGETS[label]
+        ok = count <= budget
+        self.failures += 0 if ok else 1
+        print(f"{'OK ' if ok else 'FAIL'} {label:<66} {count:>3} / {budget}")
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка количества SQL-запросов на эндпоинт')
+    parser.add_argument('--url', default='http://localhost:8005', help='Базовый URL сервиса')
+    parser.add_argument('--token', required=True, help='JWT для заголовка Authorization')
+    parser.add_argument('--project-id', required=True, help='Существующий проект')
+    parser.add_argument('--template-block-id', required=True, help='Существующий блок шаблона')
+    parser.add_argument('--field-key', default='title', help='Ключ поля блока для обновления значения')
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    with httpx.Client(base_url=f"{args.url}/api", headers=headers, timeout=60) as client:
+        check = Checker(client)
+
+        presentation = check.request(
+            "POST /presentations", "POST", "/presentations",
+            json={"projectId": args.project_id, "name": "query-count-check"}
+        ).json()
+        pid = presentation["id"]
+        try:
+            check.request("GET /presentations/{id}", "GET", f"/presentations/{pid}")
+            # 307 при DOWNLOAD_PRESIGNED_REDIRECT: тогда ETag нет и повторная проверка пропускается
+            download = check.request(
+                "GET /presentations/{id}/download", "GET", f"/presentations/{pid}/download", accept=(307,)
+            )
+            if "ETag" in download.headers:
+                check.request(
+                    "GET /presentations/{id}/download (If-None-Match)", "GET", f"/presentations/{pid}/download",
+                    accept=(304,), headers={"If-None-Match": download.headers["ETag"]}
+                )
+            check.request("GET /presentations", "GET", "/presentations", params={"limit": 20})
+            check.request(
+                "GET /projects/{project_id}/presentations", "GET", f"/projects/{args.project_id}/presentations"
+            )
+            slide = check.request("POST /presentations/{id}/slides", "POST", f"/presentations/{pid}/slides", json={}).json()
+            check.request("GET /presentations/{id}/slides", "GET", f"/presentations/{pid}/slides")
+
+            block = check.request(
+                "POST /presentations/{id}/slides/{index}/blocks", "POST", f"/presentations/{pid}/slides/0/blocks",
+                json={"templateBlockId": args.template_block_id}
+            ).json()
+            check.request(
+                "PATCH /presentations/{id}/slides/{slide_id}", "PATCH", f"/presentations/{pid}/slides/{slide['id']}",
+                json={"templateBlockId": args.template_block_id}
+            )
+
+            values = {"values": {args.field_key: "Query count check"}}
+            check.request(
+                "PATCH /presentations/{id}/blocks/{block_id}", "PATCH", f"/presentations/{pid}/blocks/{block['id']}",
+                json=values
+            )
+            check.request(
+                "PATCH /presentations/{id}/blocks/{block_id} (без изменений)", "PATCH",
+                f"/presentations/{pid}/blocks/{block['id']}", json=values
+            )
+
+            check.request(
+                "POST /presentations/{id}/slides/{slide_id}/move", "POST",
+                f"/presentations/{pid}/slides/{slide['id']}/move", json={"toIndex": 0}
+            )
+            check.request(
+                "DELETE /presentations/{id}/slides/{slide_id}/blocks/{block_id}", "DELETE",
+                f"/presentations/{pid}/slides/{block['slideId']}/blocks/{block['id']}"
+            )
+            check.request(
+                "DELETE /presentations/{id}/slides/{slide_id}", "DELETE", f"/presentations/{pid}/slides/{slide['id']}"
+            )
+        finally:
+            check.request("DELETE /presentations/{id}", "DELETE", f"/presentations/{pid}")
+
+    print(f"\nПревышений бюджета: {check.failures}")
+    sys.exit(1 if check.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест HTTP API presentation-builder-service
+
+Держит заданное число одновременных запросов к эндпоинтам сервиса и выводит
+пропускную способность и перцентили задержки. Используется для сравнения
+сервиса до и после перехода на асинхронный доступ к БД (AsyncSession):
+запустите тест на обеих версиях с одинаковыми параметрами.
+
+Использование:
+    python scripts/load_test.py --token $JWT --path /api/presentations
+    python scripts/load_test.py --token $JWT --concurrency 100 --duration 60 \\
+        --path /api/presentations \\
+        --path /api/presentations/<id>/slides
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Перцентиль отсортированного списка (ближайший ранг)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def worker(client: httpx.AsyncClient, paths, deadline: float, latencies, statuses, offset: int):
+    """Отправлять запросы по кругу до дедлайна"""
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    latencies = []
+    statuses = Counter()
+
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=args.timeout) as client:
+        # Прогрев: пул соединений к БД, кэши шаблонов
+        for path in args.path:
+            await client.get(path)
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, args.path, deadline, latencies, statuses, n)
+            for n in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    print(f"URL: {args.url}, эндпоинтов: {len(args.path)}, параллельно: {args.concurrency}, длительность: {elapsed:.1f} s\n")
+    print(f"{'Запросов':<16} {len(latencies)}")
+    print(f"{'req/s':<16} {len(latencies) / elapsed:.1f}")
+    if ms:
+        print(f"{'mean':<16} {statistics.mean(ms):.1f} ms")
+        for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            print(f"{label:<16} {percentile(ms, fraction):.1f} ms")
+        print(f"{'max':<16} {ms[-1]:.1f} ms")
+    print(f"\nОтветы: {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест presentation-builder-service')
+    parser.add_argument('--url', default='http://localhost:8005', help='Базовый URL сервиса')
+    parser.add_argument('--token', default='', help='JWT для заголовка Authorization')
+    parser.add_argument('--path', action='append', required=True, help='GET-эндпоинт (можно несколько раз)')
+    parser.add_argument('--concurrency', type=int, default=50, help='Одновременных запросов')
+    parser.add_argument('--duration', type=float, default=30.0, help='Длительность теста, секунд')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Таймаут запроса, секунд')
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
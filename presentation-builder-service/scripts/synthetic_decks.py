@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических презентаций для бенчмарков presentation-builder-service
+
+Строит детерминированные (по seed) колоды и блоки шаблонов трёх видов:
+текстовые (заголовок и маркированный список), табличные и с изображениями.
+Текст на русском, объёмы близки к реальным слайдам. Используется
+benchmark_pptx.py; может сохранить корпус на диск, чтобы прогнать его
+через сервис вручную.
+
+Использование:
+    python scripts/synthetic_decks.py --out /tmp/decks
+    python scripts/synthetic_decks.py --out /tmp/decks --sizes 10 500 --seed 7
+"""
+
+import argparse
+import io
+import os
+import random
+from typing import Dict, List
+
+from PIL import Image, ImageDraw
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+BLOCK_KINDS = ("text", "table", "image")
+DEFAULT_SIZES = (1, 10, 100, 500)
+
+WORDS = (
+    "выручка", "рост", "квартал", "показатели", "стратегия", "клиенты", "проект", "развитие",
+    "рынок", "доля", "инвестиции", "эффективность", "производство", "логистика", "поставщики",
+    "цифровизация", "платформа", "сервис", "качество", "затраты", "прибыль", "сегмент", "регион",
+    "команда", "продажи", "маркетинг", "исследование", "внедрение", "результаты", "план",
+    "бюджет", "риски", "анализ", "динамика", "оптимизация", "потребители", "партнёры", "этап",
+)
+TITLES = (
+    "Итоги третьего квартала", "Стратегия развития на 2025–2027 годы", "Ключевые показатели эффективности",
+    "Анализ рынка и конкурентов", "Дорожная карта внедрения", "Структура затрат по направлениям",
+    "Результаты пилотного проекта", "Планы по расширению в регионах", "Риски и меры по их снижению",
+)
+COLUMNS = ("Показатель", "Q1", "Q2", "Q3", "Q4", "Изменение, %")
+
+
+def sentence(rng: random.Random, min_words: int = 6, max_words: int = 14) -> str:
+    """Случайное предложение из словаря"""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def make_image(rng: random.Random, width: int = 800, height: int = 600) -> bytes:
+    """JPEG с градиентом и фигурами (каждое изображение уникально, как фото в реальных колодах)"""
+    base = tuple(rng.randint(0, 255) for _ in range(3))
+    image = Image.new("RGB", (width, height), base)
+    draw = ImageDraw.Draw(image)
+    for y in range(0, height, 4):
+        shade = tuple((c + y // 3) % 256 for c in base)
+        draw.rectangle([0, y, width, y + 3], fill=shade)
+    for _ in range(40):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        size = rng.randint(10, 120)
+        draw.ellipse([x, y, x + size, y + size], fill=tuple(rng.randint(0, 255) for _ in range(3)))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=85)
+    return output.getvalue()
+
+
+def new_presentation() -> Presentation:
+    """Пустая презентация 16:9"""
+    prs = Presentation()
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+    return prs
+
+
+def fill_slide(slide, kind: str, rng: random.Random):
+    """Наполнить слайд содержимым блока заданного вида"""
+    shapes = slide.shapes
+    title = shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(12.3), Inches(1))
+    title.text_frame.text = rng.choice(TITLES)
+    title.text_frame.paragraphs[0].runs[0].font.size = Pt(32)
+
+    if kind == "text":
+        body = shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(12.3), Inches(5.5)).text_frame
+        body.word_wrap = True
+        for index in range(rng.randint(4, 8)):
+            paragraph = body.paragraphs[0] if index == 0 else body.add_paragraph()
+            paragraph.text = "• " + sentence(rng)
+            paragraph.runs[0].font.size = Pt(18)
+    elif kind == "table":
+        rows = rng.randint(5, 10)
+        table = shapes.add_table(rows, len(COLUMNS), Inches(0.5), Inches(1.5), Inches(12.3), Inches(5.5)).table
+        for col, name in enumerate(COLUMNS):
+            table.cell(0, col).text = name
+        for row in range(1, rows):
+            table.cell(row, 0).text = rng.choice(WORDS).capitalize()
+            for col in range(1, len(COLUMNS)):
+                table.cell(row, col).text = f"{rng.uniform(-50, 500):,.1f}".replace(",", " ")
+    elif kind == "image":
+        for col in range(rng.randint(2, 3)):
+            shapes.add_picture(io.BytesIO(make_image(rng)), Inches(0.5 + col * 4.2), Inches(1.6), width=Inches(4))
+        caption = shapes.add_textbox(Inches(0.5), Inches(5.8), Inches(12.3), Inches(1)).text_frame
+        caption.text = sentence(rng)
+    else:
+        raise ValueError(f"Unknown block kind {kind}")
+
+
+def make_block(kind: str, seed: int = 0) -> bytes:
+    """Блок шаблона: презентация из одного слайда заданного вида"""
+    rng = random.Random(f"block-{kind}-{seed}")
+    prs = new_presentation()
+    fill_slide(prs.slides.add_slide(prs.slide_layouts[6]), kind, rng)
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def make_deck(slides: int, seed: int = 0) -> bytes:
+    """Колода из slides слайдов; виды блоков чередуются text -> table -> image"""
+    rng = random.Random(f"deck-{slides}-{seed}")
+    prs = new_presentation()
+    for index in range(slides):
+        fill_slide(prs.slides.add_slide(prs.slide_layouts[6]), BLOCK_KINDS[index % len(BLOCK_KINDS)], rng)
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def make_fields(count: int, seed: int = 0) -> List[Dict]:
+    """Данные полей в формате PPTXService.fill_template_with_data"""
+    rng = random.Random(f"fields-{count}-{seed}")
+    fields = []
+    for index in range(count):
+        is_title = index % 4 == 0
+        fields.append({
+            "text": rng.choice(TITLES) if is_title else " ".join(sentence(rng) for _ in range(rng.randint(1, 3))),
+            "font_metadata": {
+                "name": "Arial",
+                "size": 28 if is_title else 16,
+                "color": "#1F1F1F",
+                "bold": is_title,
+                "italic": False,
+                "alignment": "LEFT"
+            },
+            "order_index": index,
+            "block_id": f"00000000-0000-0000-0000-{index:012d}",
+            "field_key": "title" if is_title else f"text_{index}"
+        })
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Генератор синтетических презентаций')
+    parser.add_argument('--out', required=True, help='Каталог для файлов')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Размеры колод, слайдов')
+    parser.add_argument('--seed', type=int, default=0, help='Seed генератора')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for kind in BLOCK_KINDS:
+        path = os.path.join(args.out, f"block-{kind}.pptx")
+        with open(path, "wb") as f:
+            f.write(make_block(kind, args.seed))
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB")
+    for size in args.sizes:
+        path = os.path.join(args.out, f"deck-{size}.pptx")
+        with open(path, "wb") as f:
+            f.write(make_deck(size, args.seed))
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()